@@ -2,11 +2,13 @@ import discord
 from discord.ext import commands
 from discord import app_commands, Interaction
 from discord.ui import View, button
-import random
 import os
 from PIL import Image
 import io
 import asyncio
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from utils.economy import (
     get_balance,
     add_currency,
@@ -19,10 +21,21 @@ from utils.economy import (
 )
 from datetime import datetime
 import json
-from datetime import timedelta
 from utils.botadmin import is_bot_admin
+from utils.cooldowns import cooldowns
+from utils.casino_stats import casino_stats
+from utils.rtp_monitor import rtp_monitor
+from utils.rng import rng, Shoe
+from utils.casino_sim import run_chunked, simulate_blackjack_chunk, split_chunks, new_seeds
+import math
 import re
 
+# Owner ID (allow overriding via env YOUR_USER_ID)
+BOT_OWNER_ID = int(os.getenv('YOUR_USER_ID', '461008427326504970'))
+
+# Hands per worker job for /blackjacksim
+BJ_SIM_CHUNK = 100_000
+
 # --- Color Codes ---
 RESET = "\033[0m"
 YELLOW = "\033[33m"
@@ -54,26 +67,27 @@ CARD_IMAGES = {
     'K': ['king_of_spades.png', 'king_of_hearts.png', 'king_of_diamonds.png', 'king_of_clubs.png']
 }
 
-# Create deck with card values (not suits since they don't matter)
-DECK = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K'] * 16  # 4 of each card * 4 suits
-random.shuffle(DECK)
-deck_index = 0
-
-def deal_card():
-    global deck_index, DECK
-    if deck_index >= len(DECK):
-        # Reshuffle when deck runs out
-        DECK = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K'] * 16
-        random.shuffle(DECK)
-        deck_index = 0
-    
-    card = DECK[deck_index]
-    deck_index += 1
-    return card
-
-def get_card_image(card):
-    """Get a random image file for the given card value"""
-    return random.choice(CARD_IMAGES[card])
+# House rules (also fed to /blackjacksim so simulations match live play)
+SHOE_COPIES = 16          # copies of each rank in the shoe (4 decks)
+DEALER_STAND = 17         # dealer draws below this (stands on all 17s)
+BLACKJACK_RETURN = 2.5    # total return on a natural, i.e. pays 3:2
+# Return under perfect basic strategy (/blackjacksim); real play can only do worse,
+# so the drift monitor treats anything well above this as suspicious
+EXPECTED_RTP = 0.991
+
+# One shoe's worth of (rank, face image) cards: every face once per deck, so a
+# dealt card already knows its suit
+SHOE_CARDS = [(rank, face) for rank, faces in CARD_IMAGES.items() for face in faces] * (SHOE_COPIES // 4)
+# guild_id -> that server's shoe; each draws from its own RNG stream
+_SHOES: dict[str, Shoe] = {}
+
+def deal_card(guild_id) -> tuple[str, str]:
+    """Draw (rank, face) from the guild's shoe (reshuffled when it runs out)."""
+    key = str(guild_id or "dm")
+    shoe = _SHOES.get(key)
+    if shoe is None:
+        shoe = _SHOES[key] = rng.shoe(f"blackjack:{key}", SHOE_CARDS)
+    return shoe.draw()
 
 def card_value(card):
     if card in ['J', 'Q', 'K']:
@@ -128,55 +142,201 @@ def format_hand_with_total(hand, hide_second=False, show_ace_values=True):
     
     return f"{cards_display} - Total: {total}"
 
-def create_hand_image(hand, hide_second=False):
-    """Create a composite image of the hand using card PNGs"""
+# ---------- Card rendering ----------
+
+CARDS_DIR = 'cards'
+CARD_BACK = 'back_of_card.png'
+CARD_WIDTH = 140
+CARD_HEIGHT = 190
+CARD_SPACING = 10
+HAND_GAP = 20  # vertical gap between player and dealer rows
+# zlib level for the hand PNGs; 1 is several times faster than the default
+# and the output is only a little larger
+PNG_COMPRESS_LEVEL = 1
+
+# filename -> pre-scaled RGBA tile. Filled once at cog load; tiles are only
+# ever read afterwards, so render threads can share them.
+CARD_ATLAS: dict[str, Image.Image] = {}
+
+# Byte budget for the encoded hand image cache (HAND_CACHE)
+HAND_CACHE_BYTES = 16 * 1024 * 1024
+
+# Compositing + PNG encoding run here, off the event loop
+_RENDER_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bj-render")
+
+def load_card_atlas(folder: str = CARDS_DIR) -> int:
+    """Load and pre-scale every card face plus the back. Returns tiles loaded."""
+    names = [name for files in CARD_IMAGES.values() for name in files] + [CARD_BACK]
+    atlas = {}
+    for name in names:
+        path = os.path.join(folder, name)
+        if not os.path.exists(path):
+            continue
+        try:
+            with Image.open(path) as img:
+                atlas[name] = img.convert('RGBA').resize((CARD_WIDTH, CARD_HEIGHT), Image.Resampling.LANCZOS)
+        except Exception as e:
+            print(f"Error loading card image {path}: {e}")
+    CARD_ATLAS.clear()
+    CARD_ATLAS.update(atlas)
+    return len(atlas)
+
+def hand_key(faces, hide_second=False) -> tuple:
+    """Exact ordered ((card file, hidden), ...) tuple describing what a hand image shows.
+
+    A hidden slot is always (CARD_BACK, True), so every hole card shares one key.
+    """
+    return tuple((CARD_BACK, True) if hide_second and i == 1 else (face, False) for i, face in enumerate(faces))
+
+def create_hand_image(key):
+    """Create a composite image of a hand (see hand_key) by pasting cached card tiles"""
     try:
-        card_width = 140
-        card_height = 190
-        spacing = 10
-        
+        if not CARD_ATLAS:
+            load_card_atlas()
         # Calculate image dimensions
-        total_width = len(hand) * card_width + (len(hand) - 1) * spacing
-        total_height = card_height
-        
-        # Create base image with transparent background
-        image = Image.new('RGBA', (total_width, total_height), (0, 0, 0, 0))
-        
-        for i, card in enumerate(hand):
-            x_pos = i * (card_width + spacing)
-            
-            if hide_second and i == 1:
-                # Use card back
-                card_path = os.path.join('cards', 'back_of_card.png')
-            else:
-                # Get random image for this card value
-                card_filename = get_card_image(card)
-                card_path = os.path.join('cards', card_filename)
-            
-            if os.path.exists(card_path):
-                card_img = Image.open(card_path)
-                card_img = card_img.resize((card_width, card_height), Image.Resampling.LANCZOS)
-                image.paste(card_img, (x_pos, 0))
-        
+        total_width = len(key) * CARD_WIDTH + (len(key) - 1) * CARD_SPACING
+        image = Image.new('RGBA', (total_width, CARD_HEIGHT), (0, 0, 0, 0))
+
+        for i, (face, hidden) in enumerate(key):
+            tile = CARD_ATLAS.get(CARD_BACK if hidden else face)
+            if tile is not None:
+                image.paste(tile, (i * (CARD_WIDTH + CARD_SPACING), 0))
+
         return image
     except Exception as e:
         print(f"Error creating hand image: {e}")
         return None
 
-def image_to_discord_file(image, filename):
-    """Convert PIL image to Discord file"""
-    if image is None:
+class HandImageCache:
+    """LRU of encoded hand images, bounded by total bytes rather than entry count.
+
+    Keys are tuples of hand keys (one per stacked row), so identical tables
+    across games share one PNG.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: tuple) -> bytes | None:
+        data = self._data.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: tuple, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        old = self._data.pop(key, None)
+        if old is not None:
+            self.bytes -= len(old)
+        self._data[key] = data
+        self.bytes += len(data)
+        while self.bytes > self.max_bytes:
+            _, evicted = self._data.popitem(last=False)
+            self.bytes -= len(evicted)
+
+HAND_CACHE = HandImageCache(HAND_CACHE_BYTES)
+
+def render_hands_png(rows: list[tuple], composites: dict | None = None) -> bytes | None:
+    """Stack one composite per hand key in `rows` (player first) and PNG-encode it.
+
+    `composites` maps role -> (hand key, image) for one game; a row whose key
+    hasn't changed since the last render reuses its image, so only the hand
+    that actually changed is re-composited.
+    """
+    composites = {} if composites is None else composites
+    images = []
+    for role, key in rows:
+        cached = composites.get(role)
+        if cached is not None and cached[0] == key:
+            img = cached[1]
+        else:
+            img = create_hand_image(key)
+            if img is None:
+                continue
+            composites[role] = (key, img)
+        images.append(img)
+    if not images:
         return None
-    
+    image = images[0]
+    if len(images) > 1:
+        height = sum(img.height for img in images) + HAND_GAP * (len(images) - 1)
+        image = Image.new('RGBA', (max(img.width for img in images), height), (0, 0, 0, 0))
+        y = 0
+        for img in images:
+            image.paste(img, (0, y))
+            y += img.height + HAND_GAP
     try:
-        img_bytes = io.BytesIO()
-        image.save(img_bytes, format='PNG')
-        img_bytes.seek(0)
-        return discord.File(img_bytes, filename=filename)
+        buf = io.BytesIO()
+        image.save(buf, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+        return buf.getvalue()
     except Exception as e:
-        print(f"Error converting image to Discord file: {e}")
+        print(f"Error encoding hand image: {e}")
         return None
 
+async def render_hands(rows: list[tuple], composites: dict | None = None) -> discord.File | None:
+    """Serve `rows` from HAND_CACHE, rendering in the thread pool on a miss, as hands.png."""
+    key = tuple(k for _, k in rows)
+    data = HAND_CACHE.get(key)
+    if data is None:
+        loop = asyncio.get_running_loop()
+        data = await loop.run_in_executor(_RENDER_POOL, render_hands_png, rows, composites)
+        if data is None:
+            return None
+        HAND_CACHE.put(key, data)
+    return discord.File(io.BytesIO(data), filename="hands.png")
+
+def _legacy_hand_image(hand):
+    # The pre-atlas path (disk read + LANCZOS per card), kept for the benchmark baseline
+    image = Image.new('RGBA', (len(hand) * CARD_WIDTH + (len(hand) - 1) * CARD_SPACING, CARD_HEIGHT), (0, 0, 0, 0))
+    for i, card in enumerate(hand):
+        path = os.path.join(CARDS_DIR, CARD_IMAGES[card][0])
+        if os.path.exists(path):
+            card_img = Image.open(path).resize((CARD_WIDTH, CARD_HEIGHT), Image.Resampling.LANCZOS)
+            image.paste(card_img, (i * (CARD_WIDTH + CARD_SPACING), 0))
+    return image
+
+def benchmark_render(iterations: int = 50) -> dict:
+    """Time a typical update (3-card player hand + 2-card dealer hand) per stage, in ms."""
+    def _timed(fn) -> list[float]:
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return sorted(samples)
+
+    player = hand_key(CARD_IMAGES[r][0] for r in ('K', '7', 'A'))
+    dealer = hand_key((CARD_IMAGES[r][1] for r in ('10', '6')), hide_second=True)
+    rows = [("player", player), ("dealer", dealer)]
+    composite = create_hand_image(player)
+    game_composites: dict = {}
+    render_hands_png(rows, game_composites)
+    bench_cache = HandImageCache(HAND_CACHE_BYTES)
+    bench_cache.put((player, dealer), b"png")
+    results = {
+        "legacy_composite": _timed(lambda: (_legacy_hand_image(['K', '7', 'A']), _legacy_hand_image(['10', '6']))),
+        "atlas_composite": _timed(lambda: (create_hand_image(player), create_hand_image(dealer))),
+        "png_default": _timed(lambda: composite.save(io.BytesIO(), format='PNG')),
+        "png_fast": _timed(lambda: composite.save(io.BytesIO(), format='PNG', compress_level=PNG_COMPRESS_LEVEL)),
+        "full_update": _timed(lambda: render_hands_png(rows)),
+        # player hand unchanged since the last render, only the stacking + encode remain
+        "reused_update": _timed(lambda: render_hands_png(rows, game_composites)),
+        "cache_hit": _timed(lambda: bench_cache.get((player, dealer))),
+    }
+    pct = lambda s, q: s[min(len(s) - 1, int(q * len(s)))]
+    return {name: {"p50": pct(s, 0.5), "p95": pct(s, 0.95), "max": s[-1]} for name, s in results.items()}
+
 
 class BlackjackView(View):
     def __init__(self, cog: 'Blackjack', interaction: Interaction, wager: int):
@@ -185,8 +345,16 @@ class BlackjackView(View):
         self.cog = cog
         self.ctx = interaction  # original Interaction for edits
         self.wager = wager
-        self.player_hand = [deal_card(), deal_card()]
-        self.dealer_hand = [deal_card(), deal_card()]
+        # Card faces (image files) are picked when dealt so a card keeps its suit all game
+        self.player_hand: list[str] = []
+        self.dealer_hand: list[str] = []
+        self.player_faces: list[str] = []
+        self.dealer_faces: list[str] = []
+        for hand, faces in ((self.player_hand, self.player_faces), (self.dealer_hand, self.dealer_faces)):
+            self.deal_to(hand, faces)
+            self.deal_to(hand, faces)
+        # role -> (hand key, composite image); lets renders skip unchanged hands
+        self._composites: dict = {}
         self.finished = False
         self.doubled = False
         self.message_id: int | None = None  # set after initial send
@@ -201,6 +369,17 @@ class BlackjackView(View):
         if self.dealer_blackjack:
             self.finished = True
 
+    def deal_to(self, hand: list, faces: list):
+        card, face = deal_card(self.ctx.guild.id if self.ctx.guild else None)
+        hand.append(card)
+        faces.append(face)
+
+    def hand_rows(self, include_dealer: bool) -> list[tuple]:
+        rows = [("player", hand_key(self.player_faces))]
+        if include_dealer:
+            rows.append(("dealer", hand_key(self.dealer_faces, hide_second=not self.finished)))
+        return rows
+
     def is_blackjack(self, hand):
         return len(hand) == 2 and hand_value(hand) == 21
 
@@ -211,34 +390,16 @@ class BlackjackView(View):
         else:
             dealer_display = format_hand(self.dealer_hand, hide_second=True)
         
-        # Create hand images
-        player_image = create_hand_image(self.player_hand)
-        dealer_image = create_hand_image(self.dealer_hand, hide_second=not self.finished)
-        
         embed = discord.Embed(title="🂠 Blackjack", color=discord.Color.blurple())
         embed.add_field(name="👤 Your Hand", value=player_display, inline=False)
         embed.add_field(name="🤖 Dealer's Hand", value=dealer_display, inline=False)
         
-        # Attach hand images if available
+        # Hand image: both hands stacked once the game is finished, otherwise only the player's
         files = []
-        if player_image:
+        hands_file = await render_hands(self.hand_rows(include_dealer=self.finished), self._composites)
+        if hands_file:
             embed.set_image(url="attachment://hands.png")
-            # Combine both hands into one image
-            if dealer_image and self.finished:
-                # Stack images vertically when game is finished
-                total_height = player_image.height + dealer_image.height + 20
-                total_width = max(player_image.width, dealer_image.width)
-                combined = Image.new('RGBA', (total_width, total_height), (0, 0, 0, 0))
-                combined.paste(player_image, (0, 0))
-                combined.paste(dealer_image, (0, player_image.height + 20))
-                combined_file = image_to_discord_file(combined, "hands.png")
-                if combined_file:
-                    files.append(combined_file)
-            else:
-                # Show only player hand
-                player_file = image_to_discord_file(player_image, "hands.png")
-                if player_file:
-                    files.append(player_file)
+            files.append(hands_file)
         
         embed.set_footer(text=f"Wager: {self.wager}")
         
@@ -307,7 +468,7 @@ class BlackjackView(View):
         self.finished = True
         uid = str(self.ctx.user.id)
         guild_id = str(self.ctx.guild.id) if self.ctx.guild else None
-        add_currency(uid, self.wager, guild_id=guild_id)
+        add_currency(uid, self.wager, guild_id=guild_id, source="blackjack")
         # Attempt to notify user if possible
         try:
             embed = discord.Embed(title="Blackjack Closed", description=f"Game closed due to {reason}. Wager refunded ({self.wager}).", color=discord.Color.orange())
@@ -338,7 +499,7 @@ class BlackjackView(View):
             await interaction.response.defer()
             return
         
-        self.player_hand.append(deal_card())
+        self.deal_to(self.player_hand, self.player_faces)
         if hand_value(self.player_hand) > 21:
             self.finished = True
             await self.update(interaction)
@@ -353,8 +514,8 @@ class BlackjackView(View):
             return
         
         # Dealer plays
-        while hand_value(self.dealer_hand) < 17:
-            self.dealer_hand.append(deal_card())
+        while hand_value(self.dealer_hand) < DEALER_STAND:
+            self.deal_to(self.dealer_hand, self.dealer_faces)
         
         self.finished = True
         await self.update(interaction)
@@ -377,16 +538,16 @@ class BlackjackView(View):
             return
         
         # Double the wager and remove from balance
-        remove_currency(uid, self.wager, guild_id=guild_id)
+        remove_currency(uid, self.wager, guild_id=guild_id, source="blackjack")
         self.wager *= 2
         self.doubled = True
         
         # Deal one card and stand
-        self.player_hand.append(deal_card())
+        self.deal_to(self.player_hand, self.player_faces)
         
         # Dealer plays
-        while hand_value(self.dealer_hand) < 17:
-            self.dealer_hand.append(deal_card())
+        while hand_value(self.dealer_hand) < DEALER_STAND:
+            self.deal_to(self.dealer_hand, self.dealer_faces)
         
         self.finished = True
         await self.update(interaction)
@@ -411,7 +572,7 @@ class BlackjackView(View):
             # Dealer busted, player wins
             if p_blackjack and not self.doubled:
                 # Natural blackjack pays 3:2
-                payout = int(self.wager * 2.5)
+                payout = int(self.wager * BLACKJACK_RETURN)
                 message += f"Blackjack! You win {payout} coins!"
             else:
                 # Regular win pays 1:1
@@ -423,7 +584,7 @@ class BlackjackView(View):
             message += f"Both have blackjack! Push. {payout} coins returned."
         elif p_blackjack and not d_blackjack:
             # Player blackjack wins 3:2
-            payout = int(self.wager * 2.5)
+            payout = int(self.wager * BLACKJACK_RETURN)
             message += f"Blackjack! You win {payout} coins!"
         elif d_blackjack and not p_blackjack:
             # Dealer blackjack wins
@@ -441,7 +602,14 @@ class BlackjackView(View):
             message += f"Dealer wins! You lose {self.wager} coins."
         
         if payout > 0:
-            add_currency(uid, payout, guild_id=guild_id)
+            add_currency(uid, payout, guild_id=guild_id, source="blackjack")
+        if payout > self.wager:
+            result = "win"
+        elif payout == self.wager:
+            result = "push"
+        else:
+            result = "loss"
+        self.cog.record_hand(guild_id, uid, self.wager, payout, result, p_blackjack, self.doubled)
         
         # Send the result message as embed
         if ("you win" in message.lower() or "blackjack!" in message.lower() or 
@@ -501,31 +669,20 @@ class Blackjack(commands.Cog):
         # Track active blackjack games to prevent GC + duplicate games
         # key: user_id (str) -> BlackjackView
         self.active_games: dict[str, BlackjackView] = {}
-        # Per-user cooldown tracking for starting new hands
-        self._last_hand_at: dict[str, datetime] = {}
-        # Blackjack persistent stats
-        self.stats_file = "blackjackstats.json"
-        self.stats = self._load_stats()
-        self.SESSION_TIMEOUT = timedelta(minutes=30)
         # Shared casino config file (used by slots too)
         self._cfg_file = "casino_config.json"
-
-    # ---- Blackjack Stats Persistence ----
-    def _load_stats(self):
-        if os.path.exists(self.stats_file):
-            try:
-                with open(self.stats_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception:
-                return {"guilds": {}}
-        return {"guilds": {}}
-
-    def _save_stats(self):
-        try:
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=4)
-        except Exception:
-            pass
+        # Per-user cooldown for starting new hands (shared engine; guild overrides seeded once)
+        cooldowns.register("blackjack", 15)
+        for gid, cfg in self._load_cfg().get("guilds", {}).items():
+            if "blackjack_cooldown" in cfg:
+                cooldowns.set_window("blackjack", gid, self.get_blackjack_cooldown_seconds(gid))
+        # Pre-scale every card once; hands are composited from these tiles
+        loaded = load_card_atlas()
+        print(f"[BLACKJACK] Card atlas: {loaded} tile(s) loaded")
+
+    def cog_unload(self):
+        casino_stats.flush()
+        _RENDER_POOL.shutdown(wait=False)
 
     # ---- Config helpers (shared with slots) ----
     def _load_cfg(self):
@@ -581,76 +738,19 @@ class Blackjack(commands.Cog):
         except Exception:
             return 15
 
-    def _bj_cooldown_remaining(self, uid: str, cooldown_sec: int) -> int:
-        last = self._last_hand_at.get(uid)
-        if not last:
-            return 0
-        try:
-            elapsed = (datetime.utcnow() - last).total_seconds()
-            rem = cooldown_sec - elapsed
-            if rem <= 0:
-                return 0
-            return int(rem) if float(rem).is_integer() else int(rem) + 1
-        except Exception:
-            return 0
-
-    def _ensure_user(self, guild_id: str, user_id: str):
-        g = self.stats.setdefault("guilds", {}).setdefault(str(guild_id), {})
-        u = g.setdefault(user_id, {
-            "hands": 0,
+    # Per-user totals and daily rollups live in utils.casino_stats (flushed in batches)
+    def record_hand(self, guild_id: str | None, user_id: str, wager: int, payout: int, result: str, player_blackjack: bool, doubled: bool):
+        if not guild_id:
+            return  # only track per guild
+        u = casino_stats.record("blackjack", guild_id, user_id, wager, payout, {
             "wins": 0,
             "losses": 0,
             "pushes": 0,
             "blackjacks": 0,
             "doubles": 0,
-            "bet_total": 0,
-            "win_total": 0,
-            "net": 0,
             "biggest_win": 0,
             "biggest_wager": 0,
-            "last_play": None,
-            "session_baseline": None,
         })
-        return u
-
-    def _maybe_reset_session(self, u: dict):
-        last_play = u.get("last_play")
-        if not last_play:
-            return
-        try:
-            last_dt = datetime.fromisoformat(last_play)
-        except Exception:
-            return
-        if datetime.utcnow() - last_dt > self.SESSION_TIMEOUT:
-            # Reset the session baseline to current totals
-            u["session_baseline"] = {
-                "hands": u.get("hands", 0),
-                "bet_total": u.get("bet_total", 0),
-                "win_total": u.get("win_total", 0),
-                "net": u.get("net", 0),
-            }
-
-    def _ensure_baseline(self, u: dict):
-        if u.get("session_baseline") is None:
-            u["session_baseline"] = {
-                "hands": u.get("hands", 0),
-                "bet_total": u.get("bet_total", 0),
-                "win_total": u.get("win_total", 0),
-                "net": u.get("net", 0),
-            }
-
-    def record_hand(self, guild_id: str | None, user_id: str, wager: int, payout: int, result: str, player_blackjack: bool, doubled: bool):
-        if not guild_id:
-            return  # only track per guild
-        u = self._ensure_user(guild_id, user_id)
-        # Possibly reset session
-        self._maybe_reset_session(u)
-        self._ensure_baseline(u)
-        u["hands"] += 1
-        u["bet_total"] += wager
-        u["win_total"] += payout
-        net = payout - wager
-        u["net"] += net
         if wager > u.get("biggest_wager", 0):
             u["biggest_wager"] = wager
         if payout - wager > u.get("biggest_win", 0):  # biggest positive profit from a hand
@@ -665,11 +765,10 @@ class Blackjack(commands.Cog):
             u["blackjacks"] += 1
         if doubled:
             u["doubles"] += 1
-        u["last_play"] = datetime.utcnow().isoformat()
-        self._save_stats()
+        rtp_monitor.observe(guild_id, "blackjack", wager, payout, EXPECTED_RTP)
 
     def get_user_stats(self, guild_id: str, user_id: str):
-        return self.stats.get("guilds", {}).get(str(guild_id), {}).get(user_id)
+        return casino_stats.get_user("blackjack", guild_id, user_id)
 
     # ---- Active game management ----
     def register_game(self, user_id: str, view: BlackjackView):
@@ -725,8 +824,8 @@ class Blackjack(commands.Cog):
             await interaction.response.send_message(embed=discord.Embed(title="❌ Insufficient Funds", description=f"You tried to pay {amount} but only have {sender_balance} coins.", color=discord.Color.red()), ephemeral=True)
             return
         # Perform transfer atomically (read -> validate -> write both)
-        remove_currency(sender_id, amount, guild_id=guild_id)
-        add_currency(receiver_id, amount, guild_id=guild_id)
+        remove_currency(sender_id, amount, guild_id=guild_id, source="transfer")
+        add_currency(receiver_id, amount, guild_id=guild_id, source="transfer")
         sender_after = get_balance(sender_id, guild_id=guild_id)
         receiver_after = get_balance(receiver_id, guild_id=guild_id)
         embed = discord.Embed(
@@ -754,7 +853,7 @@ class Blackjack(commands.Cog):
             return
         guild_id = str(guild.id)
         receiver_id = str(user.id)
-        add_currency(receiver_id, int(amount), guild_id=guild_id)
+        add_currency(receiver_id, int(amount), guild_id=guild_id, source="admin")
         receiver_after = get_balance(receiver_id, guild_id=guild_id)
         embed = discord.Embed(title="✅ Coins Added", description=f"{user.mention} received **{amount}** coins.", color=discord.Color.green())
         embed.add_field(name=f"{user.display_name}'s New Balance", value=f"{receiver_after} coins", inline=True)
@@ -773,8 +872,7 @@ class Blackjack(commands.Cog):
         # Cooldown: per-guild configurable, minimum 10 seconds
         try:
             guild_id = str(interaction.guild.id) if interaction.guild else None
-            cd = self.get_blackjack_cooldown_seconds(guild_id)
-            remaining = self._bj_cooldown_remaining(uid, cd)
+            remaining = math.ceil(cooldowns.remaining("blackjack", uid, guild_id))
             if remaining > 0:
                 await interaction.response.send_message(
                     embed=discord.Embed(
@@ -799,36 +897,26 @@ class Blackjack(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         # remove wager upfront
-        if not remove_currency(uid, wager, guild_id=guild_id):
+        if not remove_currency(uid, wager, guild_id=guild_id, source="blackjack"):
             embed = discord.Embed(title="❌ Wager Failed", description="Failed to place wager (insufficient funds).", color=discord.Color.red())
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         # Record cooldown start only after a wager is successfully placed
-        self._last_hand_at[uid] = datetime.utcnow()
+        cooldowns.trigger("blackjack", uid, guild_id)
         
         view = BlackjackView(self, interaction, wager)
 
-        # Create initial hand images
-        player_image = create_hand_image(view.player_hand)
-        dealer_image = create_hand_image(view.dealer_hand, hide_second=True)
-
         embed = discord.Embed(title="🂠 Blackjack", color=discord.Color.blurple())
         embed.add_field(name="👤 Your Hand", value=format_hand_with_total(view.player_hand), inline=False)
         embed.add_field(name="🤖 Dealer's Hand", value=format_hand(view.dealer_hand, hide_second=True), inline=False)
         embed.set_footer(text=f"Wager: {wager}")
 
-        # Add combined image if available
+        # Add combined image if available (rendered off the event loop)
         files = []
-        if player_image and dealer_image:
-            total_height = player_image.height + dealer_image.height + 20
-            total_width = max(player_image.width, dealer_image.width)
-            combined = Image.new('RGBA', (total_width, total_height), (0, 0, 0, 0))
-            combined.paste(player_image, (0, 0))
-            combined.paste(dealer_image, (0, player_image.height + 20))
+        hands_file = await render_hands(view.hand_rows(include_dealer=True), view._composites)
+        if hands_file:
             embed.set_image(url="attachment://hands.png")
-            combined_file = image_to_discord_file(combined, "hands.png")
-            if combined_file:
-                files.append(combined_file)
+            files.append(hands_file)
 
         # Send initial embed without the view to avoid early interaction/view init races
         if files:
@@ -858,6 +946,109 @@ class Blackjack(commands.Cog):
 
     # Store wager on view for stats usage later (already exists as self.wager)
 
+    @app_commands.command(name="blackjacksim", description="Owner only: Simulate blackjack hands to estimate house edge (no balance impact)")
+    @app_commands.describe(hands="Number of simulated hands (10000-5000000)", strategy="Player strategy to simulate")
+    @app_commands.choices(strategy=[
+        app_commands.Choice(name="Basic strategy", value="basic"),
+        app_commands.Choice(name="Mimic the dealer", value="mimic"),
+        app_commands.Choice(name="Never bust", value="never_bust"),
+    ])
+    async def blackjacksim(self, interaction: Interaction,
+                           hands: app_commands.Range[int, 10_000, 5_000_000] = 1_000_000,
+                           strategy: app_commands.Choice[str] = None):
+        if interaction.user.id != BOT_OWNER_ID:
+            await interaction.response.send_message("❌ You are not authorized to use /blackjacksim.", ephemeral=True)
+            return
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        strat = strategy.value if strategy else "basic"
+        strat_name = strategy.name if strategy else "Basic strategy"
+        rules = {"dealer_stand": DEALER_STAND, "blackjack_return": BLACKJACK_RETURN, "shoe_copies": SHOE_COPIES}
+        sizes = split_chunks(hands, BJ_SIM_CHUNK)
+        jobs = [(rules, strat, n, seed) for n, seed in zip(sizes, new_seeds(len(sizes)))]
+        started = time.perf_counter()
+        progress = {"hands": 0, "last_edit": started}
+
+        async def on_progress(done: int, res: dict):
+            progress["hands"] += res["hands"]
+            now = time.perf_counter()
+            if done < len(jobs) and now - progress["last_edit"] >= 1.0:
+                progress["last_edit"] = now
+                try:
+                    await interaction.edit_original_response(content=f"🂠 Simulating… {progress['hands']:,}/{hands:,} hands")
+                except Exception:
+                    pass
+
+        try:
+            results = await run_chunked(simulate_blackjack_chunk, jobs, on_progress)
+        except Exception as e:
+            await interaction.followup.send(f"⚠️ Simulation failed: {e}", ephemeral=True)
+            return
+        elapsed = time.perf_counter() - started
+        t = {key: sum(r[key] for r in results) for key in results[0]}
+
+        def _mean_ci(total2: int, sq2: int, n: int) -> tuple[float, float]:
+            # Results are tallied in half-wager units; returns (mean, 95% half-width) per initial wager
+            if n == 0:
+                return 0.0, 0.0
+            mean = total2 / 2 / n
+            var = max(0.0, sq2 / 4 / n - mean * mean)
+            return mean, 1.96 * math.sqrt(var / n)
+
+        def _rate_ci(k: int, n: int) -> tuple[float, float]:
+            p = k / n if n else 0.0
+            return p * 100, 1.96 * math.sqrt(p * (1 - p) / n) * 100 if n else 0.0
+
+        n = t["hands"]
+        ev, ev_ci = _mean_ci(t["net2"], t["net2_sq"], n)
+        bj, bj_ci = _rate_ci(t["naturals"], n)
+        dbl, dbl_ci = _mean_ci(t["double_net2"], t["double_net2_sq"], t["doubles"])
+        desc = (
+            f"Strategy: **{strat_name}**\n"
+            f"Hands: {n:,} ({elapsed:.2f}s, {len(jobs)} chunk(s))\n"
+            f"Rules: {SHOE_COPIES // 4} decks, dealer stands on {DEALER_STAND}, blackjack pays {BLACKJACK_RETURN - 1:g}:1, no splits\n\n"
+            f"**House Edge:** {-ev * 100:.3f}% ± {ev_ci * 100:.3f}%\n"
+            f"**RTP:** {(1 + ev) * 100:.3f}%\n"
+            f"**Blackjack Frequency:** {bj:.3f}% ± {bj_ci:.3f}% (dealer {t['dealer_naturals'] / n * 100:.3f}%)\n"
+            f"**Win / Push / Loss:** {t['wins'] / n * 100:.2f}% / {t['pushes'] / n * 100:.2f}% / {t['losses'] / n * 100:.2f}%\n"
+            f"**Player Bust Rate:** {t['busts'] / n * 100:.2f}%\n"
+        )
+        if t["doubles"]:
+            desc += f"**Doubles:** {t['doubles'] / n * 100:.2f}% of hands, EV {dbl:+.4f} ± {dbl_ci:.4f} per initial wager"
+        else:
+            desc += "**Doubles:** never (strategy doesn't double)"
+        embed = discord.Embed(title="🂠 Blackjack Simulation", description=desc, color=discord.Color.blurple())
+        embed.set_footer(text="Intervals are 95% confidence (normal approximation)")
+        await interaction.edit_original_response(content=None, embed=embed)
+
+    @app_commands.command(name="blackjackbench", description="Owner only: Benchmark blackjack hand rendering latency")
+    @app_commands.describe(iterations="Renders per stage (5-500)")
+    async def blackjackbench(self, interaction: Interaction, iterations: app_commands.Range[int, 5, 500] = 50):
+        if interaction.user.id != BOT_OWNER_ID:
+            await interaction.response.send_message("❌ You are not authorized to use /blackjackbench.", ephemeral=True)
+            return
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(_RENDER_POOL, benchmark_render, iterations)
+        labels = {
+            "legacy_composite": "Disk + resize (old)",
+            "atlas_composite": "Atlas composite",
+            "png_default": "PNG encode (default)",
+            "png_fast": f"PNG encode (level {PNG_COMPRESS_LEVEL})",
+            "full_update": "Full update render",
+            "reused_update": "Update, unchanged hands reused",
+            "cache_hit": "Encoded cache hit",
+        }
+        lines = [f"**{labels[name]}:** p50 {r['p50']:.2f}ms | p95 {r['p95']:.2f}ms | max {r['max']:.2f}ms" for name, r in results.items()]
+        lookups = HAND_CACHE.hits + HAND_CACHE.misses
+        hit_rate = (HAND_CACHE.hits / lookups * 100) if lookups else 0
+        lines.append(f"\n**Hand cache:** {len(HAND_CACHE)} image(s), {HAND_CACHE.bytes / 1024:.0f}/{HAND_CACHE.max_bytes / 1024:.0f} KB, {hit_rate:.1f}% hit rate ({lookups} lookups)")
+        embed = discord.Embed(
+            title="🂠 Blackjack Render Benchmark",
+            description=f"{iterations} iteration(s) per stage, {len(CARD_ATLAS)} cached tile(s)\n\n" + "\n".join(lines),
+            color=discord.Color.blurple()
+        )
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
     @app_commands.command(name="balancetop", description="Show the top balances in this server (10 per page).")
     @app_commands.describe(page="Page number to view (default 1)")
     async def balancetop(self, interaction: Interaction, page: int = 1):
@@ -909,6 +1100,7 @@ class Blackjack(commands.Cog):
         cfg = self._get_guild_cfg(str(guild.id))
         cfg["blackjack_cooldown"] = int(seconds)
         self._set_guild_cfg(str(guild.id), cfg)
+        cooldowns.set_window("blackjack", guild.id, seconds)
         await interaction.response.send_message(embed=discord.Embed(title="✅ Blackjack Cooldown Set", description=f"Blackjack hand cooldown set to {seconds}s.", color=discord.Color.green()), ephemeral=True)
 
 
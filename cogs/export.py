@@ -0,0 +1,146 @@
+import discord
+from discord.ext import commands
+from discord import app_commands, Interaction, Embed
+import asyncio
+import csv
+import gzip
+import json
+import os
+import tempfile
+import time
+from typing import Iterable, Iterator
+
+from utils.economy import get_guild_balances
+from utils.botadmin import is_bot_admin
+from utils.debug import debug_command
+
+# Column layout per dataset (also the JSONL keys)
+EXPORT_COLUMNS = {
+    "economy": ["user_id", "balance"],
+    "xp": ["user_id", "level", "xp"],
+    "inventory": ["user_id", "item", "quantity"],
+}
+
+
+# ---------- Row generators (operate on a snapshot, never on live stores) ----------
+
+def economy_rows(balances: dict) -> Iterator[list]:
+    for uid, bal in balances.items():
+        yield [uid, int(bal)]
+
+
+def xp_rows(xp_guild: dict) -> Iterator[list]:
+    for uid, data in xp_guild.items():
+        yield [uid, int(data.get("level", 1)), int(data.get("xp", 0))]
+
+
+def inventory_rows(inv_guild: dict) -> Iterator[list]:
+    for uid, owned in inv_guild.items():
+        for item, count in owned.items():
+            yield [uid, item, int(count)]
+
+
+def write_export(path: str, columns: list[str], rows: Iterable[list], fmt: str) -> int:
+    """Stream rows into a gzip-compressed CSV or JSONL file. Returns the row count.
+
+    Rows are consumed one at a time, so the output side holds only the
+    compressor's buffer however many rows there are. The rows themselves
+    come from whatever the generator reads (see Export._snapshot).
+    """
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                count += 1
+        else:
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+                f.write("\n")
+                count += 1
+    return count
+
+
+class Export(commands.Cog):
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+
+    def _snapshot(self, dataset: str, guild_id: str) -> Iterator[list]:
+        """Take a point-in-time copy of the store on the event loop.
+
+        Copying here (before handing off to the worker thread) means commands
+        that mutate balances/XP/inventories while the file is being written
+        can't produce a half-updated export. The copy costs memory in
+        proportion to the guild's rows; only the compressed output buffer
+        stays flat.
+        """
+        if dataset == "economy":
+            return economy_rows(get_guild_balances(guild_id))
+        if dataset == "xp":
+            xp_cog = self.bot.get_cog("XP")
+            xp_guild = getattr(xp_cog, "xp_data", {}).get(guild_id, {}) if xp_cog else {}
+            return xp_rows({uid: dict(data) for uid, data in xp_guild.items()})
+        shop_cog = self.bot.get_cog("Shop")
+        inv_guild = shop_cog._get_inventory(guild_id) if shop_cog else {}
+        return inventory_rows({uid: dict(owned) for uid, owned in inv_guild.items()})
+
+    @app_commands.command(name="export", description="Bot-admin: Export this server's balances, XP or inventories as a gzip file")
+    @app_commands.describe(dataset="Which data to export", fmt="File format")
+    @app_commands.choices(
+        dataset=[
+            app_commands.Choice(name="Balances", value="economy"),
+            app_commands.Choice(name="XP & Levels", value="xp"),
+            app_commands.Choice(name="Shop Inventories", value="inventory"),
+        ],
+        fmt=[
+            app_commands.Choice(name="CSV", value="csv"),
+            app_commands.Choice(name="JSON Lines", value="jsonl"),
+        ],
+    )
+    @app_commands.rename(fmt="format")
+    async def export(self, interaction: Interaction, dataset: app_commands.Choice[str], fmt: app_commands.Choice[str] = None):
+        debug_command("export", interaction.user, interaction.guild, dataset=dataset.value, fmt=(fmt.value if fmt else "csv"))
+        if not isinstance(interaction.user, discord.Member) or not is_bot_admin(interaction.user):
+            await interaction.response.send_message("❌ You do not have permission to use this command.", ephemeral=True)
+            return
+        guild = interaction.guild
+        gid = str(guild.id)
+        ext = fmt.value if fmt else "csv"
+        await interaction.response.defer(thinking=True, ephemeral=True)
+
+        rows = self._snapshot(dataset.value, gid)
+        columns = EXPORT_COLUMNS[dataset.value]
+        fd, path = tempfile.mkstemp(prefix=f"export_{gid}_", suffix=f".{ext}.gz")
+        os.close(fd)
+        try:
+            started = time.perf_counter()
+            count = await asyncio.to_thread(write_export, path, columns, rows, ext)
+            elapsed = time.perf_counter() - started
+            size = os.path.getsize(path)
+            if size > guild.filesize_limit:
+                await interaction.followup.send(embed=Embed(
+                    title="❌ Export Too Large",
+                    description=f"The compressed export is {size / 1_048_576:.1f} MB, above this server's upload limit.",
+                    color=discord.Color.red()
+                ), ephemeral=True)
+                return
+            filename = f"{dataset.value}_{gid}_{time.strftime('%Y%m%d')}.{ext}.gz"
+            embed = Embed(
+                title="📦 Export Ready",
+                description=f"**{dataset.name}** — {count:,} row(s), {size / 1024:.1f} KB compressed ({elapsed:.2f}s).",
+                color=discord.Color.green()
+            )
+            await interaction.followup.send(embed=embed, file=discord.File(path, filename=filename), ephemeral=True)
+        except Exception as e:
+            await interaction.followup.send(embed=Embed(title="⚠️ Export Failed", description=str(e), color=discord.Color.red()), ephemeral=True)
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(Export(bot))
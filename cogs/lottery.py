@@ -1,15 +1,43 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands, Interaction
 from discord.ui import View, button
 import asyncio
+import heapq
+import json
+import os
+import random
 import re
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from utils.economy import get_balance, add_currency, remove_currency
+from utils.economy import get_balance, escrow_hold, escrow_holds, escrow_release, escrow_refund, flush_economy
 from utils.botadmin import is_bot_admin
 
+LOTTERY_FILE = "lotteries.json"
+# Buy-ins are escrowed in memory and committed to economy.json this often (seconds)
+ESCROW_COMMIT_INTERVAL = 10
+
+
+def load_lotteries() -> dict:
+    if os.path.exists(LOTTERY_FILE):
+        try:
+            with open(LOTTERY_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+    return {}
+
+
+def save_lotteries(data: dict):
+    try:
+        with open(LOTTERY_FILE, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+    except Exception as e:
+        print(f"[LOTTERY] Failed to save {LOTTERY_FILE}: {e}")
+
 
 def parse_duration_str(s: str) -> Optional[timedelta]:
     if not s:
@@ -31,25 +59,40 @@ def parse_duration_str(s: str) -> Optional[timedelta]:
 
 
 class LotteryView(View):
-    def __init__(self, cog: 'Lottery', guild: discord.Guild, channel: discord.TextChannel, buy_in: int, end_at: datetime):
+    def __init__(self, cog: 'Lottery', guild: discord.Guild, channel: discord.TextChannel, buy_in: int, end_at: datetime, escrow_id: str):
         super().__init__(timeout=None)
         self.cog = cog
         self.guild = guild
         self.channel = channel
         self.buy_in = int(buy_in)
         self.end_at = end_at
+        # Buy-ins are held in this escrow until the draw (or a refund)
+        self.escrow_id = escrow_id
         self.message_id: Optional[int] = None
-        self.participants: set[str] = set()
+        # Rebuilt from the escrow ledger on restart
+        self.participants: set[str] = set(escrow_holds(escrow_id))
         self.finished: bool = False
 
+    @property
+    def end_ts(self) -> int:
+        return int(self.end_at.replace(tzinfo=timezone.utc).timestamp())
+
+    def to_state(self) -> dict:
+        return {
+            "channel_id": self.channel.id,
+            "message_id": self.message_id,
+            "buy_in": self.buy_in,
+            "end_at": self.end_ts,
+            "escrow_id": self.escrow_id,
+        }
+
     def make_embed(self) -> discord.Embed:
         pool = self.buy_in * len(self.participants)
-        ends = int(self.end_at.replace(tzinfo=timezone.utc).timestamp())
         desc = (
             f"Buy-in: **{self.buy_in}** coins\n"
             f"Participants: **{len(self.participants)}**\n"
             f"Pool: **{pool}** coins\n"
-            f"Ends: <t:{ends}:R>"
+            f"Ends: <t:{self.end_ts}:R>"
         )
         emb = discord.Embed(title="🎟️ Lottery", description=desc, color=discord.Color.gold())
         return emb
@@ -71,20 +114,18 @@ class LotteryView(View):
         except Exception:
             pass
 
-        # Determine winner
-        participants = list(self.participants)
-        guild_id = str(self.guild.id)
+        # Determine winner from the escrow ledger (the source of truth for who paid)
+        participants = list(escrow_holds(self.escrow_id))
         if not participants:
+            escrow_refund(self.escrow_id)
             try:
                 await self.channel.send(embed=discord.Embed(title="😕 No Entries", description="The lottery ended with no participants.", color=discord.Color.dark_gray()))
             except Exception:
                 pass
             return
 
-        import random
         winner_id = random.choice(participants)
-        pool = self.buy_in * len(participants)
-        add_currency(winner_id, pool, guild_id=guild_id)
+        pool = escrow_release(self.escrow_id, winner_id)
 
         winner_mention = f"<@{winner_id}>"
         emb = discord.Embed(title="🎉 Lottery Winner!", description=f"{winner_mention} won the lottery!! They won **{pool}** coins!!", color=discord.Color.green())
@@ -101,7 +142,7 @@ class LotteryView(View):
         except Exception:
             pass
 
-    @button(label="Buy-in", style=discord.ButtonStyle.green)
+    @button(label="Buy-in", style=discord.ButtonStyle.green, custom_id="lottery:buy_in")
     async def buy_in_button(self, interaction: Interaction, button: discord.ui.Button):
         # Ensure still open
         if self.finished or datetime.utcnow() >= self.end_at:
@@ -120,8 +161,8 @@ class LotteryView(View):
         if bal < self.buy_in:
             await interaction.response.send_message(embed=discord.Embed(title="❌ Insufficient Funds", description=f"You need {self.buy_in} coins to join but only have {bal}.", color=discord.Color.red()), ephemeral=True)
             return
-        # Charge buy-in
-        if not remove_currency(uid, self.buy_in, guild_id=guild_id):
+        # Move the buy-in into escrow (committed with the next batch)
+        if not escrow_hold(self.escrow_id, uid, self.buy_in, guild_id=guild_id):
             await interaction.response.send_message(embed=discord.Embed(title="❌ Buy-in Failed", description="Failed to process your buy-in. Please try again.", color=discord.Color.red()), ephemeral=True)
             return
         self.participants.add(uid)
@@ -139,9 +180,91 @@ class LotteryView(View):
 class Lottery(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # Track one active lottery per guild
-        # guild_id -> { 'view': LotteryView, 'task': asyncio.Task }
-        self.active: dict[str, dict] = {}
+        # Track one active lottery per guild: guild_id -> LotteryView
+        self.active: dict[str, LotteryView] = {}
+        # Persisted state, guild_id -> LotteryView.to_state()
+        self.state: dict[str, dict] = load_lotteries()
+        # Single timer for every draw: heap of (end epoch, guild_id)
+        self._timers: list[tuple[int, str]] = []
+        self._wake = asyncio.Event()
+        self._timer_task: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        self.commit_escrow.start()
+        self._timer_task = asyncio.create_task(self._run_timers())
+        self._restore_task = asyncio.create_task(self._restore())
+
+    def cog_unload(self):
+        self.commit_escrow.cancel()
+        if self._timer_task:
+            self._timer_task.cancel()
+        flush_economy()
+
+    @tasks.loop(seconds=ESCROW_COMMIT_INTERVAL)
+    async def commit_escrow(self):
+        try:
+            flush_economy()
+        except Exception as e:
+            print(f"[LOTTERY] Escrow commit failed: {e}")
+
+    # ---- Timers ----
+    def _schedule(self, view: LotteryView):
+        heapq.heappush(self._timers, (view.end_ts, str(view.guild.id)))
+        self._wake.set()
+
+    async def _run_timers(self):
+        while True:
+            self._wake.clear()
+            if not self._timers:
+                await self._wake.wait()
+                continue
+            delay = self._timers[0][0] - time.time()
+            if delay > 0:
+                try:
+                    # Woken early whenever a new draw is scheduled
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, guild_id = heapq.heappop(self._timers)
+            view = self.active.get(guild_id)
+            if view is None or view.finished:
+                continue
+            try:
+                await view.end_and_award()
+            except Exception as e:
+                print(f"[LOTTERY] Draw failed for guild {guild_id}: {e}")
+            finally:
+                self._forget(guild_id)
+
+    def _forget(self, guild_id: str):
+        self.active.pop(guild_id, None)
+        if self.state.pop(guild_id, None) is not None:
+            save_lotteries(self.state)
+
+    # ---- Restart recovery ----
+    async def _restore(self):
+        await self.bot.wait_until_ready()
+        for guild_id, st in list(self.state.items()):
+            escrow_id = st.get("escrow_id")
+            channel = self.bot.get_channel(int(st.get("channel_id") or 0))
+            guild = getattr(channel, "guild", None)
+            if not escrow_id or not isinstance(channel, discord.TextChannel) or guild is None:
+                # Channel or server is gone: the draw can't be announced, give everyone their coins back
+                refunded = escrow_refund(escrow_id) if escrow_id else 0
+                print(f"[LOTTERY] Refunded {refunded} coins from unrecoverable lottery in guild {guild_id}")
+                self._forget(guild_id)
+                continue
+            end_at = datetime.utcfromtimestamp(int(st["end_at"]))
+            view = LotteryView(self, guild, channel, int(st["buy_in"]), end_at, escrow_id)
+            view.message_id = st.get("message_id")
+            view._update_buttons()
+            if view.message_id:
+                self.bot.add_view(view, message_id=int(view.message_id))
+            self.active[guild_id] = view
+            self._schedule(view)
+        if self.active:
+            print(f"[LOTTERY] Restored {len(self.active)} active lotteries")
 
     @app_commands.command(name="lottery", description="Start a server lottery (bot-admin only)")
     @app_commands.describe(buy_in="Buy-in amount per user (coins)", duration="Duration (e.g. 15m, 2h, 1d, or combos like 1h30m)")
@@ -155,7 +278,7 @@ class Lottery(commands.Cog):
             return
         guild = interaction.guild
         guild_id = str(guild.id)
-        if guild_id in self.active:
+        if guild_id in self.active or guild_id in self.state:
             await interaction.response.send_message("⚠️ There is already an active lottery in this server.", ephemeral=True)
             return
 
@@ -169,7 +292,8 @@ class Lottery(commands.Cog):
             return
 
         end_at = datetime.utcnow() + td
-        view = LotteryView(self, guild, interaction.channel, int(buy_in), end_at)
+        escrow_id = f"lottery:{guild_id}:{int(time.time())}"
+        view = LotteryView(self, guild, interaction.channel, int(buy_in), end_at, escrow_id)
 
         embed = view.make_embed()
         await interaction.response.send_message(embed=embed, view=view)
@@ -179,16 +303,10 @@ class Lottery(commands.Cog):
         except Exception:
             view.message_id = None
 
-        # Schedule end task
-        async def _end_after_delay():
-            try:
-                await asyncio.sleep(td.total_seconds())
-                await view.end_and_award()
-            finally:
-                self.active.pop(guild_id, None)
-
-        task = asyncio.create_task(_end_after_delay())
-        self.active[guild_id] = {"view": view, "task": task}
+        self.active[guild_id] = view
+        self.state[guild_id] = view.to_state()
+        save_lotteries(self.state)
+        self._schedule(view)
 
 
 async def setup(bot: commands.Bot):
@@ -176,8 +176,9 @@ class Misc(commands.Cog):
         music_embed.add_field(name="/play <url>", value="Plays a song or playlist from the given URL.", inline=False)
         music_embed.add_field(name="/queue", value="Shows the current music queue.", inline=False)
         music_embed.add_field(name="/skip", value="Skips the current song.", inline=False)
-        music_embed.add_field(name="/stop", value="Pauses the music.", inline=False)
+        music_embed.add_field(name="/stop", value="Pauses the music and stops loading a playlist.", inline=False)
         music_embed.add_field(name="/start", value="Resumes paused music.", inline=False)
+        music_embed.add_field(name="/resume", value="Picks up the queue and track that were playing before the bot restarted.", inline=False)
         music_embed.add_field(name="/leave", value="Clears the queue and makes the bot leave the voice channel.", inline=False)
         music_embed.add_field(name="/playplaylist <name>", value="Play a previously saved playlist.", inline=False)
         music_embed.add_field(name="/saveplaylist <name> <link>", value="Save a playlist link under a custom name.", inline=False)
@@ -189,6 +190,7 @@ class Misc(commands.Cog):
         music_embed.add_field(name="/cleardj", value="Remove the configured DJ role restriction.", inline=False)
         music_embed.add_field(name="/djinfo", value="Show the current DJ role configuration.", inline=False)
         music_embed.add_field(name="/refresh_cookies", value="Owner only: Run refresh_cookies.py and sync cookies for YouTube playback.", inline=False)
+        music_embed.add_field(name="/musicstats", value="Owner only: Stream cache hit rate and playback metrics.", inline=False)
         pages.append(music_embed)
 
         # Gambling
@@ -197,15 +199,25 @@ class Misc(commands.Cog):
         gambling_embed.add_field(name="/balance [user]", value="Check your balance or another user's balance.", inline=False)
         gambling_embed.add_field(name="/balancetop", value="Show the top balances in this server.", inline=False)
         gambling_embed.add_field(name="/pay <user> <amount>", value="Pay another user some of your coins.", inline=False)
+        gambling_embed.add_field(name="/economy_stats", value="Bot-admin: Money supply, holders, coin sources and trend for this server.", inline=False)
         gambling_embed.add_field(name="/blackjack <bet>", value="Play a hand of blackjack (1–10000 bet).", inline=False)
         gambling_embed.add_field(name="/blackjack_set_cooldown <duration>", value="Admin: Set cooldown between blackjack hands (min 10s). E.g., 10s, 30s, 1m.", inline=False)
+        gambling_embed.add_field(name="/blackjacksim [hands] [strategy]", value="Owner only: Simulate blackjack hands to estimate house edge (no balance impact).", inline=False)
+        gambling_embed.add_field(name="/blackjackbench [iterations]", value="Owner only: Benchmark blackjack hand rendering latency.", inline=False)
         gambling_embed.add_field(name="/slots <bet> [lines]", value="Spin the slots (1–10000 bet, 1–5 lines).", inline=False)
         gambling_embed.add_field(name="/slots_set_cooldown <duration>", value="Admin: Set cooldown between slot spins (min 1s). E.g., 1s, 10s, 1m.", inline=False)
         gambling_embed.add_field(name="/slotstats", value="View your slot stats and session delta.", inline=False)
+        gambling_embed.add_field(name="/casinostats [days]", value="View this server's daily casino totals (spins, hands, wagered, paid out, RTP).", inline=False)
+        gambling_embed.add_field(name="/rtpstatus", value="Admin: Live observed vs expected RTP and drift z-score per casino game.", inline=False)
+        gambling_embed.add_field(name="/casino_alerts [channel] [threshold]", value="Admin: Set the channel (and z-score) for RTP drift alerts; omit channel to disable.", inline=False)
         gambling_embed.add_field(name="/slotresetsession", value="Reset your slot session baseline.", inline=False)
-        gambling_embed.add_field(name="/slotsim [spins] [wager] [lines]", value="Owner only: Simulate slot spins to estimate RTP (no balance impact).", inline=False)
+        gambling_embed.add_field(name="/slotsim [spins] [wager] [lines]", value="Owner only: Simulate up to 10M slot spins to estimate RTP (no balance impact).", inline=False)
+        gambling_embed.add_field(name="/slotrenderstats", value="Owner only: Recent slot spin animation render timings.", inline=False)
         gambling_embed.add_field(name="/work", value="Work a random job to earn coins (per-server cooldown).", inline=False)
         gambling_embed.add_field(name="/setworkcooldown <duration>", value="Admin: Set /work cooldown (e.g., 15m, 2h, 1d).", inline=False)
+        gambling_embed.add_field(name="/workjob_list", value="List this server's /work jobs with pay ranges and odds.", inline=False)
+        gambling_embed.add_field(name="/workjob_add <name> <min_pay> <max_pay> [weight]", value="Admin: Add or update a custom /work job.", inline=False)
+        gambling_embed.add_field(name="/workjob_remove <name>", value="Admin: Remove a custom job, or hide/unhide a built-in one.", inline=False)
         gambling_embed.add_field(name="/coin_reset", value="Admin: Reset all coin balances for this server.", inline=False)
         gambling_embed.add_field(name="/shop [page]", value="Browse passive income items (shows what you own).", inline=False)
         gambling_embed.add_field(name="/buy <item_name> [amount]", value="Buy a passive item by exact name (see /shop). Amount defaults to 1.", inline=False)
@@ -215,6 +227,7 @@ class Misc(commands.Cog):
         gambling_embed.add_field(name="/item_delete <name>", value="Admin: Delete a server-specific shop item.", inline=False)
         gambling_embed.add_field(name="/item_list", value="List this server's custom shop items.", inline=False)
         gambling_embed.add_field(name="/econ_wipe", value="Admin: Wipe all users' coins and owned items for this server.", inline=False)
+        gambling_embed.add_field(name="/export <dataset> [format]", value="Bot-admin: Download balances, XP or inventories as a gzip CSV/JSONL file.", inline=False)
         pages.append(gambling_embed)
 
         # XP
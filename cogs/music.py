@@ -1,9 +1,14 @@
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands, Interaction, Embed, ui
 import asyncio
-import yt_dlp
-from utils.youtube_api import yt_api_search, yt_api_videos, yt_api_playlist_items
+import functools
+from utils.youtube_api import yt_api_search, yt_api_videos, yt_api_playlist_items, youtube_api
+from utils.cooldowns import cooldowns, send_cooldown_message
+from utils.stream_cache import stream_cache, cache_key
+from utils.track_cache import track_cache
+from utils.extractor_pool import extractor_pool
+from utils.music_queue import queue_store
 from urllib.parse import urlparse, parse_qs
 
 
@@ -32,13 +37,11 @@ def parse_iso8601_duration(iso: str) -> int:
 import math
 import json
 import os
-import random
 import sys
 import shutil
+import time
 
 
-# --- Persistent Queue File ---
-QUEUE_FILE = "saved_queues.json"
 # Prefer runtime cookies path if available; fallback to cogs/cookies.txt
 COGS_DIR = os.path.dirname(__file__)
 ROOT_DIR = os.path.dirname(COGS_DIR)
@@ -49,8 +52,26 @@ COOKIE_FILE = RUNTIME_COOKIE_FILE if os.path.isdir(RUNTIME_DIR) else DEFAULT_COG
 
 # Maximum allowed duration for a single video (8 hours)
 MAX_VIDEO_DURATION = 8 * 60 * 60
-
-queues = {}  # guild_id: [song dicts]
+# Playlists are ingested in pages of this many tracks, up to MAX_PLAYLIST_TRACKS
+PLAYLIST_PAGE = 50
+MAX_PLAYLIST_TRACKS = 1000
+# How often the playing track's position is written to the queue log
+CHECKPOINT_INTERVAL = 15
+# /resume resolves at most this many guilds' streams at once, each holding its slot this long
+RESUME_CONCURRENCY = 3
+RESUME_STAGGER = 1.0
+# Leave voice after this long with nothing left to play
+IDLE_DISCONNECT = 60
+# How long "Now Playing" messages stay up
+NOW_PLAYING_TTL = 30
+# Delay before handling a track end, so a skipped track's FFmpeg can shut down first
+AFTER_SONG_DELAY = 0.3
+
+# Per-user /play cooldown (seconds), enforced by the shared cooldown engine
+PLAY_COOLDOWN = 10
+cooldowns.register("play", PLAY_COOLDOWN)
+
+queues = queue_store  # guild_id -> SongQueue (created on first use, persisted as an op log)
 last_channels = {}  # guild_id: last Interaction.channel
 
 # --- Color Codes ---
@@ -59,13 +80,6 @@ RED = "\033[31m"
 YELLOW = "\033[33m"
 BLUE = "\033[34m"
 
-def save_queues(queues):
-    if any(queues.values()):
-        with open(QUEUE_FILE, "w") as f:
-            json.dump(queues, f, indent=4)
-    elif os.path.exists(QUEUE_FILE):
-        os.remove(QUEUE_FILE)
-
 def debug_command(command_name, user, guild, **kwargs):
     print(f"{RED}[COMMAND] /{command_name}{RESET} triggered by {YELLOW}{user.display_name}{RESET} in {BLUE}{guild.name}{RESET}")
     if kwargs:
@@ -111,6 +125,120 @@ class QueueView(ui.View):
         else:
             await interaction.response.defer()
 
+class GuildPlayer:
+    """Owns one guild's playback transitions.
+
+    Commands and the voice thread's after-callback post messages to the
+    mailbox ("enqueue", "play", "skip", "stop", "track-ended", "idle") and a
+    single long-lived task handles them in order, so two transitions never
+    overlap. Work that isn't a transition (Now Playing messages and their
+    cleanup, the idle-disconnect timer) runs in tasks of its own.
+    """
+
+    def __init__(self, cog: "Music", guild_id: str):
+        self.cog = cog
+        self.guild_id = guild_id
+        self.mailbox: asyncio.Queue = asyncio.Queue()
+        self.seq = 0  # bumped per started track; track-ended for an older one is ignored
+        self.idle_timer: asyncio.Task | None = None
+        self.task = asyncio.create_task(self._run())
+
+    def post(self, kind: str, interaction: Interaction, **payload) -> asyncio.Future:
+        """Queue a message; the returned future resolves to the handler's result (None on error)."""
+        fut = asyncio.get_running_loop().create_future()
+        if self.task.done():
+            fut.cancel()  # closed: nothing will ever handle it
+            return fut
+        self.mailbox.put_nowait((kind, interaction, payload, fut))
+        return fut
+
+    async def _run(self):
+        while True:
+            kind, interaction, payload, fut = await self.mailbox.get()
+            result = None
+            try:
+                result = await self._handle(kind, interaction, **payload)
+            except asyncio.CancelledError:
+                fut.cancel()
+                raise
+            except Exception as e:
+                print(f"{RED}⚠️ Player error ({kind}) in guild {self.guild_id}: {e}{RESET}")
+            if not fut.done():
+                fut.set_result(result)
+
+    @staticmethod
+    def _idle(interaction: Interaction) -> bool:
+        vc = interaction.guild.voice_client
+        return not (vc and (vc.is_playing() or vc.is_paused()))
+
+    async def _handle(self, kind: str, interaction: Interaction, **payload):
+        cog, guild_id = self.cog, self.guild_id
+        if kind == "enqueue":
+            # Returns True when nothing is playing, i.e. the caller should send "play"
+            self.cancel_idle()
+            cog._drop_restored(guild_id)
+            queues[guild_id].extend(payload["songs"])
+            if self._idle(interaction):
+                return True
+            cog._schedule_prefetch(guild_id)
+            return False
+        if kind == "play":
+            if not self._idle(interaction):
+                return False
+            self.cancel_idle()
+            if interaction.guild.voice_client is None:
+                await cog.safe_connect(interaction)
+            cog._track_ended.pop(guild_id, None)  # a fresh start, not a gap between tracks
+            await cog.start_next(interaction, payload.get("msg"))
+            return True
+        if kind == "track-ended":
+            if payload["seq"] != self.seq:
+                return False
+            if payload.get("error") and payload.get("stream_key"):
+                # A stream that errored out may be a dead URL; don't hand it to the next guild
+                stream_cache.invalidate(payload["stream_key"])
+            cog._track_ended[guild_id] = payload["ended_at"]
+            await cog.start_next(interaction)
+            return True
+        if kind == "skip":
+            vc = interaction.guild.voice_client
+            if vc and vc.is_playing():
+                vc.stop()  # its after-callback posts track-ended
+                return True
+            return False
+        if kind == "stop":
+            self.cancel_idle()
+            return await cog._end_session(interaction)
+        if kind == "idle":
+            self.idle_timer = None
+            await cog.auto_disconnect(interaction)
+            return True
+        raise ValueError(f"Unknown player message: {kind}")
+
+    def arm_idle(self, interaction: Interaction):
+        """Post "idle" after IDLE_DISCONNECT seconds unless playback starts first."""
+        self.cancel_idle()
+
+        async def timer():
+            await asyncio.sleep(IDLE_DISCONNECT)
+            self.post("idle", interaction)
+
+        self.idle_timer = asyncio.create_task(timer())
+
+    def cancel_idle(self):
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+
+    def close(self):
+        self.cancel_idle()
+        self.task.cancel()
+        # Messages still waiting in the mailbox will never be handled; don't leave their posters hanging
+        while not self.mailbox.empty():
+            *_, fut = self.mailbox.get_nowait()
+            fut.cancel()
+
+
 class Music(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -118,20 +246,49 @@ class Music(commands.Cog):
         self.force_stopped = {}  # guild_id: True if /leave was called
         # Consecutive failure tracking (per guild) to prevent spam loops
         self.fail_counts = {}  # guild_id -> consecutive failure count
-        # Per-user cooldown for /play (seconds)
-        self.play_last_used = {}  # user_id -> last monotonic timestamp
-        self.PLAY_COOLDOWN = 10
         # Allow up to 2 failures; on the 3rd ("> 2"), abort and leave
         self.FAILURE_THRESHOLD = 2
-        global queues
-        queues = {}
-        save_queues(queues)
-        print(f"{YELLOW}[INFO]{RESET} Cleared all queues at startup.")
+        # Next-track prefetch: guild_id -> (song dict, task resolving its metadata + stream)
+        self.prefetches: dict[str, tuple[dict, asyncio.Task]] = {}
+        self.prefetch_stats = {"used": 0, "wasted": 0, "failed": 0}
+        # Silence between tracks: guild_id -> monotonic time the last track ended,
+        # and guild_id -> {"count", "total", "max", "last"} in seconds
+        self._track_ended: dict[str, float] = {}
+        self.gap_stats: dict[str, dict] = {}
+        # Playlists still being paged into the queue: guild_id -> task (cancelled by /stop)
+        self.ingestions: dict[str, asyncio.Task] = {}
+        # One playback actor per guild, plus fire-and-forget UI tasks (kept referenced until done)
+        self.players: dict[str, GuildPlayer] = {}
+        self._background: set[asyncio.Task] = set()
+        # Sessions restored from the queue logs that haven't been resumed yet
+        self.restored: set[str] = set()
+        for q in queues.load_all():
+            self.restored.add(q.guild_id)
+            if q.current and q.current.get('stream_url'):
+                self._seed_stream_cache(q.current)
+        print(f"{YELLOW}[INFO]{RESET} Restored {len(self.restored)} queue(s) from disk.")
+        self._resume_slots = asyncio.Semaphore(RESUME_CONCURRENCY)
+        self.position_checkpoint.start()
         # DJ role configuration cache: guild_id -> role_id
         self.dj_roles = self._load_dj_config()
 
     DJ_CONFIG_FILE = "dj_config.json"
 
+    async def cog_unload(self):
+        self.position_checkpoint.cancel()
+        self._checkpoint_positions()
+        for guild_id in list(self.prefetches):
+            self._cancel_prefetch(guild_id)
+        for task in self.ingestions.values():
+            task.cancel()
+        for player in self.players.values():
+            player.close()
+        for task in self._background:
+            task.cancel()
+        await youtube_api.close()
+        await extractor_pool.close()
+        # track_cache is a process-wide singleton that outlives cog reloads; never close it here
+
     # ---- DJ Role Persistence ----
     def _load_dj_config(self):
         if os.path.exists(self.DJ_CONFIG_FILE):
@@ -199,17 +356,6 @@ class Music(commands.Cog):
             print(f"{RED}❌ Voice connect failed: {e}{RESET}")
             raise
 
-    # ---- /play cooldown helpers ----
-    def _play_cooldown_remaining(self, user_id: int) -> float:
-        """Return remaining seconds of /play cooldown for a user (0 if ready)."""
-        now = asyncio.get_event_loop().time()
-        last = self.play_last_used.get(user_id, 0)
-        remaining = (last + self.PLAY_COOLDOWN) - now
-        return remaining if remaining > 0 else 0.0
-
-    def _mark_play_used(self, user_id: int):
-        self.play_last_used[user_id] = asyncio.get_event_loop().time()
-
     # ---- Failure guard ----
     async def _record_failure_and_maybe_abort(self, interaction: Interaction, reason: str) -> bool:
         """Increment failure counter; if above threshold, clear queue, notify, and leave.
@@ -223,8 +369,10 @@ class Music(commands.Cog):
             # Reset counters and state
             self.fail_counts[guild_id] = 0
             self.force_stopped[guild_id] = True
-            queues[guild_id] = []
-            save_queues(queues)
+            queues[guild_id].clear()
+            self._cancel_prefetch(guild_id)
+            self._cancel_ingestion(guild_id)
+            self.currently_playing.pop(guild_id, None)
 
             channel = last_channels.get(guild_id, interaction.channel)
             embed = Embed(
@@ -239,10 +387,7 @@ class Music(commands.Cog):
             # Include last reason for quick visibility
             if reason:
                 embed.add_field(name="Last error", value=reason, inline=False)
-            try:
-                await channel.send(embed=embed)
-            except Exception:
-                pass
+            self._notify(channel, embed)
 
             try:
                 vc = interaction.guild.voice_client
@@ -292,7 +437,48 @@ class Music(commands.Cog):
             return False
 
 
-    def get_yt_info(self, query):
+    @staticmethod
+    def _song_from_info(info: dict, search_query: str = None) -> dict:
+        """Queue entry for one yt_dlp/API result; the stream URL is resolved at play time.
+
+        Deferring stream resolution avoids many expensive webpage/js
+        extractions up-front (playlists, searches).
+        """
+        vid_id = info.get('id')
+        # Prefer the canonical webpage_url. If that's missing, prefer a raw http url
+        # that's not an api.soundcloud.com link. If we only have a SoundCloud
+        # internal id (soundcloud:tracks:...), try to construct a best-effort
+        # permalink using uploader/title (not perfect but often works).
+        webpage = info.get('webpage_url') or None
+        raw_url = info.get('url')
+        if not webpage and isinstance(raw_url, str):
+            if raw_url.startswith('http') and 'api.soundcloud.com' not in raw_url:
+                webpage = raw_url
+
+        if not webpage and isinstance(vid_id, str):
+            if vid_id.startswith('soundcloud:tracks:'):
+                sc_id = vid_id.split(':')[-1]
+                uploader = info.get('uploader') or info.get('uploader_id') or info.get('creator') or 'unknown'
+                title = info.get('title') or sc_id
+                # minimal slugify for title
+                title_slug = ''.join(ch if ch.isalnum() or ch == '-' else '-' for ch in title.replace(' ', '-')).strip('-').lower()
+                webpage = f"https://soundcloud.com/{uploader}/{title_slug}"
+            else:
+                webpage = (f"https://www.youtube.com/watch?v={vid_id}" if vid_id else None)
+        return {
+            'id': vid_id,
+            'webpage_url': webpage,
+            'stream_url': None,
+            # Keep the original search token so we can re-resolve if the
+            # stored webpage_url is an API URL (api.soundcloud.com) which
+            # yt-dlp can't extract directly.
+            'search_query': search_query,
+            'title': info.get('title', 'Unknown'),
+            'thumbnail': info.get('thumbnail', ''),
+            'duration': info.get('duration', 0) or 0
+        }
+
+    async def get_yt_info(self, query, playlist_items: str = None, guild_id: str = None):
         is_playlist = "playlist" in query.lower() or "list=" in query.lower()
         print(f"[DEBUG] Using cookie file: {COOKIE_FILE}")
 
@@ -316,10 +502,12 @@ class Music(commands.Cog):
         if not (qlow.startswith('scsearch') or qlow.startswith('scsearch1')):
             ydl_opts['default_search'] = 'ytsearch'
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            return ydl.extract_info(query, download=False)
+        # Window of a large playlist (e.g. "51-100"), so it can be ingested page by page;
+        # passed per call so every window shares one warm extractor
+        overrides = {'playlist_items': playlist_items} if playlist_items else None
+        return await extractor_pool.extract(guild_id, ydl_opts, query, overrides)
 
-    def get_stream_url(self, url: str, format_pref: str = None):
+    async def get_stream_url(self, url: str, format_pref: str = None, guild_id: str = None):
         # Prefer progressive (non-HLS) formats by default to avoid m3u8 segment URLs
         default_format = 'bestaudio[ext=mp4]/bestaudio[ext=webm]/bestaudio[ext=m4a]/bestaudio/best'
         # Prefer MP3 for SoundCloud targets to avoid HLS/unsupported streams
@@ -341,24 +529,136 @@ class Music(commands.Cog):
             # prefer mp3 containers for SoundCloud to avoid HLS streams
             ydl_opts['format'] = 'bestaudio[ext=mp3]/bestaudio/best'
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            # Debug: show what URL/format we resolved to for easier troubleshooting
+        info = await extractor_pool.extract(guild_id, ydl_opts, url)
+        # Debug: show what URL/format we resolved to for easier troubleshooting
+        try:
+            fmt = info.get('format') or info.get('requested_formats')
+        except Exception:
+            fmt = None
+        print(f"[DEBUG] Resolved stream for target={url} title={info.get('title')} format={fmt} url={info.get('url')}")
+        return info['url']
+
+
+    # ---- Track metadata ----
+    @staticmethod
+    def _meta_from_api_item(vid: str, item: dict) -> dict:
+        snip = item.get('snippet', {})
+        thumbs = snip.get('thumbnails', {})
+        return {
+            'id': vid,
+            'webpage_url': f"https://www.youtube.com/watch?v={vid}",
+            'title': snip.get('title'),
+            'thumbnail': thumbs.get('high', {}).get('url') or thumbs.get('default', {}).get('url'),
+            'duration': parse_iso8601_duration(item.get('contentDetails', {}).get('duration')),
+        }
+
+    async def _youtube_metadata(self, vid: str) -> dict | None:
+        """Title/duration/thumbnail for a YouTube id: cache first, then videos.list."""
+        meta = track_cache.get_video(vid)
+        if meta:
+            return meta
+        api_res = await yt_api_videos(vid)
+        items = api_res.get('items', [])
+        if not items:
+            return None
+        meta = self._meta_from_api_item(vid, items[0])
+        track_cache.put_video(meta)
+        return meta
+
+    def _cache_ytdlp_result(self, url: str, data):
+        """Remember a single YouTube result from a yt_dlp metadata run."""
+        entries = data.get('entries') if isinstance(data, dict) and 'entries' in data else [data]
+        if not entries or len(entries) != 1 or not isinstance(entries[0], dict):
+            return
+        info = entries[0]
+        if not (info.get('extractor_key') or info.get('ie_key') or '').lower().startswith('youtube') or not info.get('id'):
+            return
+        track_cache.put_video(info)
+        if not url.startswith('http') and not url.startswith('sc:'):
+            track_cache.put_search(url, info['id'])
+
+    async def _fill_metadata(self, song: dict, guild_id: str = None):
+        """Fill in a song's missing thumbnail/duration (e.g. from extract_flat playlists)."""
+        webpage = song.get('webpage_url') or song.get('url')
+        extractor, vid, _ = cache_key(webpage)
+        meta = track_cache.get_video(vid, source="ytdlp") if extractor == 'youtube' else None
+        if meta is None:
+            full_info = await self.get_yt_info(webpage, guild_id=guild_id)
+            meta = {
+                'id': vid,
+                'title': full_info.get("title", song["title"]),
+                'thumbnail': full_info.get("thumbnail", ""),
+                'duration': full_info.get("duration", 0),
+                'webpage_url': webpage,
+            }
+            if extractor == 'youtube':
+                track_cache.put_video(meta)
+        song["title"] = meta.get("title") or song["title"]
+        song["thumbnail"] = meta.get("thumbnail", "")
+        song["duration"] = meta.get("duration", 0)
+
+    async def resolve_stream(self, song: dict, guild_id: str = None) -> str:
+        """Playable stream URL for a queued song, from the shared cache when possible.
+
+        Misses run yt_dlp on the extractor pool (with the one-shot non-HLS retry) and
+        store the result keyed by (extractor, video id, format preference).
+        The cached URL must outlive the track, since ffmpeg reconnects reuse it.
+        """
+        resolve_target = song.get('search_query') or song.get('webpage_url') or song.get('url')
+        if not resolve_target:
+            raise ValueError("No URL or search query to resolve stream")
+
+        # If this is a SoundCloud search token, run the search now and pick the first real page URL
+        if isinstance(resolve_target, str) and resolve_target.lower().startswith('scsearch'):
             try:
-                fmt = info.get('format') or info.get('requested_formats')
-            except Exception:
-                fmt = None
-            print(f"[DEBUG] Resolved stream for target={url} title={info.get('title')} format={fmt} url={info.get('url')}")
-            return info['url']
+                search_info = await self.get_yt_info(resolve_target, guild_id=guild_id)
+                entries2 = search_info.get('entries') if isinstance(search_info, dict) and 'entries' in search_info else [search_info]
+                if entries2:
+                    first = entries2[0]
+                    candidate = first.get('webpage_url') or first.get('url')
+                    if candidate:
+                        resolve_target = candidate
+                        song['webpage_url'] = candidate
+            except Exception as e:
+                print(f"{RED}⚠️ Failed to re-resolve SoundCloud search for {song.get('title')}: {e}{RESET}")
+
+        key = cache_key(resolve_target)
+        song['stream_key'] = key
+        remaining = (song.get('duration') or 0) - (song.get('start_offset') or 0)
+        cached = stream_cache.get(key, needed_for=max(0, remaining))
+        if cached:
+            return cached
+
+        # prefer progressive formats to avoid HLS
+        stream = await self.get_stream_url(resolve_target, guild_id=guild_id)
+        # If yt-dlp still returned an HLS (.m3u8) playlist URL, retry once with explicit non-HLS preference
+        try:
+            if isinstance(stream, str) and stream.lower().endswith('.m3u8'):
+                print(f"[DEBUG] Got HLS stream (.m3u8) for {song.get('title')}, retrying with non-HLS preference")
+                retry_pref = 'bestaudio[ext=mp4]/bestaudio[ext=webm]/bestaudio[ext=m4a]/bestaudio/best'
+                try:
+                    stream_retry = await self.get_stream_url(resolve_target, retry_pref, guild_id)
+                    if isinstance(stream_retry, str) and not stream_retry.lower().endswith('.m3u8'):
+                        stream = stream_retry
+                        print(f"[DEBUG] Retry returned non-HLS stream for {song.get('title')}")
+                    else:
+                        print(f"[DEBUG] Retry still returned HLS (or non-progressive) for {song.get('title')}, proceeding with original stream")
+                except Exception as e:
+                    print(f"[DEBUG] Retry to avoid HLS failed: {e}")
+        except Exception:
+            # Defensive: if stream isn't a string or something unexpected, ignore and proceed
+            pass
 
+        stream_cache.put(key, stream)
+        return stream
 
     async def auto_disconnect(self, interaction: Interaction):
-        await asyncio.sleep(60)  # Wait 60 seconds (or however long you want)
+        """Leave if still idle; the player sends "idle" IDLE_DISCONNECT seconds after the queue ran out."""
         vc = interaction.guild.voice_client
         if vc and not vc.is_playing():
             await vc.disconnect()
-            queues[str(interaction.guild.id)] = []
-            save_queues(queues)
+            queues[str(interaction.guild.id)].clear()
+            self._cancel_prefetch(str(interaction.guild.id))
 
             embed = Embed(
                 title="Jeng has ran away.",
@@ -366,13 +666,62 @@ class Music(commands.Cog):
                 color=discord.Color.purple()
             )
             channel = last_channels.get(str(interaction.guild.id), interaction.channel)
-            await channel.send(embed=embed)
+            self._notify(channel, embed)
 
+    async def _end_session(self, interaction: Interaction) -> bool:
+        """Clear the queue and leave voice. Returns whether the bot was connected."""
+        guild_id = str(interaction.guild.id)
+        self._cancel_ingestion(guild_id)
+        queues[guild_id].clear()
+        self._cancel_prefetch(guild_id)
+        self._track_ended.pop(guild_id, None)
+        self.currently_playing.pop(guild_id, None)
+        vc = interaction.guild.voice_client
+        if vc:
+            await vc.disconnect()
+            return True
+        return False
+
+    # ---- Player actor plumbing ----
+    def _player(self, guild_id: str) -> GuildPlayer:
+        player = self.players.get(guild_id)
+        if player is None or player.task.done():
+            player = self.players[guild_id] = GuildPlayer(self, guild_id)
+        return player
+
+    def _spawn(self, coro):
+        """Run UI housekeeping in the background so playback never waits on it."""
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _notify(self, channel, embed: Embed):
+        async def send():
+            try:
+                await channel.send(embed=embed)
+            except discord.HTTPException:
+                pass
+        self._spawn(send())
 
-    def get_audio_source(self, url):
+    async def _announce(self, channel, msg: discord.Message, embed: Embed):
+        """Show Now Playing (editing `msg` if given) and delete it NOW_PLAYING_TTL seconds later."""
+        try:
+            if msg:
+                await msg.edit(embed=embed)
+            else:
+                msg = await channel.send(embed=embed)
+        except discord.HTTPException:
+            return
+        await asyncio.sleep(NOW_PLAYING_TTL)
+        try:
+            await msg.delete()
+        except discord.HTTPException:
+            pass
+
+    def get_audio_source(self, url, offset: float = 0):
         ffmpeg_opts = {
-            # Ensure ffmpeg seeks to the start to avoid HLS/segment URLs starting mid-stream
-            'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -ss 0',
+            # Seek explicitly (to the start unless resuming) to avoid HLS/segment URLs starting mid-stream
+            'before_options': f'-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -ss {int(offset)}',
             'options': '-vn'
         }
         return discord.FFmpegPCMAudio(url, **ffmpeg_opts)
@@ -385,20 +734,11 @@ class Music(commands.Cog):
             # Need to defer only if not responded; use private ephemeral
             await interaction.response.send_message(embed=Embed(title="🎧 DJ Only", description="A DJ role is set. You cannot use /play.", color=discord.Color.red()), ephemeral=True)
             return
-        # Per-user 10s cooldown for /play
-        rem = self._play_cooldown_remaining(interaction.user.id)
+        # Per-user 10s cooldown, consumed only once the DJ check passed and before any heavy operations
+        rem = cooldowns.hit("play", interaction.user.id, interaction.guild.id)
         if rem > 0:
-            await interaction.response.send_message(
-                embed=Embed(
-                    title="⏳ Slow down",
-                    description=f"Please wait {int(math.ceil(rem))}s before using /play again.",
-                    color=discord.Color.orange()
-                ),
-                ephemeral=True
-            )
+            await send_cooldown_message(interaction, rem)
             return
-        # Mark usage before any heavy operations
-        self._mark_play_used(interaction.user.id)
         debug_command("play", interaction.user, interaction.guild, url=url)
         await interaction.response.defer(thinking=True)
 
@@ -407,9 +747,6 @@ class Music(commands.Cog):
         voice_client = interaction.guild.voice_client
         last_channels[guild_id] = interaction.channel
 
-        if guild_id not in queues:
-            queues[guild_id] = []
-
         # reject mixes and watch-with-list links up-front
         if url.startswith("http") and (self._is_youtube_mix(url) or self._is_watch_with_list(url)):
             if self._is_youtube_mix(url):
@@ -429,75 +766,51 @@ class Music(commands.Cog):
             # Default to YouTube search for plain text
             query = f"ytsearch1:{url.strip()}"
 
-        # run blocking extraction in a thread to avoid blocking the event loop
-        # Prefer YouTube Data API for plain searches or YouTube URLs to avoid heavy yt_dlp metadata runs
+        # Playlists are paged into the queue in the background; playback starts with the first page
+        if url.startswith('http') and ('playlist' in url.lower() or 'list=' in url.lower()):
+            if guild_id in self.ingestions:
+                await interaction.edit_original_response(embed=Embed(title="⏳ Playlist Already Loading", description="Another playlist is still loading. Use /stop to cancel it first.", color=discord.Color.orange()))
+                return
+            msg = await interaction.edit_original_response(embed=Embed(title="📥 Loading Playlist...", description="Fetching the first page...", color=discord.Color.blurple()))
+            self._start_ingestion(interaction, msg, url)
+            return
+
+        # Prefer the metadata cache, then the YouTube Data API, for plain searches or
+        # YouTube URLs to avoid heavy yt_dlp metadata runs
         data = None
         try:
             if url.startswith('http'):
-                # If YouTube URL, try to parse video id and fetch via API
-                p = urlparse(url)
-                host = p.netloc.lower()
-                if 'youtube' in host or 'youtu.be' in host:
-                    # get v= query or path short id
-                    qs = parse_qs(p.query)
-                    vid = None
-                    if 'v' in qs:
-                        vid = qs.get('v')[0]
-                    else:
-                        # youtu.be short link -> path component
-                        path = p.path.strip('/')
-                        if path:
-                            vid = path
-                    if vid:
-                        api_res = yt_api_videos(vid)
-                        items = api_res.get('items', [])
-                        if items:
-                            it = items[0]
-                            snip = it.get('snippet', {})
-                            # Try to parse ISO 8601 duration
-                            dur = 0
-                            try:
-                                cd = it.get('contentDetails', {})
-                                iso = cd.get('duration')
-                                if iso:
-                                    dur = parse_iso8601_duration(iso)
-                            except Exception:
-                                dur = 0
-                            # construct a dict similar to yt_dlp output for downstream code
-                            data = {'entries': [{'id': vid, 'webpage_url': url, 'title': snip.get('title'), 'thumbnail': snip.get('thumbnails', {}).get('high', {}).get('url') or snip.get('thumbnails', {}).get('default', {}).get('url'), 'duration': dur}]}
-            else:
-                # Plain text search: use YouTube Data API search (may cost quota)
+                extractor, vid, _ = cache_key(url)
+                if extractor == 'youtube':
+                    meta = await self._youtube_metadata(vid)
+                    if meta:
+                        data = {'entries': [meta]}
+            elif not url.startswith('sc:'):
+                # Plain text search: repeat searches resolve from the cache (search.list costs 100 quota units)
                 q = url.strip()
-                api_res = yt_api_search(q, max_results=1)
-                items = api_res.get('items', [])
-                if items:
-                    vid = items[0]['id']['videoId']
-                    vres = yt_api_videos(vid)
-                    vitems = vres.get('items', [])
-                    if vitems:
-                        it = vitems[0]
-                        snip = it.get('snippet', {})
-                        dur = 0
-                        try:
-                            cd = it.get('contentDetails', {})
-                            iso = cd.get('duration')
-                            if iso:
-                                dur = parse_iso8601_duration(iso)
-                        except Exception:
-                            dur = 0
-                        url_v = f"https://www.youtube.com/watch?v={vid}"
-                        data = {'entries': [{'id': vid, 'webpage_url': url_v, 'title': snip.get('title'), 'thumbnail': snip.get('thumbnails', {}).get('high', {}).get('url') or snip.get('thumbnails', {}).get('default', {}).get('url'), 'duration': dur}]}
+                meta = track_cache.get_search(q)
+                if meta is None:
+                    api_res = await yt_api_search(q, max_results=1)
+                    items = api_res.get('items', [])
+                    if items:
+                        vid = items[0]['id']['videoId']
+                        meta = await self._youtube_metadata(vid)
+                        if meta:
+                            track_cache.put_search(q, vid)
+                if meta:
+                    data = {'entries': [meta]}
         except Exception:
             data = None
 
         # fallback to yt_dlp metadata extraction when API didn't return usable data
         if not data:
             try:
-                data = await asyncio.to_thread(self.get_yt_info, query)
+                data = await self.get_yt_info(query, guild_id=guild_id)
             except Exception as e:
                 embed = Embed(title="⚠️ Extraction Failed", description=f"Failed to retrieve info: {e}", color=discord.Color.red())
                 await interaction.edit_original_response(embed=embed)
                 return
+            self._cache_ytdlp_result(url, data)
 
         entries = data['entries'] if isinstance(data, dict) and 'entries' in data else [data]
         songs_added = []
@@ -511,44 +824,7 @@ class Music(commands.Cog):
                 skipped.append(title)
                 continue
 
-            # Defer resolving the playable stream URL until playback time to avoid
-            # performing many expensive webpage/js extractions up-front.
-            # Ensure we always have a webpage_url even when extract_flat returns only an id
-            vid_id = info.get('id')
-            # Prefer the canonical webpage_url. If that's missing, prefer a raw http url
-            # that's not an api.soundcloud.com link. If we only have a SoundCloud
-            # internal id (soundcloud:tracks:...), try to construct a best-effort
-            # permalink using uploader/title (not perfect but often works).
-            webpage = info.get('webpage_url') or None
-            raw_url = info.get('url')
-            if not webpage and isinstance(raw_url, str):
-                if raw_url.startswith('http') and 'api.soundcloud.com' not in raw_url:
-                    webpage = raw_url
-
-            if not webpage and isinstance(vid_id, str):
-                if vid_id.startswith('soundcloud:tracks:'):
-                    sc_id = vid_id.split(':')[-1]
-                    uploader = info.get('uploader') or info.get('uploader_id') or info.get('creator') or 'unknown'
-                    title = info.get('title') or sc_id
-                    # minimal slugify for title
-                    title_slug = ''.join(ch if ch.isalnum() or ch == '-' else '-' for ch in title.replace(' ', '-')).strip('-').lower()
-                    webpage = f"https://soundcloud.com/{uploader}/{title_slug}"
-                else:
-                    webpage = (f"https://www.youtube.com/watch?v={vid_id}" if vid_id else None)
-            song = {
-                'id': vid_id,
-                'webpage_url': webpage,
-                'stream_url': None,
-                # Keep the original search token so we can re-resolve if the
-                # stored webpage_url is an API URL (api.soundcloud.com) which
-                # yt-dlp can't extract directly.
-                'search_query': query if is_sc_search else None,
-                'title': info.get('title', 'Unknown'),
-                'thumbnail': info.get('thumbnail', ''),
-                'duration': dur
-            }
-            queues[guild_id].append(song)
-            songs_added.append(song)
+            songs_added.append(self._song_from_info(info, query if is_sc_search else None))
 
         # Notify about skipped too-long videos
         if len(entries) == 1 and skipped:
@@ -561,16 +837,15 @@ class Music(commands.Cog):
             embed = Embed(title="⚠️ Some videos skipped", description=f"The following videos were longer than 8 hours and were skipped:\n{short_list}{more}", color=discord.Color.orange())
             await interaction.followup.send(embed=embed, ephemeral=True)
 
-        save_queues(queues)
-
-        was_playing = voice_client.is_playing() if voice_client else False
         if not voice_client:
             voice_client = await self.safe_connect(interaction)
 
-        if not was_playing and len(queues[guild_id]) == len(songs_added):
+        player = self._player(guild_id)
+        started = False
+        if songs_added and await player.post("enqueue", interaction, songs=songs_added):
             msg = await interaction.edit_original_response(embed=Embed(title="Now Playing...", color=discord.Color.blurple()))
-            await self.start_next(interaction, msg)
-        else:
+            started = await player.post("play", interaction, msg=msg)
+        if not started:
             if len(songs_added) == 1:
                 embed = Embed(title='Added to Queue', description=songs_added[0]['title'], color=discord.Color.blue())
                 embed.set_thumbnail(url=songs_added[0]['thumbnail'])
@@ -578,24 +853,262 @@ class Music(commands.Cog):
                 embed = Embed(title='Playlist Queued', description=f"Added {len(songs_added)} songs.", color=discord.Color.green())
             await interaction.edit_original_response(embed=embed)
 
+    # ---- Progressive playlist ingestion ----
+    @staticmethod
+    def _youtube_playlist_id(url: str) -> str | None:
+        try:
+            p = urlparse(url)
+            if 'youtube' not in p.netloc.lower():
+                return None
+            return parse_qs(p.query).get('list', [None])[0]
+        except Exception:
+            return None
+
+    async def _playlist_pages(self, url: str, playlist_id: str | None, guild_id: str = None):
+        """Yield a playlist as lists of track infos, one page at a time.
+
+        YouTube playlists page through playlistItems (50 per call) with the
+        durations/thumbnails batched into one videos.list call per page;
+        anything else, or a failing API, falls back to yt_dlp windows.
+        """
+        yielded = 0
+        if playlist_id:
+            token = None
+            try:
+                while yielded < MAX_PLAYLIST_TRACKS:
+                    res = await yt_api_playlist_items(playlist_id, PLAYLIST_PAGE, token)
+                    ids = [it.get('contentDetails', {}).get('videoId') for it in res.get('items', [])]
+                    details = await youtube_api.videos([vid for vid in ids if vid])
+                    metas = []
+                    for item in details.get('items', []):
+                        meta = self._meta_from_api_item(item['id'], item)
+                        track_cache.put_video(meta)
+                        metas.append(meta)
+                    yielded += len(metas)
+                    yield metas
+                    token = res.get('nextPageToken')
+                    if not token:
+                        return
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if yielded:
+                    raise
+                print(f"{YELLOW}[MUSIC]{RESET} Playlist API lookup failed, using yt_dlp: {e}")
+
+        start = 1
+        while start <= MAX_PLAYLIST_TRACKS:
+            window = f"{start}-{start + PLAYLIST_PAGE - 1}"
+            data = await self.get_yt_info(url, window, guild_id)
+            entries = [e for e in (data.get('entries') or []) if e] if isinstance(data, dict) else []
+            if not entries:
+                return
+            yield entries
+            if len(entries) < PLAYLIST_PAGE:
+                return
+            start += PLAYLIST_PAGE
+
+    async def _ingest_playlist(self, interaction: Interaction, msg: discord.Message, url: str):
+        """Stream a playlist into the queue, starting playback with the first page."""
+        guild_id = str(interaction.guild.id)
+        added = skipped = 0
+        player = self._player(guild_id)
+        status = "Done"
+        try:
+            async for page in self._playlist_pages(url, self._youtube_playlist_id(url), guild_id):
+                if self.force_stopped.get(guild_id):
+                    status = "Stopped"
+                    break
+                songs = []
+                for info in page:
+                    dur = info.get('duration', 0) or 0
+                    if dur and dur > MAX_VIDEO_DURATION:
+                        skipped += 1
+                        continue
+                    songs.append(self._song_from_info(info))
+                added += len(songs)
+                if await player.post("enqueue", interaction, songs=songs) and songs:
+                    # Not awaited: later pages keep loading while the first track resolves
+                    player.post("play", interaction)
+                try:
+                    await msg.edit(embed=Embed(title="📥 Loading Playlist...", description=f"Queued {added} song(s) so far. Use /stop to stop loading.", color=discord.Color.blurple()))
+                except Exception:
+                    pass  # progress is cosmetic; keep loading even if the message is gone
+        except asyncio.CancelledError:
+            status = "Stopped"
+        except Exception as e:
+            print(f"{RED}⚠️ Playlist ingestion failed: {e}{RESET}")
+            status = "Failed"
+        finally:
+            self.ingestions.pop(guild_id, None)
+
+        titles = {"Done": "Playlist Queued", "Stopped": "⏹️ Playlist Loading Stopped", "Failed": "⚠️ Playlist Partially Loaded"}
+        desc = f"Added {added} songs."
+        if skipped:
+            desc += f" Skipped {skipped} longer than 8 hours."
+        color = discord.Color.green() if status == "Done" else discord.Color.orange()
+        try:
+            await msg.edit(embed=Embed(title=titles[status], description=desc, color=color))
+        except Exception:
+            pass
+
+    def _start_ingestion(self, interaction: Interaction, msg: discord.Message, url: str) -> bool:
+        guild_id = str(interaction.guild.id)
+        if guild_id in self.ingestions:
+            return False
+        self.ingestions[guild_id] = asyncio.create_task(self._ingest_playlist(interaction, msg, url))
+        return True
+
+    def _cancel_ingestion(self, guild_id: str) -> bool:
+        task = self.ingestions.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+            return True
+        return False
+
+    # ---- Restore / resume ----
+    @staticmethod
+    def _seed_stream_cache(song: dict):
+        """Put a restored track's saved stream URL back in the cache (dropped if it has expired)."""
+        target = song.get('search_query') or song.get('webpage_url') or song.get('url')
+        if target and not target.lower().startswith('scsearch'):
+            stream_cache.put(cache_key(target), song.pop('stream_url'))
+
+    def _requeue_current(self, guild_id: str) -> dict | None:
+        """Put a restored session's interrupted track back at the head of its queue, at the saved position."""
+        if guild_id not in self.restored:
+            return None
+        self.restored.discard(guild_id)
+        q = queues.get(guild_id)
+        if q is None or q.current is None:
+            return None
+        song = q.current
+        song['start_offset'] = q.offset
+        q.appendleft(song)
+        q.clear_current()
+        return song
+
+    def _drop_restored(self, guild_id: str):
+        """Discard a restored session that new songs are replacing; only /resume revives one."""
+        if guild_id not in self.restored:
+            return
+        self.restored.discard(guild_id)
+        queues[guild_id].clear()
+        print(f"{YELLOW}[INFO]{RESET} Discarded the restored queue for guild {guild_id} (new songs queued instead of /resume).")
+
+    async def _resolve_for_resume(self, guild_id: str):
+        """Resolve the head of a resumed queue through a few shared slots, spaced RESUME_STAGGER apart."""
+        async with self._resume_slots:
+            started = time.monotonic()
+            self._schedule_prefetch(guild_id)
+            entry = self.prefetches.get(guild_id)
+            if entry:
+                await asyncio.wait([entry[1]])  # failures are reported by start_next
+            await asyncio.sleep(max(0.0, RESUME_STAGGER - (time.monotonic() - started)))
+
+    @staticmethod
+    def _elapsed(playing: dict, now: float = None) -> float:
+        """Seconds into the playing track, not counting time spent paused."""
+        now = asyncio.get_event_loop().time() if now is None else now
+        return (playing.get("paused_at") or now) - playing["start_time"]
+
+    def _checkpoint_positions(self):
+        for guild_id, playing in list(self.currently_playing.items()):
+            q = queues.get(guild_id)
+            if q is None or q.current is not playing["song"]:
+                continue
+            elapsed = self._elapsed(playing)
+            if abs(elapsed - q.offset) >= 1:
+                q.checkpoint(elapsed)
+
+    @tasks.loop(seconds=CHECKPOINT_INTERVAL)
+    async def position_checkpoint(self):
+        self._checkpoint_positions()
+
+    # ---- Next-track prefetch ----
+    async def _prefetch(self, song: dict, guild_id: str):
+        """Fill in missing metadata and resolve the stream for the song that plays next."""
+        if (not song.get("thumbnail") or not song.get("duration")) and (song.get('webpage_url') or song.get('url')):
+            await self._fill_metadata(song, guild_id)
+        song['stream_url'] = await self.resolve_stream(song, guild_id)
+
+    def _schedule_prefetch(self, guild_id: str):
+        """Start resolving the head of the queue in the background (replacing any stale prefetch)."""
+        queue = queues.get(guild_id)
+        head = queue.peek() if queue else None
+        current = self.prefetches.get(guild_id)
+        if current and head is not None and current[0] is head:
+            return
+        self._cancel_prefetch(guild_id)
+        if head is not None:
+            self.prefetches[guild_id] = (head, asyncio.create_task(self._prefetch(head, guild_id)))
+
+    def _cancel_prefetch(self, guild_id: str):
+        entry = self.prefetches.pop(guild_id, None)
+        if entry and not entry[1].done():
+            entry[1].cancel()
+            self.prefetch_stats["wasted"] += 1
+
+    async def _take_prefetch(self, guild_id: str, song: dict) -> bool:
+        """Consume the prefetch for `song`, waiting if it's still running.
+
+        Returns True when its stream URL is ready; otherwise start_next
+        resolves the song itself (and reports any error).
+        """
+        entry = self.prefetches.get(guild_id)
+        if entry is None:
+            return False
+        if entry[0] is not song:
+            self._cancel_prefetch(guild_id)
+            return False
+        del self.prefetches[guild_id]
+        task = entry[1]
+        try:
+            # wait() rather than await: only our own cancellation should propagate
+            await asyncio.wait([task])
+        except asyncio.CancelledError:
+            task.cancel()  # no longer tracked in self.prefetches, so nothing else would stop it
+            raise
+        if task.cancelled():
+            return False
+        if task.exception() is not None:
+            self.prefetch_stats["failed"] += 1
+            return False
+        self.prefetch_stats["used"] += 1
+        return bool(song.get('stream_url'))
+
+    def _record_gap(self, guild_id: str):
+        ended = self._track_ended.pop(guild_id, None)
+        if ended is None:
+            return
+        gap = time.monotonic() - ended
+        g = self.gap_stats.setdefault(guild_id, {"count": 0, "total": 0.0, "max": 0.0, "last": 0.0})
+        g["count"] += 1
+        g["total"] += gap
+        g["max"] = max(g["max"], gap)
+        g["last"] = gap
+
     async def start_next(self, interaction: Interaction, msg: discord.Message = None):
+        """Play the next queue entry that works. Only the guild's GuildPlayer calls this."""
         guild_id = str(interaction.guild.id)
         # ⛔ If force_stopped, do nothing
         if self.force_stopped.get(guild_id):
             return
-            
-        voice_client = interaction.guild.voice_client
+
         channel = last_channels.get(guild_id, interaction.channel)
 
         while queues[guild_id]:  # keep going until a song works or queue is empty
-            next_song = queues[guild_id].pop(0)
+            next_song = queues[guild_id].popleft()
+            offset = next_song.pop('start_offset', 0) or 0
+            prefetched = await self._take_prefetch(guild_id, next_song)
 
             # 🟨 Fallback metadata if missing (e.g., from extract_flat)
             if not next_song.get("thumbnail") or not next_song.get("duration"):
                 webpage = next_song.get('webpage_url') or next_song.get('url')
                 if not webpage:
                     print(f"{RED}⚠️ No webpage URL for {next_song.get('title')}, skipping{RESET}")
-                    await channel.send(embed=Embed(
+                    self._notify(channel, Embed(
                         title="⚠️ Metadata Error",
                         description=f"No URL available for **{next_song.get('title')}**, skipping...",
                         color=discord.Color.orange()
@@ -605,13 +1118,10 @@ class Music(commands.Cog):
                         return
                     continue
                 try:
-                    full_info = self.get_yt_info(webpage)
-                    next_song["title"] = full_info.get("title", next_song["title"])
-                    next_song["thumbnail"] = full_info.get("thumbnail", "")
-                    next_song["duration"] = full_info.get("duration", 0)
+                    await self._fill_metadata(next_song, guild_id)
                 except Exception as e:
                     print(f"{RED}⚠️ Failed to fetch full info for {next_song.get('title')}: {e}{RESET}")
-                    await channel.send(embed=Embed(
+                    self._notify(channel, Embed(
                         title="⚠️ Metadata Error",
                         description=f"Could not fetch full info for **{next_song.get('title')}**, skipping...",
                         color=discord.Color.orange()
@@ -621,59 +1131,18 @@ class Music(commands.Cog):
                     continue
 
             self.currently_playing[guild_id] = {
-                "start_time": asyncio.get_event_loop().time(),
+                "start_time": asyncio.get_event_loop().time() - offset,
                 "duration": next_song.get("duration", 0),
                 "song": next_song
             }
 
             try:
-                # Resolve stream URL on-demand (once) if it wasn't resolved at enqueue time.
                 try:
-                    # Always re-resolve the stream URL immediately before playback to avoid
-                    # reusing an expired HLS/segment URL that might start mid-stream.
-                    resolve_target = next_song.get('search_query') or next_song.get('webpage_url') or next_song.get('url')
-                    if not resolve_target:
-                        raise ValueError("No URL or search query to resolve stream")
-
-                    # If this is a SoundCloud search token, run the search now and pick the first real page URL
-                    if isinstance(resolve_target, str) and resolve_target.lower().startswith('scsearch'):
-                        try:
-                            search_info = await asyncio.to_thread(self.get_yt_info, resolve_target)
-                            entries2 = search_info.get('entries') if isinstance(search_info, dict) and 'entries' in search_info else [search_info]
-                            if entries2:
-                                first = entries2[0]
-                                candidate = first.get('webpage_url') or first.get('url')
-                                if candidate:
-                                    resolve_target = candidate
-                                    next_song['webpage_url'] = candidate
-                        except Exception as e:
-                            print(f"{RED}⚠️ Failed to re-resolve SoundCloud search for {next_song.get('title')}: {e}{RESET}")
-
-                    # blocking extraction in thread; prefer progressive formats to avoid HLS
-                    stream = await asyncio.to_thread(self.get_stream_url, resolve_target)
-                    # If yt-dlp still returned an HLS (.m3u8) playlist URL, retry once with explicit non-HLS preference
-                    try:
-                        if isinstance(stream, str) and stream.lower().endswith('.m3u8'):
-                            print(f"[DEBUG] Got HLS stream (.m3u8) for {next_song.get('title')}, retrying with non-HLS preference")
-                            retry_pref = 'bestaudio[ext=mp4]/bestaudio[ext=webm]/bestaudio[ext=m4a]/bestaudio/best'
-                            try:
-                                stream_retry = await asyncio.to_thread(self.get_stream_url, resolve_target, retry_pref)
-                                if isinstance(stream_retry, str) and not stream_retry.lower().endswith('.m3u8'):
-                                    stream = stream_retry
-                                    print(f"[DEBUG] Retry returned non-HLS stream for {next_song.get('title')}")
-                                else:
-                                    print(f"[DEBUG] Retry still returned HLS (or non-progressive) for {next_song.get('title')}, proceeding with original stream")
-                            except Exception as e:
-                                print(f"[DEBUG] Retry to avoid HLS failed: {e}")
-                    except Exception:
-                        # Defensive: if stream isn't a string or something unexpected, ignore and proceed
-                        pass
-
-                    # overwrite stream_url so we always use a fresh playable URL
-                    next_song['stream_url'] = stream
+                    if not prefetched:
+                        next_song['stream_url'] = await self.resolve_stream(next_song, guild_id)
                 except Exception as e:
                     print(f"{RED}⚠️ Failed to resolve stream for {next_song.get('title')}: {e}{RESET}")
-                    await channel.send(embed=Embed(
+                    self._notify(channel, Embed(
                         title="❌ Failed to Resolve Stream",
                         description=f"Could not resolve a playable stream for **{next_song.get('title')}**, skipping...",
                         color=discord.Color.red()
@@ -682,36 +1151,35 @@ class Music(commands.Cog):
                         return
                     continue
 
+                # /leave while the stream was resolving
+                if self.force_stopped.get(guild_id):
+                    self.currently_playing.pop(guild_id, None)
+                    return
+
                 stream_url = next_song.get('stream_url')
-                source = self.get_audio_source(stream_url)
-                voice_client.play(source, after=lambda e: self._after_song(interaction))
+                source = self.get_audio_source(stream_url, offset)
+                voice_client = interaction.guild.voice_client
+                player = self._player(guild_id)
+                player.seq += 1
+                voice_client.play(source, after=lambda e, key=next_song.get('stream_key'), seq=player.seq: self._after_song(interaction, seq, e, key))
+                player.cancel_idle()
+                queues[guild_id].set_current(next_song, voice_client.channel.id, channel.id, offset)
+                self._record_gap(guild_id)
+                # Resolve the following track while this one plays
+                self._schedule_prefetch(guild_id)
 
                 embed = Embed(title="Now Playing", description=next_song['title'], color=discord.Color.green())
                 embed.set_thumbnail(url=next_song['thumbnail'])
 
-                if msg:
-                    await msg.edit(embed=embed)
-                    await asyncio.sleep(30)
-                    try:
-                        await msg.delete()
-                    except discord.NotFound:
-                        pass
-                else:
-                    temp = await channel.send(embed=embed)
-                    await asyncio.sleep(30)
-                    try:
-                        await temp.delete()
-                    except discord.NotFound:
-                        pass
+                self._spawn(self._announce(channel, msg, embed))
 
                 # Successful start: reset failure counter for this guild
                 self.fail_counts[guild_id] = 0
-                save_queues(queues)
                 return  # song successfully started
 
             except Exception as e:
                 print(f"{RED}⚠️ Failed to play: {next_song['title']} — {e}{RESET}")
-                await channel.send(embed=Embed(
+                self._notify(channel, Embed(
                     title="❌ Failed to Play",
                     description=f"Sorry, **{next_song['title']}** could not be downloaded properly.",
                     color=discord.Color.red()
@@ -722,18 +1190,19 @@ class Music(commands.Cog):
 
         # If we reached here, queue is empty or all songs failed
         self.currently_playing.pop(guild_id, None)
-        await self.auto_disconnect(interaction)
+        queues[guild_id].clear_current()
+        self._player(guild_id).arm_idle(interaction)
 
-
-
-
-    def _after_song(self, interaction: Interaction):
-        # small delay to avoid racing with FFmpeg process shutdown when skipping
-        async def wrapper():
-            await asyncio.sleep(0.3)
-            await self.start_next(interaction)
-
-        asyncio.run_coroutine_threadsafe(wrapper(), self.bot.loop)
+    def _after_song(self, interaction: Interaction, seq: int, error: Exception = None, stream_key: tuple = None):
+        """Voice-thread callback: hand the track end to the guild's player."""
+        player = self.players.get(str(interaction.guild.id))
+        if player is None:
+            return
+        post = functools.partial(
+            player.post, "track-ended", interaction,
+            seq=seq, error=error, stream_key=stream_key, ended_at=time.monotonic(),
+        )
+        self.bot.loop.call_soon_threadsafe(self.bot.loop.call_later, AFTER_SONG_DELAY, post)
 
     @app_commands.command(name="np", description="Shows the currently playing song.")
     async def now_playing(self, interaction: Interaction):
@@ -747,9 +1216,8 @@ class Music(commands.Cog):
             await interaction.followup.send(embed=embed)
             return
 
-        start = playing["start_time"]
         duration = playing["duration"]
-        elapsed = int(now - start)
+        elapsed = int(self._elapsed(playing, now))
         total = duration or 1
 
         bar_len = 20
@@ -772,12 +1240,12 @@ class Music(commands.Cog):
         await interaction.response.defer()
         debug_command("queue", interaction.user, interaction.guild)
         last_channels[str(interaction.guild.id)] = interaction.channel
-        song_queue = queues.get(str(interaction.guild.id), [])
+        song_queue = queues.get(interaction.guild.id)
         if not song_queue:
             embed = Embed(title="Queue Empty", description="No songs in queue.", color=discord.Color.red())
             await interaction.followup.send(embed=embed)
             return
-        view = QueueView(song_queue)
+        view = QueueView(song_queue.snapshot())
         embed = view.format_embed()
         await interaction.followup.send(embed=embed, view=view)
 
@@ -864,6 +1332,66 @@ class Music(commands.Cog):
             desc = "⚠️ refresh_cookies.py returned a non-zero exit code." + (f"\n\nStdout:\n```\n{out_snip}\n```" if out_snip else "") + (f"\n\nStderr:\n```\n{err_snip}\n```" if err_snip else "") + sync_note
             await interaction.followup.send(embed=Embed(title="Cookie Refresh Error", description=desc, color=discord.Color.orange()), ephemeral=True)
 
+    async def _require_owner(self, interaction: Interaction) -> bool:
+        try:
+            app_info = await self.bot.application_info()
+            if interaction.user.id == app_info.owner.id:
+                return True
+        except Exception:
+            pass
+        await interaction.response.send_message(embed=Embed(
+            title="❌ Owner Only",
+            description="This command can only be used by the bot owner.",
+            color=discord.Color.red()
+        ), ephemeral=True)
+        return False
+
+    @app_commands.command(name="musicstats", description="Owner-only: Music resolver cache and playback metrics")
+    async def musicstats(self, interaction: Interaction):
+        if not await self._require_owner(interaction):
+            return
+        sc = stream_cache.stats()
+        embed = Embed(title="📊 Music Stats", color=discord.Color.blurple())
+        embed.add_field(name="Stream URL Cache", value=(
+            f"**Entries:** {sc['entries']}\n"
+            f"**Hits / Misses:** {sc['hits']} / {sc['misses']} ({sc['hit_rate']:.1f}% hit)\n"
+            f"**Expired:** {sc['expired']}"
+        ), inline=False)
+        api = youtube_api.stats()
+        embed.add_field(name="YouTube Data API", value=(
+            f"**Requests:** {api['requests']} · **Quota used:** {api['quota_used']}\n"
+            f"**Batched video ids:** {api['batched_ids']} · **De-duplicated:** {api['deduped']}"
+        ), inline=False)
+        tc = track_cache.stats()
+        embed.add_field(name="Track Metadata Cache", value=(
+            f"**Stored:** {tc['videos']} tracks · {tc['searches']} searches\n"
+            f"**Hits / Misses:** {tc['hits']} / {tc['misses']} ({tc['hit_rate']:.1f}% hit)\n"
+            f"**Quota saved:** {tc['quota_saved']} units · **yt_dlp runs saved:** {tc['extractions_saved']}"
+        ), inline=False)
+        ex = extractor_pool.stats()
+        backend = (
+            f"**Workers:** {ex['workers']} · **Spawned / Killed:** {ex['spawned']} / {ex['killed']} · **Timeouts:** {ex['timeouts']}"
+            if ex['backend'] == "process" else f"**Extractors built:** {ex['builds']}"
+        )
+        embed.add_field(name=f"Extractor Pool ({ex['backend']})", value=(
+            f"**Running:** {ex['active']}/{ex['limit']} · **Queued:** {ex['queued']} across {ex['guilds_waiting']} guild(s) (peak {ex['peak_queued']})\n"
+            f"**Wait:** avg {ex['wait_avg']:.2f}s · p95 {ex['wait_p95']:.2f}s\n"
+            f"**Extraction:** avg {ex['run_avg']:.2f}s · p95 {ex['run_p95']:.2f}s\n"
+            f"**Done / Failed:** {ex['completed']} / {ex['failed']}\n{backend}"
+        ), inline=False)
+        ps = self.prefetch_stats
+        embed.add_field(name="Prefetch", value=f"**Used:** {ps['used']} · **Wasted:** {ps['wasted']} · **Failed:** {ps['failed']}", inline=False)
+        if self.gap_stats:
+            count = sum(g["count"] for g in self.gap_stats.values())
+            total = sum(g["total"] for g in self.gap_stats.values())
+            rows = []
+            for gid, g in sorted(self.gap_stats.items(), key=lambda kv: kv[1]["count"], reverse=True)[:10]:
+                guild = self.bot.get_guild(int(gid))
+                name = guild.name if guild else gid
+                rows.append(f"**{name}:** avg {g['total'] / g['count']:.2f}s · max {g['max']:.2f}s · last {g['last']:.2f}s ({g['count']})")
+            embed.add_field(name=f"Track Gaps (avg {total / count:.2f}s over {count})", value="\n".join(rows), inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="skip", description="Skips the current song.")
     async def skip(self, interaction: Interaction):
         if not self._user_is_dj(interaction):
@@ -872,16 +1400,14 @@ class Music(commands.Cog):
         await interaction.response.defer()
         debug_command("skip", interaction.user, interaction.guild)
         last_channels[str(interaction.guild.id)] = interaction.channel
-        if interaction.guild.voice_client and interaction.guild.voice_client.is_playing():
-            interaction.guild.voice_client.stop()
+        if await self._player(str(interaction.guild.id)).post("skip", interaction):
             embed = Embed(title="Skipped", description="Skipped to the next song.", color=discord.Color.orange())
             await interaction.followup.send(embed=embed)
-            save_queues(queues)
         else:
             embed = Embed(title="No Song Playing", description="Nothing to skip.", color=discord.Color.red())
             await interaction.followup.send(embed=embed)
 
-    @app_commands.command(name="stop", description="Pauses the music.")
+    @app_commands.command(name="stop", description="Pauses the music and stops loading a playlist.")
     async def stop(self, interaction: Interaction):
         if not self._user_is_dj(interaction):
             await interaction.response.send_message(embed=Embed(title="🎧 DJ Only", description="A DJ role is set. You cannot pause music.", color=discord.Color.red()), ephemeral=True)
@@ -890,10 +1416,16 @@ class Music(commands.Cog):
         debug_command("stop", interaction.user, interaction.guild)
         last_channels[str(interaction.guild.id)] = interaction.channel
         vc = interaction.guild.voice_client
+        loading_note = "\nStopped loading the playlist; songs already queued stay queued." if self._cancel_ingestion(str(interaction.guild.id)) else ""
         if vc and vc.is_playing():
             vc.pause()
-            embed = Embed(title="Paused", description="Music paused.", color=discord.Color.orange())
+            playing = self.currently_playing.get(str(interaction.guild.id))
+            if playing:
+                playing["paused_at"] = asyncio.get_event_loop().time()
+            embed = Embed(title="Paused", description="Music paused." + loading_note, color=discord.Color.orange())
             await interaction.followup.send(embed=embed)
+        elif loading_note:
+            await interaction.followup.send(embed=Embed(title="⏹️ Playlist Loading Stopped", description=loading_note.strip(), color=discord.Color.orange()))
         else:
             embed = Embed(title="No Music Playing", description="Nothing to pause.", color=discord.Color.red())
             await interaction.followup.send(embed=embed)
@@ -909,12 +1441,61 @@ class Music(commands.Cog):
         vc = interaction.guild.voice_client
         if vc and vc.is_paused():
             vc.resume()
+            playing = self.currently_playing.get(str(interaction.guild.id))
+            if playing and playing.get("paused_at") is not None:
+                playing["start_time"] += asyncio.get_event_loop().time() - playing.pop("paused_at")
             embed = Embed(title="Resumed", description="Music resumed.", color=discord.Color.green())
             await interaction.followup.send(embed=embed)
         else:
             embed = Embed(title="Not Paused", description="Nothing is paused.", color=discord.Color.red())
             await interaction.followup.send(embed=embed)
 
+    @app_commands.command(name="resume", description="Picks up the music session that was playing before the bot restarted.")
+    async def resume(self, interaction: Interaction):
+        if not self._user_is_dj(interaction):
+            await interaction.response.send_message(embed=Embed(title="🎧 DJ Only", description="A DJ role is set. You cannot resume the session.", color=discord.Color.red()), ephemeral=True)
+            return
+        await interaction.response.defer(thinking=True)
+        debug_command("resume", interaction.user, interaction.guild)
+        guild_id = str(interaction.guild.id)
+        q = queues.get(guild_id)
+        if guild_id not in self.restored or q is None or (not q and q.current is None):
+            await interaction.followup.send(embed=Embed(title="📭 Nothing to Resume", description="There's no saved session from before the restart. Use /play to start one.", color=discord.Color.red()))
+            return
+
+        channel = interaction.guild.get_channel(q.voice_channel_id) if q.voice_channel_id else None
+        if not isinstance(channel, (discord.VoiceChannel, discord.StageChannel)):
+            channel = interaction.user.voice.channel if interaction.user.voice else None
+        if channel is None:
+            await interaction.followup.send(embed=Embed(title="🔇 No Voice Channel", description="I couldn't find the channel I was playing in. Join a voice channel and try again.", color=discord.Color.red()))
+            return
+
+        self.force_stopped[guild_id] = False
+        last_channels[guild_id] = interaction.channel
+        self._requeue_current(guild_id)
+        head = q.peek()
+        offset = int(head.get('start_offset') or 0)
+        at = f" from {offset // 60}:{offset % 60:02d}" if offset else ""
+        msg = await interaction.followup.send(embed=Embed(
+            title="⏯️ Resuming Session",
+            description=f"Picking up **{head['title']}**{at} with {len(q) - 1} more queued.",
+            color=discord.Color.blurple()
+        ), wait=True)
+
+        await self._resolve_for_resume(guild_id)
+        try:
+            vc = interaction.guild.voice_client
+            if vc is None:
+                await channel.connect()
+            elif vc.channel != channel:
+                await vc.move_to(channel)
+        except Exception as e:
+            print(f"{RED}❌ Voice connect failed: {e}{RESET}")
+            self.restored.add(guild_id)  # the queue is intact; let them try again
+            await msg.edit(embed=Embed(title="❌ Voice Connect Failed", description=f"Couldn't join {channel.mention}: {e}", color=discord.Color.red()))
+            return
+        await self._player(guild_id).post("play", interaction, msg=msg)
+
     @app_commands.command(name="leave", description="Disconnects from voice and clears queue.")
     async def leave(self, interaction: Interaction):
         if not self._user_is_dj(interaction):
@@ -925,17 +1506,13 @@ class Music(commands.Cog):
 
         guild_id = str(interaction.guild.id)
         last_channels[guild_id] = interaction.channel
-        vc = interaction.guild.voice_client
 
-        # ✅ Mark this server as force-stopped
+        # ✅ Mark this server as force-stopped (a transition in progress bails out on this)
         self.force_stopped[guild_id] = True
+        self._cancel_ingestion(guild_id)
 
-        # ✅ Clear queue and save
-        queues[guild_id] = []
-        save_queues(queues)
-
-        if vc:
-            await vc.disconnect()
+        # ✅ Clear queue (and its saved log) and disconnect, in order with playback
+        if await self._player(guild_id).post("stop", interaction):
             embed = Embed(
                 title="Jeng has ran away.",
                 description="Left the voice channel.",
@@ -960,9 +1537,10 @@ class Music(commands.Cog):
             return
         await interaction.response.defer()
         guild_id = str(interaction.guild.id)
-        if guild_id in queues and queues[guild_id]:
-            
-            random.shuffle(queues[guild_id])
+        if queues.get(guild_id):
+            queues[guild_id].shuffle()
+            if guild_id in self.currently_playing:
+                self._schedule_prefetch(guild_id)
             await interaction.followup.send(embed=Embed(title="🔀 Queue Shuffled", description="The queue has been shuffled.", color=discord.Color.green()))
         else:
             await interaction.followup.send(embed=Embed(title="📭 Empty Queue", description="There is nothing to shuffle.", color=discord.Color.red()))
@@ -984,9 +1562,6 @@ class Music(commands.Cog):
         voice_client = interaction.guild.voice_client
         last_channels[guild_id] = interaction.channel
 
-        if guild_id not in queues:
-            queues[guild_id] = []
-
         # reject mixes and watch-with-list links up-front
         if url.startswith("http") and (self._is_youtube_mix(url) or self._is_watch_with_list(url)):
             if self._is_youtube_mix(url):
@@ -1005,9 +1580,17 @@ class Music(commands.Cog):
         else:
             # Default to YouTube search for plain text
             query = f"ytsearch1:{url.strip()}"
-        # run blocking extraction in a thread
+
+        if url.startswith('http') and ('playlist' in url.lower() or 'list=' in url.lower()):
+            if guild_id in self.ingestions:
+                await interaction.followup.send(embed=Embed(title="⏳ Playlist Already Loading", description="Another playlist is still loading. Use /stop to cancel it first.", color=discord.Color.orange()), ephemeral=True)
+                return
+            msg = await interaction.followup.send(embed=Embed(title="📥 Loading Playlist...", description="Fetching the first page...", color=discord.Color.blurple()), wait=True)
+            self._start_ingestion(interaction, msg, url)
+            return
+
         try:
-            data = await asyncio.to_thread(self.get_yt_info, query)
+            data = await self.get_yt_info(query, guild_id=guild_id)
         except Exception as e:
             await interaction.followup.send(embed=Embed(title="⚠️ Extraction Failed", description=f"Failed to retrieve info: {e}", color=discord.Color.red()), ephemeral=True)
             return
@@ -1024,33 +1607,7 @@ class Music(commands.Cog):
                 skipped.append(title)
                 continue
 
-            vid_id = info.get('id')
-            webpage = info.get('webpage_url') or None
-            raw_url = info.get('url')
-            if not webpage and isinstance(raw_url, str):
-                if raw_url.startswith('http') and 'api.soundcloud.com' not in raw_url:
-                    webpage = raw_url
-
-            if not webpage and isinstance(vid_id, str):
-                if vid_id.startswith('soundcloud:tracks:'):
-                    sc_id = vid_id.split(':')[-1]
-                    uploader = info.get('uploader') or info.get('uploader_id') or info.get('creator') or 'unknown'
-                    title = info.get('title') or sc_id
-                    title_slug = ''.join(ch if ch.isalnum() or ch == '-' else '-' for ch in title.replace(' ', '-')).strip('-').lower()
-                    webpage = f"https://soundcloud.com/{uploader}/{title_slug}"
-                else:
-                    webpage = (f"https://www.youtube.com/watch?v={vid_id}" if vid_id else None)
-            song = {
-                'id': vid_id,
-                'webpage_url': webpage,
-                'stream_url': None,
-                'search_query': query if is_sc_search else None,
-                'title': info.get('title', 'Unknown'),
-                'thumbnail': info.get('thumbnail', ''),
-                'duration': dur
-            }
-            queues[guild_id].append(song)
-            songs_added.append(song)
+            songs_added.append(self._song_from_info(info, query if is_sc_search else None))
 
         # notify user about skipped too-long videos
         if len(entries) == 1 and skipped:
@@ -1065,16 +1622,20 @@ class Music(commands.Cog):
 
         await asyncio.sleep(0.5)  # you can increase this to 0.5 if needed
 
-        save_queues(queues)
-
-        was_playing = voice_client.is_playing() if voice_client else False
         if not voice_client:
             voice_client = await self.safe_connect(interaction)
 
-        if not was_playing and len(queues[guild_id]) == len(songs_added):
+        player = self._player(guild_id)
+        started = False
+        if songs_added and await player.post("enqueue", interaction, songs=songs_added):
             msg = await interaction.followup.send(embed=Embed(title="Now Playing...", color=discord.Color.blurple()), wait=True)
-            await self.start_next(interaction, msg)
-        else:
+            started = await player.post("play", interaction, msg=msg)
+            if not started:
+                try:
+                    await msg.delete()
+                except discord.HTTPException:
+                    pass
+        if not started:
             if len(songs_added) == 1:
                 embed = Embed(title="Added to Queue", description=songs_added[0]["title"], color=discord.Color.blue())
                 embed.set_thumbnail(url=songs_added[0]["thumbnail"])
@@ -1179,9 +1740,9 @@ class Music(commands.Cog):
 
         playlists = self.load_playlists()
 
-        # Validate the playlist lightly (cap handled in get_yt_info)
+        # Validate the playlist lightly: only its first entry
         try:
-            info = self.get_yt_info(link)
+            info = await self.get_yt_info(link, "1", guild_id)
             if not info:
                 await interaction.response.send_message(embed=Embed(
                     title="⚠️ Invalid Playlist",
@@ -8,14 +8,16 @@ import hashlib
 from typing import Optional
 import random
 import asyncio
+import math
 import time
 from utils.debug import debug_command
+from utils.cooldowns import cooldowns
 
 logger = logging.getLogger('jeng.reactionroles')
 logger.setLevel(logging.INFO)
 
 REACTION_FILE = 'reaction_roles.json'
-COOLDOWNS_FILE = 'reaction_roles_cooldowns.json'
+LEGACY_COOLDOWNS_FILE = 'reaction_roles_cooldowns.json'  # pre-engine store; imported once, then removed
 # NOTE: The file previously contained a very large, variant-filled palette.
 # To simplify and make names human-readable and unique, we override that
 # earlier palette here with a curated set of 100 distinct color names
@@ -323,24 +325,6 @@ def save_reaction_configs(data):
         json.dump(data, f, indent=4)
 
 
-def _load_cooldowns():
-    if os.path.exists(COOLDOWNS_FILE):
-        try:
-            with open(COOLDOWNS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
-
-
-def _save_cooldowns(data: dict):
-    try:
-        with open(COOLDOWNS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
-    except Exception:
-        pass
-
-
 def _fmt_remaining(seconds: int) -> str:
     seconds = max(0, int(seconds))
     h = seconds // 3600
@@ -365,9 +349,42 @@ class ReactionRoles(commands.Cog):
         # in-memory per-guild cooldowns when we detect long Retry-After values
         # maps guild_id -> unix timestamp (time.time()) until which bulk creations should be avoided
         self._guild_cooldowns = {}
+        # size-based per-user creation cooldowns (shared engine, persisted across restarts)
+        cooldowns.register('rr_create_small', 1800)
+        cooldowns.register('rr_create_large', 3600)
+        self._import_legacy_cooldowns()
+
+    def _import_legacy_cooldowns(self):
+        """Carry creation cooldowns over from reaction_roles_cooldowns.json, then delete it."""
+        if not os.path.exists(LEGACY_COOLDOWNS_FILE):
+            return
+        try:
+            with open(LEGACY_COOLDOWNS_FILE, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning(f'[ReactionRoles] Could not read {LEGACY_COOLDOWNS_FILE}: {e}')
+            return
+        # structure: { 'guilds': { guild_id: { user_id: { 'last_create': unix_ts } } } }
+        guilds = data.get('guilds', {}) if isinstance(data, dict) else {}
+        for gid, users in guilds.items():
+            if not isinstance(users, dict):
+                continue
+            for uid, entry in users.items():
+                try:
+                    last = int(entry.get('last_create', 0))
+                except Exception:
+                    continue
+                if last > 0:
+                    cooldowns.trigger_at('rr_create_small', uid, gid, last)
+                    cooldowns.trigger_at('rr_create_large', uid, gid, last)
+        cooldowns.flush()
+        try:
+            os.remove(LEGACY_COOLDOWNS_FILE)
+        except OSError:
+            pass
 
     async def cog_unload(self):
-        pass
+        cooldowns.flush(force=True)
 
     def _make_config_id(self, guild_id: int, base_name: str) -> str:
         h = hashlib.sha1(f"{guild_id}:{base_name}:{os.urandom(8)}".encode('utf-8')).hexdigest()
@@ -523,22 +540,17 @@ class ReactionRoles(commands.Cog):
             return
 
         # size-based per-user cooldown: 30m if <25 roles, else 1h
+        # (both buckets are triggered on every run; the requested count picks which one to check)
         try:
-            cooldown_seconds = 1800 if count < 25 else 3600
-            now_ts = int(time.time())
-            gid = str(interaction.guild.id)
-            uid = str(interaction.user.id)
-            cds = _load_cooldowns()
-            last = int(cds.get('guilds', {}).get(gid, {}).get(uid, {}).get('last_create', 0))
-            elapsed = now_ts - last
-            if last > 0 and elapsed < cooldown_seconds:
-                remaining = cooldown_seconds - elapsed
-                embed = discord.Embed(title='⏳ Cooldown in effect', description=f'You can create roles again in { _fmt_remaining(remaining) } (based on requested count).', color=discord.Color.orange())
+            bucket = 'rr_create_small' if count < 25 else 'rr_create_large'
+            remaining = cooldowns.remaining(bucket, interaction.user.id, interaction.guild.id)
+            if remaining > 0:
+                embed = discord.Embed(title='⏳ Cooldown in effect', description=f'You can create roles again in { _fmt_remaining(math.ceil(remaining)) } (based on requested count).', color=discord.Color.orange())
                 await interaction.edit_original_response(embed=embed)
                 return
             # record now to prevent spam starts; will overwrite on success as well
-            cds.setdefault('guilds', {}).setdefault(gid, {}).setdefault(uid, {})['last_create'] = now_ts
-            _save_cooldowns(cds)
+            cooldowns.trigger('rr_create_small', interaction.user.id, interaction.guild.id)
+            cooldowns.trigger('rr_create_large', interaction.user.id, interaction.guild.id)
         except Exception:
             # do not block on cooldown system failure
             pass
@@ -892,11 +904,8 @@ class ReactionRoles(commands.Cog):
 
             # On successful completion, update cooldown timestamp definitively
             try:
-                cds = _load_cooldowns()
-                gid = str(guild.id)
-                uid = str(interaction.user.id)
-                cds.setdefault('guilds', {}).setdefault(gid, {}).setdefault(uid, {})['last_create'] = int(time.time())
-                _save_cooldowns(cds)
+                cooldowns.trigger('rr_create_small', interaction.user.id, guild.id)
+                cooldowns.trigger('rr_create_large', interaction.user.id, guild.id)
             except Exception:
                 pass
         except discord.Forbidden as e:
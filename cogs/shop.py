@@ -12,10 +12,13 @@ from utils.economy import (
     can_claim_daily,
     set_daily_claim,
     daily_time_until_next,
+    get_economy_stats,
+    rollup_economy_stats,
 )
 import random
 import re
 from utils.debug import debug_command
+from utils.botadmin import is_bot_admin
 
 SHOP_FILE = "shop.json"
 INV_FILE = "shop_inventory.json"
@@ -126,6 +129,16 @@ def _save_json(path: str, data):
         pass
 
 
+def _sparkline(values: list[int]) -> str:
+    """Render a compact unicode trend line for a numeric series."""
+    if not values:
+        return ""
+    bars = "▁▂▃▄▅▆▇█"
+    lo, hi = min(values), max(values)
+    span = (hi - lo) or 1
+    return "".join(bars[int((v - lo) * (len(bars) - 1) / span)] for v in values)
+
+
 class Shop(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
@@ -133,6 +146,8 @@ class Shop(commands.Cog):
         self._ensure_shop()
         # Start passive loop
         self.passive_timer.start()
+        # Periodic economy-health rollups (money supply time series)
+        self.economy_rollup.start()
         # Category choices for guild-specific items
         self.CATEGORY_VALUES = [
             "Starter",
@@ -148,6 +163,10 @@ class Shop(commands.Cog):
             self.passive_timer.cancel()
         except Exception:
             pass
+        try:
+            self.economy_rollup.cancel()
+        except Exception:
+            pass
 
     def _ensure_shop(self):
         data = _load_json(SHOP_FILE)
@@ -318,7 +337,7 @@ class Shop(commands.Cog):
             await interaction.response.send_message(embed=Embed(title="💸 Not Enough Coins", description=f"You need {total_cost:,} coins to buy {amount}× {item_name} (each {unit_cost:,}).", color=discord.Color.orange()), ephemeral=True)
             return
         # Deduct
-        if not remove_currency(uid, total_cost, guild_id=gid):
+        if not remove_currency(uid, total_cost, guild_id=gid, source="shop"):
             await interaction.response.send_message(embed=Embed(title="❌ Purchase Failed", description="Could not deduct coins.", color=discord.Color.red()), ephemeral=True)
             return
         # Update inv
@@ -353,7 +372,7 @@ class Shop(commands.Cog):
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         reward = random.randint(10000, 100000)
-        add_currency(uid, reward, guild_id=guild_id)
+        add_currency(uid, reward, guild_id=guild_id, source="daily")
         set_daily_claim(uid, guild_id=guild_id)
         embed = discord.Embed(
             title="🎁 Daily Reward",
@@ -497,6 +516,52 @@ class Shop(commands.Cog):
         embed = Embed(title="✅ Economy Wiped", description="All coin balances and owned items for this server have been wiped.", color=discord.Color.green())
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="economy_stats", description="Show money supply and coin sources for this server (bot-admin only)")
+    async def economy_stats(self, interaction: Interaction):
+        debug_command('economy_stats', interaction.user, interaction.guild)
+        if not isinstance(interaction.user, discord.Member) or not is_bot_admin(interaction.user):
+            await interaction.response.send_message("❌ You do not have permission to use this command.", ephemeral=True)
+            return
+        guild = interaction.guild
+        stats = get_economy_stats(str(guild.id))
+        supply = stats["supply"]
+        holders = stats["holders"]
+        avg = (supply / holders) if holders else 0
+        minted_total = sum(stats["minted"].values())
+        burned_total = sum(stats["burned"].values())
+
+        embed = discord.Embed(title="🏦 Economy Stats", color=discord.Color.gold())
+        embed.add_field(name="Money Supply", value=f"{supply:,} coins", inline=True)
+        embed.add_field(name="Holders", value=f"{holders:,}", inline=True)
+        embed.add_field(name="Avg / Holder", value=f"{avg:,.0f} coins", inline=True)
+
+        def _fmt_sources(flows: dict) -> str:
+            if not flows:
+                return "None"
+            ranked = sorted(flows.items(), key=lambda kv: kv[1], reverse=True)
+            return "\n".join(f"{src}: {amt:,}" for src, amt in ranked[:8])
+
+        embed.add_field(name=f"Minted ({minted_total:,})", value=_fmt_sources(stats["minted"]), inline=True)
+        embed.add_field(name=f"Burned ({burned_total:,})", value=_fmt_sources(stats["burned"]), inline=True)
+
+        # Trend from the hourly rollups: growth over the last 24 samples
+        series = stats["series"]
+        if series:
+            recent = series[-24:]
+            start_supply = recent[0][1]
+            change = supply - start_supply
+            pct = (change / start_supply * 100) if start_supply else 0
+            since = int(recent[0][0])
+            embed.add_field(
+                name="Trend",
+                value=f"`{_sparkline([p[1] for p in recent] + [supply])}`\n"
+                      f"{'+' if change >= 0 else ''}{change:,} coins ({pct:+.1f}%) since <t:{since}:R>",
+                inline=False,
+            )
+        else:
+            embed.add_field(name="Trend", value="Not enough history yet (sampled hourly).", inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     # Switch to 1-minute cadence and check per-guild interval
     @tasks.loop(minutes=1)
     async def passive_timer(self):
@@ -525,7 +590,7 @@ class Shop(commands.Cog):
                     total_income += int(info.get('income', 0)) * int(count)
                 if total_income > 0:
                     try:
-                        add_currency(uid, total_income, guild_id=gid)
+                        add_currency(uid, total_income, guild_id=gid, source="passive")
                         any_changes = True
                         guild_paid += total_income
                     except Exception:
@@ -540,6 +605,18 @@ class Shop(commands.Cog):
     async def before_passive_timer(self):
         await self.bot.wait_until_ready()
 
+    @tasks.loop(minutes=10)
+    async def economy_rollup(self):
+        # Cheap: only appends a sample per scope once ROLLUP_INTERVAL has passed
+        try:
+            rollup_economy_stats()
+        except Exception as e:
+            print(f"[ECONOMY] Rollup failed: {e}")
+
+    @economy_rollup.before_loop
+    async def before_economy_rollup(self):
+        await self.bot.wait_until_ready()
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Shop(bot))
@@ -1,13 +1,27 @@
-import random
 import discord
+import hashlib
+import itertools
 import json
 import os
-from datetime import datetime, timedelta
+from typing import NamedTuple
 from discord.ext import commands
 from discord import app_commands, Interaction
 from discord.ui import View, button
 from utils.economy import get_balance, add_currency, remove_currency
+from utils.cooldowns import cooldowns
+from utils.casino_stats import casino_stats, day_number, day_label, SESSION_TIMEOUT
+from utils.casino_sim import run_chunked, simulate_slots_chunk, split_chunks, new_seeds
+from utils.rtp_monitor import rtp_monitor
+from utils.rng import rng
+import math
 import re
+import time
+import asyncio
+import io
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageDraw, ImageFont
 
 # Owner ID (allow overriding via env YOUR_USER_ID)
 BOT_OWNER_ID = int(os.getenv('YOUR_USER_ID', '461008427326504970'))
@@ -64,16 +78,22 @@ PAYTABLE = {
 # Global label names for paylines in order of expansion
 LINE_LABELS = ["Middle", "Top", "Bottom", "Diag ↘", "Diag ↗"]
 
+# Integer symbol codes (index into SYMBOLS) used by the lookup tables
+SYMBOLS = [CHERRY, LEMON, BELL, CLOVER, DIAM, SEVEN]
+SYMBOL_CODES = {sym: i for i, sym in enumerate(SYMBOLS)}
+
+# Spins per worker job for /slotsim
+SIM_CHUNK = 250_000
+
 # ---------- helpers ----------
 
-def spin_reels() -> list[list[str]]:
-    """
-    Returns a 3x3 matrix window: rows x cols (rows=top/mid/bottom, cols=reel0..2).
-    Each reel picks a stop index; window rows are (idx-1, idx, idx+1) modulo REEL_LEN.
+def window_for_stops(stops) -> list[list[str]]:
+    """Build the 3x3 window (rows x cols) for one stop index per reel.
+
+    Window rows for a reel are (idx-1, idx, idx+1) modulo REEL_LEN.
     """
     cols = []
-    for r in range(NUM_REELS):
-        idx = random.randrange(REEL_LEN)
+    for r, idx in enumerate(stops):
         # window top/mid/bottom for this reel
         col = [
             REELS[r][(idx - 1) % REEL_LEN],  # top
@@ -83,35 +103,154 @@ def spin_reels() -> list[list[str]]:
         cols.append(col)
 
     # transpose to rows
-    rows = [[cols[c][r] for c in range(NUM_REELS)] for r in range(WINDOW_ROWS)]
-    return rows
+    return [[cols[c][r] for c in range(NUM_REELS)] for r in range(WINDOW_ROWS)]
 
-def evaluate_spin(window_rows: list[list[str]], lines: int, line_bet: int) -> tuple[int, list[str]]:
-    """Evaluate winnings across the SELECTED paylines only.
+# ---------- Precompiled spin tables ----------
 
-    Returns (total_payout, notes) where notes are human-readable results for
-    active lines. Only purchased (active) lines are paid. This prevents the
-    common confusion when a triple appears on an inactive line (e.g. bottom row
-    when only 1 line was bought -> only Middle is active)."""
-    total = 0
-    notes: list[str] = []
-    for idx, pattern in enumerate(PAYLINES[lines]):
-        line_symbols = [window_rows[row][col] for col, row in enumerate(pattern)]
-        name = LINE_LABELS[idx]
-        tpl = tuple(line_symbols)
+# Match kinds stored per line in a SpinResult
+KIND_NONE = 0
+KIND_TWO = 1      # first two reels match (consolation)
+KIND_TRIPLE = 2   # paid 3-in-a-row
+
+N_SYMBOLS = len(SYMBOLS)
+ALL_PAYLINES = PAYLINES[max(PAYLINES)]  # every payline, in LINE_LABELS order
+
+def compile_tables():
+    """Rebuild the integer lookup tables from REELS / PAYLINES / PAYTABLE.
+
+    A payline's symbols are packed into one code a*n*n + b*n + c, so its kind
+    and multiplier are single list lookups. There are only
+    REEL_LEN ** NUM_REELS stop combinations, so every combination's resolved
+    lines are cached as well (`_STOP_LUT`, indexed by the mixed-radix stop
+    index), making a live spin a single lookup.
+    """
+    global _MULT_LUT, _KIND_LUT, _STOP_LUT, _STOP_COMBOS
+    two_mult = PAYTABLE.get("TWO_MATCH", 0)
+    size = N_SYMBOLS ** NUM_REELS
+    mult = [0] * size
+    kind = [KIND_NONE] * size
+    for code, combo in enumerate(itertools.product(range(N_SYMBOLS), repeat=NUM_REELS)):
+        tpl = tuple(SYMBOLS[c] for c in combo)
         if tpl in PAYTABLE:
-            mult = PAYTABLE[tpl]
-            win = mult * line_bet
-            total += win
-            notes.append(f"{name}: {' '.join(line_symbols)}  →  x{mult}  (+{win})")
-        else:
-            # Simple two-match (first two reels) consolation
-            if line_symbols[0] == line_symbols[1] and PAYTABLE.get("TWO_MATCH"):
-                mult = PAYTABLE["TWO_MATCH"]
-                win = mult * line_bet
-                total += win
-                notes.append(f"{name}: {' '.join(line_symbols)}  →  2-match x{mult}  (+{win})")
-    return total, notes
+            mult[code] = PAYTABLE[tpl]
+            kind[code] = KIND_TRIPLE
+        elif combo[0] == combo[1] and two_mult:
+            mult[code] = two_mult
+            kind[code] = KIND_TWO
+    _MULT_LUT, _KIND_LUT = mult, kind
+
+    # cells[line][reel][stop]: symbol code on that line's row, pre-multiplied
+    # by the reel's place value (a line code is one entry per reel, summed)
+    cells = []
+    for pattern in ALL_PAYLINES:
+        per_reel = []
+        for r, row in enumerate(pattern):
+            place = N_SYMBOLS ** (NUM_REELS - 1 - r)
+            reel = REELS[r]
+            per_reel.append([SYMBOL_CODES[reel[(idx + row - 1) % len(reel)]] * place for idx in range(len(reel))])
+        cells.append(per_reel)
+
+    stop_lut = []
+    combos = list(itertools.product(*(range(len(reel)) for reel in REELS)))
+    for stops in combos:
+        codes = tuple(sum(reel_cells[r][s] for r, s in enumerate(stops)) for reel_cells in cells)
+        mults = tuple(mult[c] for c in codes)
+        # prefix[n] = total multiplier of the first n lines
+        prefix = tuple(itertools.accumulate(mults, initial=0))
+        stop_lut.append((codes, tuple(kind[c] for c in codes), mults, prefix))
+    _STOP_LUT = stop_lut
+    _STOP_COMBOS = combos
+
+compile_tables()
+
+class SpinResult(NamedTuple):
+    """Compact outcome of one spin; turned into text only when an embed is built.
+
+    `codes`, `kinds` and `mults` cover all paylines (not just purchased ones)
+    so inactive triples can be reported without re-evaluating the window.
+    """
+    stops: tuple[int, ...]
+    lines: int
+    line_bet: int
+    codes: tuple[int, ...]
+    kinds: tuple[int, ...]
+    mults: tuple[int, ...]
+    payout: int
+
+def evaluate_stops(stops, lines: int, line_bet: int) -> SpinResult:
+    """Resolve a spin from its stop indices using the precompiled tables.
+
+    Only purchased (active) lines are paid. This prevents the common
+    confusion when a triple appears on an inactive line (e.g. bottom row when
+    only 1 line was bought -> only Middle is active).
+    """
+    idx = 0
+    for reel, s in zip(REELS, stops):
+        idx = idx * len(reel) + s
+    codes, kinds, mults, prefix = _STOP_LUT[idx]
+    return SpinResult(tuple(stops), lines, line_bet, codes, kinds, mults, prefix[lines] * line_bet)
+
+# Live spins draw from their own bulk-refilled stream
+_SPIN_RNG = rng.stream("slots")
+
+def spin(lines: int, line_bet: int) -> SpinResult:
+    """Pick one of the equally likely stop combinations and resolve it.
+
+    Uniform over combinations is the same as uniform per reel, but costs a
+    single draw instead of one per reel.
+    """
+    idx = _SPIN_RNG.below(len(_STOP_LUT))
+    codes, kinds, mults, prefix = _STOP_LUT[idx]
+    return SpinResult(_STOP_COMBOS[idx], lines, line_bet, codes, kinds, mults, prefix[lines] * line_bet)
+
+def encode_tables(lines: int) -> dict:
+    """The compiled tables for `lines`, as plain lists for the simulator workers.
+
+    `mult`/`kind` are the same lookups live spins use; `offsets` are row
+    offsets (-1..+1) from the stop index per reel for each active payline.
+    """
+    return {
+        "reels": [[SYMBOL_CODES[sym] for sym in reel] for reel in REELS],
+        "n_symbols": N_SYMBOLS,
+        "mult": list(_MULT_LUT),
+        "kind": list(_KIND_LUT),
+        "offsets": [[row - 1 for row in pattern] for pattern in PAYLINES[lines]],
+    }
+
+# ---------- Rendering (embed time only) ----------
+
+def decode_line(code: int) -> list[str]:
+    syms = []
+    for _ in range(NUM_REELS):
+        code, c = divmod(code, N_SYMBOLS)
+        syms.append(SYMBOLS[c])
+    return syms[::-1]
+
+def spin_notes(result: SpinResult) -> list[str]:
+    """Human-readable results for the winning active lines."""
+    notes: list[str] = []
+    for idx in range(result.lines):
+        kind = result.kinds[idx]
+        if kind == KIND_NONE:
+            continue
+        mult = result.mults[idx]
+        line = " ".join(decode_line(result.codes[idx]))
+        label = f"x{mult}" if kind == KIND_TRIPLE else f"2-match x{mult}"
+        notes.append(f"{LINE_LABELS[idx]}: {line}  →  {label}  (+{mult * result.line_bet})")
+    return notes
+
+def inactive_triples(result: SpinResult, limit: int = 3) -> list[str]:
+    """Triples that landed on lines the player didn't buy (informational only).
+
+    Helps explain to players why they saw a triple but received no payout.
+    """
+    found = []
+    for idx in range(result.lines, len(ALL_PAYLINES)):
+        if result.kinds[idx] == KIND_TRIPLE:
+            found.append(f"{LINE_LABELS[idx]}: {' '.join(decode_line(result.codes[idx]))} (inactive)")
+            if len(found) >= limit:
+                break
+    return found
 
 def render_window_highlight(window_rows: list[list[str]], active_patterns: list[list[int]]) -> str:
     """Render the 3x3 window, bolding symbols that belong to any active payline.
@@ -133,29 +272,257 @@ def render_window_highlight(window_rows: list[list[str]], active_patterns: list[
         out_lines.append("  ".join(rendered))
     return "\n".join(out_lines)
 
-def find_inactive_triples(window_rows: list[list[str]], active_patterns: list[list[int]]) -> list[str]:
-    """Return descriptions of triple matches that occurred on inactive lines.
-
-    Helps explain to players why they saw a triple but received no payout.
-    Limited to first 3 to avoid clutter.
+def build_spin_embed(result: SpinResult, total_bet: int) -> discord.Embed:
+    grid = render_window_highlight(window_for_stops(result.stops), PAYLINES[result.lines])
+    active_names = ", ".join(LINE_LABELS[:result.lines])
+    desc = (
+        f"**Bet:** {total_bet}  |  **Lines:** {result.lines}\n"
+        f"Active Lines: {active_names}\n\n"
+        f"```\n{grid}\n```\n"
+    )
+    notes = spin_notes(result)
+    if notes:
+        desc += "\n".join(f"• {n}" for n in notes)
+    else:
+        desc += "No winning lines."
+    # Show missed inactive triples (informational only)
+    missed = inactive_triples(result)
+    if missed:
+        desc += "\n\nInactive triples (not paid):\n" + "\n".join(f"• {m}" for m in missed)
+
+    net = result.payout - total_bet
+    if net > 0:
+        color = discord.Color.green()
+    elif net == 0:
+        color = discord.Color.yellow()
+    else:
+        color = discord.Color.red()
+    embed = discord.Embed(title="🎰 Slots", description=desc, color=color)
+    embed.set_footer(text=f"Net: {'+' if net>0 else ''}{net} (Win {result.payout})")
+    return embed
+
+# ---------- Exact (analytic) RTP ----------
+
+# fingerprint -> result; recomputed automatically if REELS/PAYTABLE/PAYLINES change
+_EXACT_CACHE: dict[str, dict] = {}
+
+def _paytable_fingerprint(lines: int) -> str:
+    payload = json.dumps(
+        [REELS, sorted((repr(k), v) for k, v in PAYTABLE.items()), PAYLINES[lines]],
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def exact_rtp(lines: int) -> dict:
+    """Compute the true slot math for `lines` by enumerating every stop combination.
+
+    There are only REEL_LEN ** NUM_REELS equally likely outcomes, so this is
+    exact (no sampling noise). RTP assumes the wager splits evenly into line
+    bets. Rates are per spin: `hit_rate` is P(any paying line), the others
+    are expected counts per spin.
     """
-    active_set = {tuple(p) for p in active_patterns}
-    found = []
-    for idx, pattern in enumerate(PAYLINES[5]):  # examine all possible lines
-        if tuple(pattern) in active_set:
-            continue
-        line_symbols = [window_rows[row][col] for col, row in enumerate(pattern)]
-        if line_symbols[0] == line_symbols[1] == line_symbols[2]:
-            tpl = tuple(line_symbols)
-            if tpl in PAYTABLE:
-                found.append(f"{LINE_LABELS[idx]}: {' '.join(line_symbols)} (inactive)")
-        if len(found) >= 3:
-            break
-    return found
-
-def render_window(window_rows: list[list[str]]) -> str:
-    """Ascii/emoji rendering of the 3×3 slot window."""
-    return "\n".join("  ".join(row) for row in window_rows)
+    key = _paytable_fingerprint(lines)
+    cached = _EXACT_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    compile_tables()
+    combos = 0
+    total_mult = 0
+    hit_spins = 0
+    two_match = 0
+    triple_counts: dict[str, int] = {}
+    line_hits = [0] * lines
+    for stops in itertools.product(*(range(len(reel)) for reel in REELS)):
+        res = evaluate_stops(stops, lines, 1)
+        combos += 1
+        for idx in range(lines):
+            kind = res.kinds[idx]
+            if kind == KIND_NONE:
+                continue
+            line_hits[idx] += 1
+            if kind == KIND_TRIPLE:
+                sym = SYMBOLS[res.codes[idx] // N_SYMBOLS ** (NUM_REELS - 1)]
+                triple_counts[sym] = triple_counts.get(sym, 0) + 1
+            else:
+                two_match += 1
+        total_mult += res.payout
+        if res.payout:
+            hit_spins += 1
+
+    result = {
+        "lines": lines,
+        "combos": combos,
+        "rtp": total_mult / (combos * lines) * 100,
+        "hit_rate": hit_spins / combos * 100,
+        "two_match_rate": two_match / combos * 100,
+        "triples_per_spin": {sym: cnt / combos for sym, cnt in triple_counts.items()},
+        "line_hit_rates": [h / combos * 100 for h in line_hits],
+    }
+    _EXACT_CACHE[key] = result
+    return result
+
+# lines -> exact RTP as a return ratio; the live drift monitor reads this on every spin
+_THEORY_RTP: dict[int, float] = {}
+
+def theoretical_rtp(lines: int) -> float:
+    rtp = _THEORY_RTP.get(lines)
+    if rtp is None:
+        rtp = _THEORY_RTP[lines] = exact_rtp(lines)["rtp"] / 100
+    return rtp
+
+def check_paytable() -> list[dict]:
+    """Fast sanity check run at load: exact RTP for every line count.
+
+    Warns loudly if any configuration pays out 100% or more.
+    """
+    results = [exact_rtp(n) for n in sorted(PAYLINES)]
+    _THEORY_RTP.update({r["lines"]: r["rtp"] / 100 for r in results})
+    summary = " | ".join(f"{r['lines']}L {r['rtp']:.2f}%" for r in results)
+    print(f"[SLOTS] Exact RTP ({results[0]['combos']} stop combos): {summary}")
+    for r in results:
+        if r["rtp"] >= 100:
+            print(f"\033[31m[SLOTS] WARNING: {r['lines']}-line RTP is {r['rtp']:.2f}% (house loses money)\033[0m")
+    return results
+
+# ---------- Animated spin ----------
+
+# Optional symbol artwork (like cards/ for blackjack); drawn tiles are used when missing
+SYMBOLS_DIR = 'slot_symbols'
+SYMBOL_FILES = {CHERRY: 'cherry.png', LEMON: 'lemon.png', BELL: 'bell.png', CLOVER: 'clover.png', DIAM: 'diamond.png', SEVEN: 'seven.png'}
+# Fallback tile colours and labels
+SYMBOL_STYLE = {
+    CHERRY: ((200, 30, 60), "C"),
+    LEMON: ((235, 200, 40), "L"),
+    BELL: ((230, 150, 20), "B"),
+    CLOVER: ((40, 160, 70), "+"),
+    DIAM: ((60, 170, 230), "D"),
+    SEVEN: ((170, 20, 20), "7"),
+}
+TILE = 64
+REEL_GAP = 8
+SPIN_SPEED = TILE // 2        # pixels a moving reel advances per frame
+SPINUP_FRAMES = 6             # generic frames, identical for every spin (cached)
+SETTLE_STAGGER = 3            # frames between successive reels stopping
+FRAME_MS = 70
+FINAL_FRAME_MS = 60_000       # hold the result (GIFs loop in Discord)
+
+# Rendering runs here, off the event loop
+_RENDER_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="slots-render")
+_RENDER_LOCK = threading.Lock()
+_REEL_STRIPS: list = []       # one tall RGB image per reel (REEL_LEN + WINDOW_ROWS tiles, wrapped)
+_SPINUP_CACHE: list = []      # palette-mode spin-up frames
+_PALETTE = None               # shared palette image so every frame quantizes identically
+# Recent render timings (ms) for /slotrenderstats
+RENDER_TIMINGS: deque = deque(maxlen=200)
+
+def _symbol_tile(sym: str):
+    path = os.path.join(SYMBOLS_DIR, SYMBOL_FILES[sym])
+    if os.path.exists(path):
+        try:
+            with Image.open(path) as img:
+                tile = Image.new('RGB', (TILE, TILE), (24, 24, 28))
+                art = img.convert('RGBA').resize((TILE, TILE), Image.Resampling.LANCZOS)
+                tile.paste(art, (0, 0), art)
+                return tile
+        except Exception as e:
+            print(f"[SLOTS] Failed to load {path}: {e}")
+    color, label = SYMBOL_STYLE[sym]
+    tile = Image.new('RGB', (TILE, TILE), (24, 24, 28))
+    draw = ImageDraw.Draw(tile)
+    draw.rounded_rectangle((4, 4, TILE - 5, TILE - 5), radius=10, fill=color)
+    try:
+        font = ImageFont.truetype("DejaVuSans-Bold.ttf", TILE // 2)
+    except Exception:
+        font = ImageFont.load_default()
+    draw.text((TILE // 2, TILE // 2), label, fill=(255, 255, 255), font=font, anchor="mm")
+    return tile
+
+def _build_strips():
+    """Render every reel once as a tall strip; frames are crops of these."""
+    global _PALETTE
+    tiles = {sym: _symbol_tile(sym) for sym in SYMBOLS}
+    strips = []
+    for reel in REELS:
+        # Repeat the first WINDOW_ROWS stops at the bottom so any crop wraps seamlessly
+        order = reel + reel[:WINDOW_ROWS]
+        strip = Image.new('RGB', (TILE, TILE * len(order)))
+        for i, sym in enumerate(order):
+            strip.paste(tiles[sym], (0, i * TILE))
+        strips.append(strip)
+    _REEL_STRIPS[:] = strips
+    # One adaptive palette from all symbols keeps colours stable across frames
+    sample = Image.new('RGB', (TILE * len(SYMBOLS), TILE))
+    for i, sym in enumerate(SYMBOLS):
+        sample.paste(tiles[sym], (i * TILE, 0))
+    _PALETTE = sample.quantize(colors=64)
+
+def _compose_frame(offsets: list[int]):
+    """Window image for per-reel pixel offsets (top of the window within each strip)."""
+    width = NUM_REELS * TILE + (NUM_REELS - 1) * REEL_GAP
+    frame = Image.new('RGB', (width, WINDOW_ROWS * TILE), (12, 12, 16))
+    for r, y in enumerate(offsets):
+        strip = _REEL_STRIPS[r]
+        y %= len(REELS[r]) * TILE
+        frame.paste(strip.crop((0, y, TILE, y + WINDOW_ROWS * TILE)), (r * (TILE + REEL_GAP), 0))
+    return frame.quantize(palette=_PALETTE, dither=Image.Dither.NONE)
+
+def _spinup_frames() -> list:
+    # Reels accelerate from rest at stop 0; the same for every spin
+    if not _SPINUP_CACHE:
+        frames = []
+        y = 0
+        for k in range(SPINUP_FRAMES):
+            y += SPIN_SPEED * (k + 1) // SPINUP_FRAMES
+            frames.append(_compose_frame([y + r * TILE for r in range(NUM_REELS)]))
+        _SPINUP_CACHE[:] = frames
+    return _SPINUP_CACHE
+
+def _settle_frames(stops) -> list:
+    """Frames from full speed to rest; reel r stops SETTLE_STAGGER frames after reel r-1."""
+    finals = [((s - 1) % len(REELS[r])) * TILE for r, s in enumerate(stops)]
+    stop_at = [SETTLE_STAGGER * (r + 1) for r in range(NUM_REELS)]
+    frames = []
+    for k in range(stop_at[-1] + 1):
+        # Offsets are counted back from the final position so each reel lands exactly on it
+        frames.append(_compose_frame([finals[r] - SPIN_SPEED * max(0, stop_at[r] - k) for r in range(NUM_REELS)]))
+    return frames
+
+def render_spin_gif(stops) -> tuple[bytes, dict]:
+    """Animated GIF of a spin landing on `stops`. Returns (bytes, timings in ms)."""
+    timings = {}
+    started = time.perf_counter()
+    with _RENDER_LOCK:
+        # Strips and spin-up frames are built once and shared by every render
+        if not _REEL_STRIPS:
+            t = time.perf_counter()
+            _build_strips()
+            timings["strips"] = (time.perf_counter() - t) * 1000
+        t = time.perf_counter()
+        spinup = _spinup_frames()
+        timings["spinup"] = (time.perf_counter() - t) * 1000
+    t = time.perf_counter()
+    settle = _settle_frames(stops)
+    timings["settle"] = (time.perf_counter() - t) * 1000
+    frames = spinup + settle
+    durations = [FRAME_MS] * (len(frames) - 1) + [FINAL_FRAME_MS]
+    t = time.perf_counter()
+    buf = io.BytesIO()
+    frames[0].save(buf, format='GIF', save_all=True, append_images=frames[1:], duration=durations, optimize=False)
+    timings["encode"] = (time.perf_counter() - t) * 1000
+    timings["total"] = (time.perf_counter() - started) * 1000
+    RENDER_TIMINGS.append(timings)
+    return buf.getvalue(), timings
+
+async def render_spin_file(stops) -> discord.File | None:
+    """Render in the thread pool and wrap the result as spin.gif (None on failure)."""
+    try:
+        loop = asyncio.get_running_loop()
+        data, _ = await loop.run_in_executor(_RENDER_POOL, render_spin_gif, tuple(stops))
+    except Exception as e:
+        print(f"[SLOTS] Spin animation failed: {e}")
+        return None
+    return discord.File(io.BytesIO(data), filename="spin.gif")
 
 # ---------- Discord UI ----------
 
@@ -176,10 +543,9 @@ class SlotsView(View):
         if interaction.user.id != self.user_id:
             await interaction.response.send_message("This button isn’t for you.", ephemeral=True)
             return
-    # Enforce per-user cooldown (guild-configurable, min 1s)
+        # Enforce per-user cooldown (guild-configurable, min 1s)
         guild_id = str(interaction.guild.id) if interaction.guild else None
-        cd = self.cog.get_slots_cooldown_seconds(guild_id) if hasattr(self.cog, 'get_slots_cooldown_seconds') else 5
-        remaining = self.cog._cooldown_remaining(str(self.user_id), cd)
+        remaining = math.ceil(cooldowns.remaining("slots", self.user_id, guild_id))
         if remaining > 0:
             await interaction.response.send_message(
                 embed=discord.Embed(
@@ -201,51 +567,30 @@ class SlotsView(View):
             )
             return
         # Deduct and spin
-        if not remove_currency(str(self.user_id), total_bet, guild_id=guild_id):
+        if not remove_currency(str(self.user_id), total_bet, guild_id=guild_id, source="slots"):
             await interaction.response.send_message("❌ Bet failed.", ephemeral=True)
             return
         # Start cooldown after successful deduction
-        self.cog._mark_spin(str(self.user_id))
+        cooldowns.trigger("slots", self.user_id, guild_id)
 
-        window = spin_reels()
-        total_win, notes = evaluate_spin(window, self.lines, line_bet=total_bet // self.lines)
+        result = spin(self.lines, line_bet=total_bet // self.lines)
+        total_win = result.payout
+        net = total_win - total_bet
 
         if total_win:
-            add_currency(str(self.user_id), total_win, guild_id=guild_id)
-
-        grid = render_window_highlight(window, PAYLINES[self.lines])
-        active_names = ", ".join(LINE_LABELS[:self.lines])
-        desc = (
-            f"**Bet:** {total_bet}  |  **Lines:** {self.lines}\n"
-            f"Active Lines: {active_names}\n\n"
-            f"```\n{grid}\n```\n"
-        )
-        if notes:
-            desc += "\n".join(f"• {n}" for n in notes)
-        else:
-            desc += "No winning lines."
-        # Show missed inactive triples (informational only)
-        if self.lines < 5:
-            missed = find_inactive_triples(window, PAYLINES[self.lines])
-            if missed:
-                desc += "\n\nInactive triples (not paid):\n" + "\n".join(f"• {m}" for m in missed)
+            add_currency(str(self.user_id), total_win, guild_id=guild_id, source="slots")
 
-        net = total_win - total_bet
-        if net > 0:
-            color = discord.Color.green()
-        elif net == 0:
-            color = discord.Color.yellow()
-        else:
-            color = discord.Color.red()
-        footer = f"Net: {'+' if net>0 else ''}{net} (Win {total_win})"
-        embed = discord.Embed(title="🎰 Slots", description=desc, color=color)
-        embed.set_footer(text=footer)
+        embed = build_spin_embed(result, total_bet)
         # Record stats
         self.cog.record_spin(user_id=str(self.user_id), guild_id=guild_id, bet=total_bet, win=total_win, lines=self.lines, net=net)
 
-        await interaction.response.edit_message(embed=embed, view=self)
+        spin_file = await render_spin_file(result.stops)
+        if spin_file:
+            embed.set_image(url="attachment://spin.gif")
+            await interaction.response.edit_message(embed=embed, view=self, attachments=[spin_file])
+        else:
+            await interaction.response.edit_message(embed=embed, view=self, attachments=[])
 
-STATS_FILE = "slotstats.json"
 CASINO_CONFIG_FILE = "casino_config.json"
 
 def _load_cfg():
@@ -283,28 +628,29 @@ def _parse_duration_to_seconds(text: str) -> int:
             return val * 3600
     return 0
 
-def _load_stats():
-    if os.path.exists(STATS_FILE):
-        try:
-            with open(STATS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return {"guilds": {}}
-    return {"guilds": {}}
-
-def _save_stats(data):
-    try:
-        with open(STATS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
-    except Exception:
-        pass
-
 class Slots(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.stats = _load_stats()
-        # Per-user cooldown tracking for slot spins (in-memory)
-        self._last_spin_at: dict[str, datetime] = {}
+        # Validate the reel/paytable math once per load (cached by fingerprint)
+        try:
+            check_paytable()
+        except Exception as e:
+            print(f"[SLOTS] Paytable check failed: {e}")
+        # Per-user spin cooldown lives in the shared engine; seed guild overrides once
+        cooldowns.register("slots", 5)
+        for gid, cfg in _load_cfg().get("guilds", {}).items():
+            if "slots_cooldown" in cfg:
+                cooldowns.set_window("slots", gid, self.get_slots_cooldown_seconds(gid))
+            if "rtp_alert_z" in cfg:
+                rtp_monitor.set_threshold(gid, cfg["rtp_alert_z"])
+        # RTP drift alerts (slots and blackjack) go to the channel configured here
+        rtp_monitor.alert_handler = self.send_rtp_alert
+
+    def cog_unload(self):
+        if rtp_monitor.alert_handler == self.send_rtp_alert:
+            rtp_monitor.alert_handler = None
+        _RENDER_POOL.shutdown(wait=False)
+        casino_stats.flush()
 
     # ---- Config helpers ----
     def _get_guild_cfg(self, guild_id: str) -> dict:
@@ -326,107 +672,44 @@ class Slots(commands.Cog):
         except Exception:
             return 5
 
-    #  stats structure:
-    #  {
-    #    "guilds": {
-    #       guild_id: {
-    #          user_id: {
-    #             "spins": int,
-    #             "bet_total": int,
-    #             "win_total": int,
-    #             "net": int,
-    #             "biggest_win": int,
-    #             "last_bet": int,
-    #             "last_win": int,
-    #             "last_lines": int,
-    #             "last_play": iso str
-    #          }
-    #       }
-    #    }
-    #  }
-
-    SESSION_TIMEOUT = timedelta(minutes=30)  # inactivity resets session baseline
-
-    def _ensure_baseline(self, u: dict):
-        if u.get("session_baseline") is None:
-            u["session_baseline"] = {
-                "spins": u.get("spins", 0),
-                "bet_total": u.get("bet_total", 0),
-                "win_total": u.get("win_total", 0),
-                "net": u.get("net", 0),
-            }
-
-    def _maybe_reset_session(self, u: dict):
-        last_play = u.get("last_play")
-        if not last_play:
-            return
-        try:
-            last_dt = datetime.fromisoformat(last_play)
-        except Exception:
-            return
-        if datetime.utcnow() - last_dt > self.SESSION_TIMEOUT:
-            # Reset baseline to current totals after timeout
-            u["session_baseline"] = {
-                "spins": u.get("spins", 0),
-                "bet_total": u.get("bet_total", 0),
-                "win_total": u.get("win_total", 0),
-                "net": u.get("net", 0),
-            }
-
+    # Per-user totals and daily rollups live in utils.casino_stats (flushed in batches)
     def record_spin(self, user_id: str, guild_id: str | None, bet: int, win: int, lines: int, net: int):
         if not guild_id:
             return  # only track per guild for now
-        g = self.stats.setdefault("guilds", {}).setdefault(str(guild_id), {})
-        u = g.setdefault(user_id, {
-            "spins": 0,
-            "bet_total": 0,
-            "win_total": 0,
-            "net": 0,
-            "biggest_win": 0,
-            "last_bet": 0,
-            "last_win": 0,
-            "last_lines": 0,
-            "last_play": None,
-            "session_baseline": None,
-        })
-        # Possibly reset session baseline after inactivity
-        self._maybe_reset_session(u)
-        # Ensure baseline exists
-        self._ensure_baseline(u)
-        u["spins"] += 1
-        u["bet_total"] += bet
-        u["win_total"] += win
-        u["net"] += net
+        u = casino_stats.record("slots", guild_id, user_id, bet, win, {"biggest_win": 0, "last_bet": 0, "last_win": 0, "last_lines": 0})
         if win > u.get("biggest_win", 0):
             u["biggest_win"] = win
         u["last_bet"] = bet
         u["last_win"] = win
         u["last_lines"] = lines
-        u["last_play"] = datetime.utcnow().isoformat()
-        _save_stats(self.stats)
+        # Leftover coins from an uneven line split are never in play
+        rtp_monitor.observe(guild_id, "slots", bet, win, theoretical_rtp(lines) * (bet // lines * lines) / bet)
+
+    async def send_rtp_alert(self, alert: dict):
+        cfg = self._get_guild_cfg(alert["guild_id"])
+        channel = self.bot.get_channel(int(cfg.get("rtp_alert_channel", 0) or 0))
+        if channel is None:
+            return
+        name = {"slots": "🎰 Slots", "blackjack": "🃏 Blackjack"}.get(alert["game"], alert["game"])
+        embed = discord.Embed(
+            title="⚠️ RTP Drift Alert",
+            description=f"{name} is paying out well above its expected return (z = {alert['z']:.1f}).",
+            color=discord.Color.red()
+        )
+        embed.add_field(name="Observed RTP", value=f"{alert['rtp']:.2f}%", inline=True)
+        embed.add_field(name="Recent (EMA)", value=f"{alert['ema']:.2f}%", inline=True)
+        embed.add_field(name="Expected", value=f"{alert['expected']:.2f}%", inline=True)
+        embed.add_field(name="Rounds", value=f"{alert['rounds']}", inline=True)
+        embed.add_field(name="Wagered / Paid", value=f"{alert['wagered']} / {alert['paid']}", inline=True)
+        try:
+            await channel.send(embed=embed)
+        except Exception as e:
+            print(f"[CASINO] Failed to send RTP alert: {e}")
 
     def get_user_stats(self, user_id: str, guild_id: str | None):
         if not guild_id:
             return None
-        return self.stats.get("guilds", {}).get(str(guild_id), {}).get(user_id)
-
-    # ---- Cooldown helpers ----
-    def _cooldown_remaining(self, uid: str, cooldown_sec: int = 5) -> int:
-        last = self._last_spin_at.get(uid)
-        if not last:
-            return 0
-        try:
-            elapsed = (datetime.utcnow() - last).total_seconds()
-            rem = cooldown_sec - elapsed
-            if rem <= 0:
-                return 0
-            # round up to nearest whole second
-            return int(rem) if float(rem).is_integer() else int(rem) + 1
-        except Exception:
-            return 0
-
-    def _mark_spin(self, uid: str):
-        self._last_spin_at[uid] = datetime.utcnow()
+        return casino_stats.get_user("slots", guild_id, user_id)
 
     # ---- Admin: set slots cooldown ----
     @app_commands.command(name="slots_set_cooldown", description="Admin: Set per-user cooldown between slot spins (min 1s). Accepts 10, 10s, 2m, 1h.")
@@ -444,8 +727,54 @@ class Slots(commands.Cog):
         cfg = self._get_guild_cfg(str(guild.id))
         cfg["slots_cooldown"] = int(seconds)
         self._set_guild_cfg(str(guild.id), cfg)
+        cooldowns.set_window("slots", guild.id, seconds)
         await interaction.response.send_message(embed=discord.Embed(title="✅ Slots Cooldown Set", description=f"Slots spin cooldown set to {seconds}s.", color=discord.Color.green()), ephemeral=True)
 
+    # ---- Admin: RTP drift alerts ----
+    @app_commands.command(name="casino_alerts", description="Admin: Set the channel for casino RTP drift alerts (omit to disable)")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.describe(channel="Channel that receives alerts", threshold="Z-score that triggers an alert (default 4)")
+    async def casino_alerts(self, interaction: Interaction, channel: discord.TextChannel | None = None,
+                            threshold: app_commands.Range[float, 2.0, 10.0] | None = None):
+        guild = interaction.guild
+        if not guild:
+            await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+            return
+        cfg = self._get_guild_cfg(str(guild.id))
+        if channel is None:
+            cfg.pop("rtp_alert_channel", None)
+        else:
+            cfg["rtp_alert_channel"] = channel.id
+        if threshold is not None:
+            cfg["rtp_alert_z"] = float(threshold)
+        self._set_guild_cfg(str(guild.id), cfg)
+        rtp_monitor.set_threshold(guild.id, cfg.get("rtp_alert_z"))
+        where = channel.mention if channel else "nowhere (disabled)"
+        z = cfg.get("rtp_alert_z", rtp_monitor.z_threshold)
+        await interaction.response.send_message(embed=discord.Embed(title="✅ Casino Alerts Updated", description=f"RTP drift alerts go to {where} when z ≥ {z:g}.", color=discord.Color.green()), ephemeral=True)
+
+    @app_commands.command(name="rtpstatus", description="Admin: Live RTP drift figures for this server's casino games")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def rtpstatus(self, interaction: Interaction):
+        guild = interaction.guild
+        if not guild:
+            await interaction.response.send_message("❌ Use this in a server.", ephemeral=True)
+            return
+        snap = rtp_monitor.snapshot(guild.id)
+        if not snap:
+            await interaction.response.send_message("No casino rounds observed since the bot started.", ephemeral=True)
+            return
+        labels = {"slots": "🎰 Slots", "blackjack": "🃏 Blackjack"}
+        embed = discord.Embed(title="📈 RTP Monitor", description=f"Alert threshold: z ≥ {rtp_monitor.threshold_for(guild.id):g} after {rtp_monitor.min_rounds} rounds", color=discord.Color.blurple())
+        for game, s in snap.items():
+            embed.add_field(name=labels.get(game, game), value=(
+                f"**Rounds:** {s['rounds']}\n"
+                f"**Observed:** {s['rtp']:.2f}% (EMA {s['ema']:.2f}%)\n"
+                f"**Expected:** {s['expected']:.2f}%\n"
+                f"**z-score:** {s['z']:+.2f}"
+            ), inline=True)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="slots", description="Spin the slots! Bet between 1 and 50000. Choose 1–5 lines.")
     @app_commands.describe(wager="Total bet for this spin (1–50000)", lines="Number of paylines (1–5)")
     async def slots(self, interaction: Interaction,
@@ -454,9 +783,8 @@ class Slots(commands.Cog):
         uid = str(interaction.user.id)
         guild_id = str(interaction.guild.id) if interaction.guild else None
 
-        # Per-user cooldown: guild-configurable (min 3s)
-        cd = self.get_slots_cooldown_seconds(guild_id)
-        remaining = self._cooldown_remaining(uid, cd)
+        # Per-user cooldown: guild-configurable (min 1s)
+        remaining = math.ceil(cooldowns.remaining("slots", uid, guild_id))
         if remaining > 0:
             await interaction.response.send_message(
                 embed=discord.Embed(
@@ -486,51 +814,32 @@ class Slots(commands.Cog):
             return
 
         # Deduct up-front
-        if not remove_currency(uid, total_bet, guild_id=guild_id):
+        if not remove_currency(uid, total_bet, guild_id=guild_id, source="slots"):
             await interaction.response.send_message("❌ Bet failed.", ephemeral=True)
             return
         # Start cooldown after successful deduction so failed attempts don't throttle
-        self._mark_spin(uid)
+        cooldowns.trigger("slots", uid, guild_id)
 
         # Spin!
-        window = spin_reels()
-        total_win, notes = evaluate_spin(window, lines, line_bet=total_bet // lines)
+        result = spin(lines, line_bet=total_bet // lines)
+        total_win = result.payout
+        net = total_win - total_bet
 
         if total_win:
-            add_currency(uid, total_win, guild_id=guild_id)
-
-        grid = render_window_highlight(window, PAYLINES[lines])
-        active_names = ", ".join(LINE_LABELS[:lines])
-        desc = (
-            f"**Bet:** {total_bet}  |  **Lines:** {lines}\n"
-            f"Active Lines: {active_names}\n\n"
-            f"```\n{grid}\n```\n"
-        )
-        if notes:
-            desc += "\n".join(f"• {n}" for n in notes)
-        else:
-            desc += "No winning lines."
-        if lines < 5:
-            missed = find_inactive_triples(window, PAYLINES[lines])
-            if missed:
-                desc += "\n\nInactive triples (not paid):\n" + "\n".join(f"• {m}" for m in missed)
+            add_currency(uid, total_win, guild_id=guild_id, source="slots")
 
-        net = total_win - total_bet
-        if net > 0:
-            color = discord.Color.green()
-        elif net == 0:
-            color = discord.Color.yellow()
-        else:
-            color = discord.Color.red()
-        footer = f"Net: {'+' if net>0 else ''}{net} (Win {total_win})"
-        embed = discord.Embed(title="🎰 Slots", description=desc, color=color)
-        embed.set_footer(text=footer)
+        embed = build_spin_embed(result, total_bet)
 
         # Record stats
         self.record_spin(user_id=uid, guild_id=guild_id, bet=total_bet, win=total_win, lines=lines, net=net)
 
         view = SlotsView(self, interaction.user.id, total_bet, lines)
-        await interaction.response.send_message(embed=embed, view=view)
+        spin_file = await render_spin_file(result.stops)
+        if spin_file:
+            embed.set_image(url="attachment://spin.gif")
+            await interaction.response.send_message(embed=embed, view=view, file=spin_file)
+        else:
+            await interaction.response.send_message(embed=embed, view=view)
 
     @app_commands.command(name="slotstats", description="View your slot machine stats for this server (with session delta)")
     async def slotstats(self, interaction: Interaction):
@@ -548,7 +857,6 @@ class Slots(commands.Cog):
         win_total = stats.get("win_total", 0)
         net = stats.get("net", 0)
         biggest_win = stats.get("biggest_win", 0)
-        last_play = stats.get("last_play")  # kept for inactivity reset; not displayed
         avg_bet = (bet_total / spins) if spins else 0
         rtp = (win_total / bet_total * 100) if bet_total else 0
         baseline = stats.get("session_baseline")
@@ -558,7 +866,7 @@ class Slots(commands.Cog):
             delta_win = win_total - baseline.get("win_total", 0)
             delta_net = net - baseline.get("net", 0)
             session_block = (
-                f"\n__Session Δ__ (resets after {int(self.SESSION_TIMEOUT.total_seconds()/60)}m idle)\n"
+                f"\n__Session Δ__ (resets after {SESSION_TIMEOUT // 60}m idle)\n"
                 f"Spins: {delta_spins} | Bet: {delta_bet} | Won: {delta_win} | Net: {'+' if delta_net>=0 else ''}{delta_net}"
             )
         else:
@@ -584,24 +892,52 @@ class Slots(commands.Cog):
             await interaction.response.send_message("❌ This command must be used in a server.", ephemeral=True)
             return
         uid = str(interaction.user.id)
-        g = self.stats.setdefault("guilds", {}).setdefault(guild_id, {})
-        u = g.get(uid)
+        u = casino_stats.get_user("slots", guild_id, uid)
         if not u:
             await interaction.response.send_message("You have no stats yet.", ephemeral=True)
             return
-        u["session_baseline"] = {
-            "spins": u.get("spins", 0),
-            "bet_total": u.get("bet_total", 0),
-            "win_total": u.get("win_total", 0),
-            "net": u.get("net", 0),
-        }
-        _save_stats(self.stats)
+        casino_stats.reset_session("slots", u)
+        casino_stats.mark_dirty()
         await interaction.response.send_message("🔄 Session baseline reset. Future /slotstats deltas start from now.", ephemeral=True)
 
+    @app_commands.command(name="casinostats", description="View this server's daily casino totals (spins, hands, wagered, paid out, RTP)")
+    @app_commands.describe(days="How many days to include, ending today (1-90)")
+    async def casinostats(self, interaction: Interaction, days: app_commands.Range[int, 1, 90] = 7):
+        guild_id = str(interaction.guild.id) if interaction.guild else None
+        if not guild_id:
+            await interaction.response.send_message("❌ This command must be used in a server.", ephemeral=True)
+            return
+        end = day_number()
+        start = end - days + 1
+        totals = casino_stats.range_totals(guild_id, start, end)
+        if not totals:
+            await interaction.response.send_message(embed=discord.Embed(title="🎲 Casino Stats", description=f"No casino play in the last {days} day(s).", color=discord.Color.blurple()))
+            return
+        labels = {"slots": ("🎰 Slots", "spins"), "blackjack": ("🃏 Blackjack", "hands")}
+        embed = discord.Embed(title="🎲 Casino Stats", description=f"{day_label(start)} → {day_label(end)} (UTC)", color=discord.Color.gold())
+        for game, t in totals.items():
+            name, unit = labels.get(game, (game, "rounds"))
+            embed.add_field(name=name, value=(
+                f"**{unit.title()}:** {t['rounds']}\n"
+                f"**Wagered:** {t['wagered']}\n"
+                f"**Paid Out:** {t['paid']}\n"
+                f"**RTP:** {t['rtp']:.2f}%"
+            ), inline=True)
+        # Per-day breakdown (most recent first, capped to keep the embed short)
+        rows = []
+        for day, entry in reversed(casino_stats.daily_range(guild_id, start, end)[-10:]):
+            wagered = sum(b["wagered"] for b in entry.values())
+            paid = sum(b["paid"] for b in entry.values())
+            rounds = " · ".join(f"{labels.get(g, (g, 'rounds'))[0].split()[0]} {b['rounds']}" for g, b in entry.items())
+            rtp = (paid / wagered * 100) if wagered else 0
+            rows.append(f"`{day_label(day)}` {rounds} | {wagered} in / {paid} out ({rtp:.1f}%)")
+        embed.add_field(name="Daily", value="\n".join(rows), inline=False)
+        await interaction.response.send_message(embed=embed)
+
     @app_commands.command(name="slotsim", description="Simulate slot spins to estimate RTP (no balance impact) — owner only")
-    @app_commands.describe(spins="Number of simulated spins (10-200000)", wager="Total bet per spin (1-50000)", lines="Lines per spin (1-5)")
+    @app_commands.describe(spins="Number of simulated spins (10-10000000)", wager="Total bet per spin (1-50000)", lines="Lines per spin (1-5)")
     async def slotsim(self, interaction: Interaction,
-                      spins: app_commands.Range[int, 10, 200000],
+                      spins: app_commands.Range[int, 10, 10_000_000],
                       wager: app_commands.Range[int, 1, 50000] = 100,
                       lines: app_commands.Range[int, 1, 5] = 5):
         # Only allow bot owner to run this command
@@ -609,7 +945,7 @@ class Slots(commands.Cog):
             await interaction.response.send_message("❌ You are not authorized to use /slotsim.", ephemeral=True)
             return
 
-        # Ephemeral; heavy computation stays silent until done
+        # Ephemeral; heavy computation runs in worker processes
         await interaction.response.defer(thinking=True, ephemeral=True)
         if wager < lines:
             await interaction.followup.send("❌ Wager must be at least the number of lines.", ephemeral=True)
@@ -618,43 +954,40 @@ class Slots(commands.Cog):
         if line_bet <= 0:
             await interaction.followup.send("❌ Wager too small for chosen lines.", ephemeral=True)
             return
-        total_bet = 0
-        total_win = 0
-        any_hits = 0
-        two_match_hits = 0
-        triple_dist: dict[str, int] = {SEVEN:0, DIAM:0, BELL:0, CLOVER:0, CHERRY:0, LEMON:0}
-        line_hit_counts = [0]*lines
-        line_triple_counts = [0]*lines
-
-        for _ in range(spins):
-            total_bet += wager
-            window = spin_reels()
-            win, notes = evaluate_spin(window, lines, line_bet)
-            total_win += win
-            if win > 0:
-                any_hits += 1
-            for note in notes:
-                if ':' not in note:
-                    continue
-                label, remainder = note.split(':', 1)
-                label = label.strip()
+
+        tables = encode_tables(lines)
+        sizes = split_chunks(spins, SIM_CHUNK)
+        jobs = [(tables, n, seed) for n, seed in zip(sizes, new_seeds(len(sizes)))]
+        started = time.perf_counter()
+        progress = {"spins": 0, "last_edit": started}
+
+        async def on_progress(done: int, res: dict):
+            progress["spins"] += res["spins"]
+            now = time.perf_counter()
+            if done < len(jobs) and now - progress["last_edit"] >= 1.0:
+                progress["last_edit"] = now
                 try:
-                    idx = LINE_LABELS.index(label)
-                except ValueError:
-                    continue
-                if idx < lines:
-                    line_hit_counts[idx] += 1
-                    if '  →  x' in note and '2-match' not in note:
-                        seg = remainder.split('→',1)[0]
-                        tokens = [t for t in seg.split() if t]
-                        if len(tokens) >= 3 and tokens[0] == tokens[1] == tokens[2]:
-                            line_triple_counts[idx] += 1
-                if '2-match' in note:
-                    two_match_hits += 1
-            for pattern in PAYLINES[lines]:
-                ls = [window[row][col] for col, row in enumerate(pattern)]
-                if ls[0] == ls[1] == ls[2] and tuple(ls) in PAYTABLE:
-                    triple_dist[ls[0]] += 1
+                    await interaction.edit_original_response(content=f"🎰 Simulating… {progress['spins']:,}/{spins:,} spins")
+                except Exception:
+                    pass
+
+        try:
+            results = await run_chunked(simulate_slots_chunk, jobs, on_progress)
+        except Exception as e:
+            await interaction.followup.send(f"⚠️ Simulation failed: {e}", ephemeral=True)
+            return
+        elapsed = time.perf_counter() - started
+
+        total_bet = spins * wager
+        total_win = sum(r["total_mult"] for r in results) * line_bet
+        any_hits = sum(r["hits"] for r in results)
+        two_match_hits = sum(r["two_match"] for r in results)
+        line_hit_counts = [sum(r["line_hits"][i] for r in results) for i in range(lines)]
+        line_triple_counts = [sum(r["line_triples"][i] for r in results) for i in range(lines)]
+        triple_dist: dict[str, int] = {
+            sym: sum(r["triple_dist"][SYMBOL_CODES[sym]] for r in results)
+            for sym in (SEVEN, DIAM, BELL, CLOVER, CHERRY, LEMON)
+        }
 
         net = total_win - total_bet
         rtp = (total_win / total_bet * 100) if total_bet else 0
@@ -672,8 +1005,13 @@ class Slots(commands.Cog):
             line_dist = ' '.join(parts)
         else:
             line_dist = 'None'
+        exact = exact_rtp(lines)
+        exact_triples = " ".join(
+            f"{sym}:{exact['triples_per_spin'][sym] * spins:.1f}"
+            for sym in triple_dist if exact["triples_per_spin"].get(sym)
+        ) or "None"
         embed = discord.Embed(title="🎰 Slot Simulation", color=discord.Color.blurple(), description=(
-            f"Spins: {spins}\n"
+            f"Spins: {spins:,} ({elapsed:.2f}s, {len(jobs)} chunk(s))\n"
             f"Lines: {lines} (line bet {line_bet})\n"
             f"Total Bet: {total_bet}\n"
             f"Total Won: {total_win}\n"
@@ -682,9 +1020,38 @@ class Slots(commands.Cog):
             f"Hit Rate: {hit_rate:.2f}% (any win)\n"
             f"2-Match Rate: {two_match_rate:.2f}%\n"
             f"Triples (paid lines): {triple_str}\n"
-            f"Line Hits: {line_dist}"
+            f"Line Hits: {line_dist}\n\n"
+            f"__Exact ({exact['combos']} combos)__\n"
+            f"RTP: {exact['rtp']:.2f}% (sim Δ {rtp - exact['rtp']:+.2f}pp)\n"
+            f"Hit Rate: {exact['hit_rate']:.2f}% | 2-Match Rate: {exact['two_match_rate']:.2f}%\n"
+            f"Expected Triples: {exact_triples}"
         ))
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        await interaction.edit_original_response(content=None, embed=embed)
+
+    @app_commands.command(name="slotrenderstats", description="Owner only: Recent slot spin animation render timings")
+    async def slotrenderstats(self, interaction: Interaction):
+        if interaction.user.id != BOT_OWNER_ID:
+            await interaction.response.send_message("❌ You are not authorized to use /slotrenderstats.", ephemeral=True)
+            return
+        samples = list(RENDER_TIMINGS)
+        if not samples:
+            await interaction.response.send_message("No spins rendered yet.", ephemeral=True)
+            return
+        lines = []
+        for stage in ("spinup", "settle", "encode", "total"):
+            vals = sorted(t[stage] for t in samples)
+            p50 = vals[len(vals) // 2]
+            p95 = vals[min(len(vals) - 1, int(len(vals) * 0.95))]
+            lines.append(f"**{stage.title()}:** p50 {p50:.2f}ms | p95 {p95:.2f}ms | max {vals[-1]:.2f}ms")
+        strips = [t["strips"] for t in samples if "strips" in t]
+        if strips:
+            lines.append(f"**Reel strips (one-time):** {strips[0]:.2f}ms")
+        embed = discord.Embed(
+            title="🎰 Spin Render Timings",
+            description=f"Last {len(samples)} render(s), {len(_SPINUP_CACHE)} cached spin-up frame(s)\n\n" + "\n".join(lines),
+            color=discord.Color.blurple()
+        )
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Slots(bot))
@@ -1,34 +1,120 @@
 import discord
 from discord.ext import commands
 from discord import app_commands, Interaction, Embed
-import random
 import json
 import os
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from utils.economy import add_currency, get_balance
+from utils.cooldowns import cooldowns
+from utils.rng import rng
 
-COOLDOWN_FILE = "work_cooldowns.json"
 CONFIG_FILE = "work_config.json"  # per-guild config, e.g., cooldown seconds
+LEGACY_COOLDOWN_FILE = "work_cooldowns.json"  # pre-engine store; imported once, then removed
 DEFAULT_COOLDOWN = timedelta(hours=1)
 
+# Built-in (job, min pay, max pay); some can be negative for risk. Guilds can
+# add their own jobs or hide these with /workjob_add and /workjob_remove.
+JOBS = [
+    ("Pizza Delivery Driver", 100, 300),
+    ("Software Engineer", 300, 600),
+    ("Streamer", 200, 400),
+    ("Janitor", 80, 200),
+    ("Teacher", 150, 350),
+    ("Barista", 120, 250),
+    ("Taxi Driver", 150, 300),
+    ("Fast Food Worker", 90, 200),
+    ("Construction Worker", 200, 400),
+    ("Electrician", 250, 500),
+    ("Doctor", 500, 900),
+    ("Lawyer", 400, 800),
+    ("Cashier", 100, 220),
+    ("Chef", 200, 450),
+    ("Artist", 150, 500),
+    ("Graphic Designer", 200, 400),
+    ("Actor", 100, 800),
+    ("Musician", 50, 700),
+    ("Influencer", -100, 600),
+    ("Gambler", -200, 1000),
+    ("Mechanic", 200, 450),
+    ("Taxi Dispatcher", 180, 350),
+    ("Firefighter", 300, 600),
+    ("Police Officer", 250, 500),
+    ("Detective", 400, 700),
+    ("Game Developer", 250, 650),
+    ("Data Analyst", 300, 550),
+    ("Delivery Drone Operator", 180, 360),
+    ("AI Prompt Engineer", 400, 800),
+    ("Politician", -200, 1200),
+    ("Stock Trader", -500, 1200),
+    ("Thief", -300, 900),
+    ("Bounty Hunter", 300, 800),
+    ("Farmer", 120, 300),
+    ("Fisherman", 80, 220),
+    ("Journalist", 150, 400),
+    ("Soldier", 200, 500),
+    ("Scientist", 300, 700),
+    ("Astronaut", 500, 1000),
+    ("YouTuber", -150, 900),
+    ("Comedian", 100, 600),
+    ("Bank Robber", -1000, 2000),
+    ("Movie Director", 400, 900),
+    ("Streamer’s Editor", 180, 400),
+    ("Bot Developer", 250, 500),
+    ("Crypto Miner", -400, 1000),
+    ("Ice Cream Truck Driver", 120, 300),
+    ("Meme Lord", 50, 600),
+]
+_WORK_RNG = rng.stream("work")
 
-def load_cooldowns():
-    if os.path.exists(COOLDOWN_FILE):
-        try:
-            with open(COOLDOWN_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return data if isinstance(data, dict) else {}
-        except Exception:
-            return {}
-    return {}
+MAX_JOBS = 100
+JOB_NAME_MAX = 40
 
 
-def save_cooldowns(data: dict):
-    try:
-        with open(COOLDOWN_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-    except Exception:
-        pass
+class JobTable:
+    """A guild's job list compiled into parallel arrays plus a Vose alias table.
+
+    Picking a job is one uniform draw (slot index + alias coin from the same
+    number) and the payout is one more, independent of how many jobs exist.
+    """
+
+    __slots__ = ("names", "mins", "spans", "prob", "alias", "weights", "total")
+
+    def __init__(self, jobs: list[tuple[str, int, int, float]]):
+        self.names = [j[0] for j in jobs]
+        self.mins = [j[1] for j in jobs]
+        self.spans = [j[2] - j[1] + 1 for j in jobs]
+        self.weights = [j[3] for j in jobs]
+        self.total = sum(self.weights)
+        self.prob, self.alias = self._build_alias(self.weights)
+
+    @staticmethod
+    def _build_alias(weights: list[float]) -> tuple[list[float], list[int]]:
+        n = len(weights)
+        total = sum(weights)
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Leftovers are 1.0 up to float error
+        return prob, alias
+
+    def chance(self, i: int) -> float:
+        return self.weights[i] / self.total
+
+    def pick(self, stream) -> tuple[str, int]:
+        u = stream.random() * len(self.names)
+        i = int(u)
+        if u - i >= self.prob[i]:
+            i = self.alias[i]
+        return self.names[i], self.mins[i] + stream.below(self.spans[i])
 
 
 def load_config():
@@ -53,27 +139,49 @@ def save_config(data: dict):
 class Work(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        # cooldowns structure: { guild_id: { user_id: iso_timestamp } }
-        self.cooldowns = load_cooldowns()
-        # config structure: { guild_id: { "cooldown_seconds": int } }
+        # config structure: { guild_id: { "cooldown_seconds": int,
+        #   "custom_jobs": { name: {"min": int, "max": int, "weight": float} },
+        #   "hidden_jobs": [built-in job names] } }
         self.config = load_config()
+        # guild_id -> compiled JobTable (dropped whenever that guild's jobs change)
+        self._tables: dict[str, JobTable] = {}
+        # Per-user /work cooldown in the shared engine (long enough to be persisted)
+        cooldowns.register("work", DEFAULT_COOLDOWN.total_seconds())
+        for gid in self.config:
+            cooldowns.set_window("work", gid, self._get_guild_cooldown(gid).total_seconds())
+        self._import_legacy_cooldowns()
 
-    def _get_next_allowed(self, guild_id: int, user_id: int) -> datetime | None:
-        gid = str(guild_id)
-        uid = str(user_id)
-        iso = self.cooldowns.get(gid, {}).get(uid)
-        if not iso:
-            return None
-        try:
-            return datetime.fromisoformat(iso)
-        except Exception:
-            return None
+    def cog_unload(self):
+        cooldowns.flush(force=True)
 
-    def _set_next_allowed(self, guild_id: int, user_id: int, when: datetime):
-        gid = str(guild_id)
-        uid = str(user_id)
-        self.cooldowns.setdefault(gid, {})[uid] = when.isoformat()
-        save_cooldowns(self.cooldowns)
+    def _import_legacy_cooldowns(self):
+        """Carry running cooldowns over from work_cooldowns.json, then delete it."""
+        if not os.path.exists(LEGACY_COOLDOWN_FILE):
+            return
+        try:
+            with open(LEGACY_COOLDOWN_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[WORK] Could not read {LEGACY_COOLDOWN_FILE}: {e}")
+            return
+        now = time.time()
+        # structure: { guild_id: { user_id: iso_timestamp (UTC, next allowed use) } }
+        for gid, users in (data.items() if isinstance(data, dict) else ()):
+            if not isinstance(users, dict):
+                continue
+            window = self._get_guild_cooldown(gid).total_seconds()
+            for uid, iso in users.items():
+                try:
+                    until = datetime.fromisoformat(iso).replace(tzinfo=timezone.utc).timestamp()
+                except Exception:
+                    continue
+                if until > now:
+                    cooldowns.trigger_at("work", uid, gid, until - window)
+        cooldowns.flush()
+        try:
+            os.remove(LEGACY_COOLDOWN_FILE)
+        except OSError:
+            pass
 
     def _get_guild_cooldown(self, guild_id: int) -> timedelta:
         gid = str(guild_id)
@@ -89,6 +197,7 @@ class Work(commands.Cog):
         secs = max(60, int(td.total_seconds()))  # enforce minimum 60s at storage level
         self.config.setdefault(gid, {})["cooldown_seconds"] = secs
         save_config(self.config)
+        cooldowns.set_window("work", gid, secs)
 
     # Parse strings like "15m", "2h", "1d"; support compound like "1h30m" and space-separated
     def _parse_duration(self, s: str) -> timedelta | None:
@@ -130,63 +239,53 @@ class Work(commands.Cog):
             return f"{minutes}m {seconds}s"
         return f"{seconds}s"
 
-    def _pick_job(self) -> tuple[str, int]:
-        # Expanded job list with ranges; some can be negative for risk
-        jobs = [
-            ("Pizza Delivery Driver", random.randint(100, 300)),
-            ("Software Engineer", random.randint(300, 600)),
-            ("Streamer", random.randint(200, 400)),
-            ("Janitor", random.randint(80, 200)),
-            ("Teacher", random.randint(150, 350)),
-            ("Barista", random.randint(120, 250)),
-            ("Taxi Driver", random.randint(150, 300)),
-            ("Fast Food Worker", random.randint(90, 200)),
-            ("Construction Worker", random.randint(200, 400)),
-            ("Electrician", random.randint(250, 500)),
-            ("Doctor", random.randint(500, 900)),
-            ("Lawyer", random.randint(400, 800)),
-            ("Cashier", random.randint(100, 220)),
-            ("Chef", random.randint(200, 450)),
-            ("Artist", random.randint(150, 500)),
-            ("Graphic Designer", random.randint(200, 400)),
-            ("Actor", random.randint(100, 800)),
-            ("Musician", random.randint(50, 700)),
-            ("Influencer", random.randint(-100, 600)),
-            ("Gambler", random.randint(-200, 1000)),
-            ("Mechanic", random.randint(200, 450)),
-            ("Taxi Dispatcher", random.randint(180, 350)),
-            ("Firefighter", random.randint(300, 600)),
-            ("Police Officer", random.randint(250, 500)),
-            ("Detective", random.randint(400, 700)),
-            ("Game Developer", random.randint(250, 650)),
-            ("Data Analyst", random.randint(300, 550)),
-            ("Delivery Drone Operator", random.randint(180, 360)),
-            ("AI Prompt Engineer", random.randint(400, 800)),
-            ("Politician", random.randint(-200, 1200)),
-            ("Stock Trader", random.randint(-500, 1200)),
-            ("Thief", random.randint(-300, 900)),
-            ("Bounty Hunter", random.randint(300, 800)),
-            ("Farmer", random.randint(120, 300)),
-            ("Fisherman", random.randint(80, 220)),
-            ("Journalist", random.randint(150, 400)),
-            ("Soldier", random.randint(200, 500)),
-            ("Scientist", random.randint(300, 700)),
-            ("Astronaut", random.randint(500, 1000)),
-            ("YouTuber", random.randint(-150, 900)),
-            ("Comedian", random.randint(100, 600)),
-            ("Bank Robber", random.randint(-1000, 2000)),
-            ("Movie Director", random.randint(400, 900)),
-            ("Streamer’s Editor", random.randint(180, 400)),
-            ("Bot Developer", random.randint(250, 500)),
-            ("Crypto Miner", random.randint(-400, 1000)),
-            ("Ice Cream Truck Driver", random.randint(120, 300)),
-            ("Meme Lord", random.randint(50, 600)),
-        ]
-        return random.choice(jobs)
+    # ---- Job table ----
+    def _guild_jobs(self, guild_id) -> list[tuple[str, int, int, float]]:
+        """Built-in jobs (minus hidden ones) followed by the guild's custom jobs."""
+        cfg = self.config.get(str(guild_id), {})
+        hidden = set(cfg.get("hidden_jobs", []))
+        jobs = [(name, lo, hi, 1.0) for name, lo, hi in JOBS if name not in hidden]
+        for name, job in cfg.get("custom_jobs", {}).items():
+            jobs.append((name, int(job["min"]), int(job["max"]), float(job.get("weight", 1.0))))
+        return jobs
+
+    def _job_table(self, guild_id) -> JobTable | None:
+        gid = str(guild_id)
+        table = self._tables.get(gid)
+        if table is None:
+            jobs = self._guild_jobs(gid)
+            if not jobs:
+                return None
+            table = self._tables[gid] = JobTable(jobs)
+        return table
+
+    def _pick_job(self, guild_id) -> tuple[str, int] | None:
+        table = self._job_table(guild_id)
+        return table.pick(_WORK_RNG) if table else None
+
+    async def _require_admin(self, interaction: Interaction) -> bool:
+        if interaction.guild is None:
+            await interaction.response.send_message(
+                embed=Embed(title="Guild Only", description="This command can only be used in a server.", color=discord.Color.red()),
+                ephemeral=True,
+            )
+            return False
+        perms = interaction.user.guild_permissions
+        if not (perms.administrator or perms.manage_guild):
+            await interaction.response.send_message(
+                embed=Embed(title="❌ Missing Permission", description="You need Administrator or Manage Server to change jobs.", color=discord.Color.red()),
+                ephemeral=True,
+            )
+            return False
+        return True
+
+    def _save_jobs(self, guild_id, cfg: dict):
+        self.config[str(guild_id)] = cfg
+        save_config(self.config)
+        self._tables.pop(str(guild_id), None)
 
     @app_commands.command(name="work", description="Work a random job and earn some coins!")
     async def work(self, interaction: Interaction):
-        now = datetime.utcnow()
         guild = interaction.guild
         if guild is None:
             await interaction.response.send_message(
@@ -195,9 +294,9 @@ class Work(commands.Cog):
             )
             return
 
-        next_allowed = self._get_next_allowed(guild.id, interaction.user.id)
-        if next_allowed and now < next_allowed:
-            remaining = next_allowed - now
+        remaining_sec = cooldowns.remaining("work", interaction.user.id, guild.id)
+        if remaining_sec > 0:
+            remaining = timedelta(seconds=remaining_sec)
             await interaction.response.send_message(
                 embed=Embed(
                     title="⏳ You’re tired!",
@@ -208,9 +307,16 @@ class Work(commands.Cog):
             )
             return
 
-        job, reward = self._pick_job()
+        picked = self._pick_job(guild.id)
+        if picked is None:
+            await interaction.response.send_message(
+                embed=Embed(title="No Jobs", description="This server has no jobs available. An admin can add some with /workjob_add.", color=discord.Color.orange()),
+                ephemeral=True,
+            )
+            return
+        job, reward = picked
         # Optional tweak: random multiplier 0.8–1.2
-        multiplier = random.uniform(0.8, 1.2)
+        multiplier = _WORK_RNG.uniform(0.8, 1.2)
         reward = int(reward * multiplier)
         # Ensure rewards end with a 0 by scaling by 10
         reward *= 10
@@ -218,14 +324,11 @@ class Work(commands.Cog):
         # Apply reward via guild-scoped balance
         uid = str(interaction.user.id)
         gid = str(guild.id)
-        add_currency(uid, reward, guild_id=gid)
+        add_currency(uid, reward, guild_id=gid, source="work")
         balance = get_balance(uid, guild_id=gid)
 
-        # Set cooldown (use per-guild configured or default)
-        cooldown_td = self._get_guild_cooldown(guild.id)
-        if cooldown_td.total_seconds() < 60:
-            cooldown_td = timedelta(seconds=60)
-        self._set_next_allowed(guild.id, interaction.user.id, now + cooldown_td)
+        # Start cooldown (per-guild configured window or default)
+        cooldowns.trigger("work", interaction.user.id, guild.id)
 
         # Build embed output
         color = discord.Color.green() if reward >= 0 else discord.Color.red()
@@ -277,6 +380,87 @@ class Work(commands.Cog):
             ephemeral=True,
         )
 
+    # ---- Admin: custom jobs ----
+    @app_commands.command(name="workjob_add", description="Admin: Add or update a custom /work job for this server")
+    @app_commands.describe(name="Job name", min_pay="Lowest base pay (x10 after the bonus roll)", max_pay="Highest base pay", weight="How often it comes up relative to built-in jobs (default 1)")
+    async def workjob_add(self, interaction: Interaction, name: str,
+                          min_pay: app_commands.Range[int, -2000, 5000],
+                          max_pay: app_commands.Range[int, -2000, 5000],
+                          weight: app_commands.Range[float, 0.1, 100.0] = 1.0):
+        if not await self._require_admin(interaction):
+            return
+        name = " ".join(name.split())
+        if not name or len(name) > JOB_NAME_MAX:
+            await interaction.response.send_message(f"❌ Job names must be 1–{JOB_NAME_MAX} characters.", ephemeral=True)
+            return
+        if min_pay > max_pay:
+            await interaction.response.send_message("❌ Minimum pay can't be above maximum pay.", ephemeral=True)
+            return
+        gid = str(interaction.guild.id)
+        cfg = self.config.get(gid, {})
+        custom = cfg.setdefault("custom_jobs", {})
+        if name in {j[0] for j in JOBS}:
+            await interaction.response.send_message("❌ That's a built-in job name; pick another (or hide the built-in with /workjob_remove).", ephemeral=True)
+            return
+        if name not in custom and len(self._guild_jobs(gid)) >= MAX_JOBS:
+            await interaction.response.send_message(f"❌ This server already has {MAX_JOBS} jobs.", ephemeral=True)
+            return
+        custom[name] = {"min": int(min_pay), "max": int(max_pay), "weight": float(weight)}
+        self._save_jobs(gid, cfg)
+        table = self._job_table(gid)
+        chance = table.chance(table.names.index(name)) * 100
+        await interaction.response.send_message(
+            embed=Embed(title="✅ Job Saved", description=f"**{name}** pays {min_pay * 10}–{max_pay * 10} coins (before the bonus roll) and comes up {chance:.1f}% of the time.", color=discord.Color.green()),
+            ephemeral=True,
+        )
+
+    @app_commands.command(name="workjob_remove", description="Admin: Remove a custom /work job, or hide/unhide a built-in one")
+    @app_commands.describe(name="Job name (exact)")
+    async def workjob_remove(self, interaction: Interaction, name: str):
+        if not await self._require_admin(interaction):
+            return
+        gid = str(interaction.guild.id)
+        cfg = self.config.get(gid, {})
+        custom = cfg.get("custom_jobs", {})
+        hidden = cfg.setdefault("hidden_jobs", [])
+        if name in custom:
+            del custom[name]
+            msg = f"Removed custom job **{name}**."
+        elif name in hidden:
+            hidden.remove(name)
+            msg = f"Built-in job **{name}** is available again."
+        elif name in {j[0] for j in JOBS}:
+            hidden.append(name)
+            msg = f"Built-in job **{name}** is now hidden. Run this again to bring it back."
+        else:
+            await interaction.response.send_message(f"❌ No job named **{name}**. See /workjob_list.", ephemeral=True)
+            return
+        self._save_jobs(gid, cfg)
+        await interaction.response.send_message(embed=Embed(title="✅ Jobs Updated", description=msg, color=discord.Color.green()), ephemeral=True)
+
+    @app_commands.command(name="workjob_list", description="List this server's /work jobs, pay ranges and odds")
+    async def workjob_list(self, interaction: Interaction):
+        if interaction.guild is None:
+            await interaction.response.send_message("❌ This command can only be used in a server.", ephemeral=True)
+            return
+        gid = str(interaction.guild.id)
+        table = self._job_table(gid)
+        if table is None:
+            await interaction.response.send_message("This server has no jobs available.", ephemeral=True)
+            return
+        custom = self.config.get(gid, {}).get("custom_jobs", {})
+        rows = [
+            f"{'⭐ ' if name in custom else ''}**{name}** — {lo * 10}–{(lo + span - 1) * 10} ({table.chance(i) * 100:.1f}%)"
+            for i, (name, lo, span) in enumerate(zip(table.names, table.mins, table.spans))
+        ]
+        hidden = self.config.get(gid, {}).get("hidden_jobs", [])
+        embed = Embed(title="💼 Jobs", description="\n".join(rows)[:4000], color=discord.Color.blurple())
+        footer = "⭐ = custom job · pay shown before the 0.8–1.2x bonus roll"
+        if hidden:
+            footer += f" · {len(hidden)} built-in job(s) hidden"
+        embed.set_footer(text=footer)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 async def setup(bot):
     await bot.add_cog(Work(bot))
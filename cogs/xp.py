@@ -132,7 +132,7 @@ class XP(commands.Cog):
                 
                 # Award currency on level up: 100 * new_level
                 try:
-                    add_currency(str(message.author.id), coin_reward, guild_id=guild_id)
+                    add_currency(str(message.author.id), coin_reward, guild_id=guild_id, source="levelup")
                 except Exception:
                     pass
                 # Assign role if configured for this level
@@ -0,0 +1,281 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Optional
+
+import numpy as np
+
+# Simulations run in worker processes so they never hold the event loop (or the GIL).
+# Workers only import this module, not the cogs, so they start quickly.
+# The pool is shared by /slotsim and /blackjacksim, so no cog shuts it down on
+# unload; it lives as long as the process.
+_POOL: Optional[ProcessPoolExecutor] = None
+POOL_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        _POOL = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+    return _POOL
+
+
+def split_chunks(total: int, chunk: int) -> list[int]:
+    sizes = [chunk] * (total // chunk)
+    if total % chunk:
+        sizes.append(total % chunk)
+    return sizes
+
+
+async def run_chunked(fn: Callable, jobs: list[tuple], on_progress: Optional[Callable[[int, object], Awaitable[None]]] = None) -> list:
+    """Run fn(*job) for every job in the process pool.
+
+    `on_progress(done, result)` is awaited as each chunk completes (in
+    completion order), which lets callers update a progress message.
+    Returns the results in completion order.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    futures = [loop.run_in_executor(pool, fn, *job) for job in jobs]
+    results = []
+    for fut in asyncio.as_completed(futures):
+        res = await fut
+        results.append(res)
+        if on_progress is not None:
+            await on_progress(len(results), res)
+    return results
+
+
+def new_seeds(n: int) -> list[np.random.SeedSequence]:
+    """Independent child seeds for n chunks."""
+    return np.random.SeedSequence().spawn(n)
+
+
+# ---------- Slots ----------
+
+def simulate_slots_chunk(tables: dict, spins: int, seed) -> dict:
+    """Vectorized slot simulation for one chunk.
+
+    `tables` comes from the slots cog (integer-encoded reels, per-line row
+    offsets and a multiplier/kind lookup indexed by a*n*n + b*n + c). All
+    stop indices are drawn in one array op and every payline is evaluated
+    with a single table lookup.
+    """
+    rng = np.random.default_rng(seed)
+    reels = np.asarray(tables["reels"], dtype=np.int16)
+    n_sym = int(tables["n_symbols"])
+    mult_lut = np.asarray(tables["mult"], dtype=np.int64)
+    kind_lut = np.asarray(tables["kind"], dtype=np.int8)
+    num_reels, reel_len = reels.shape
+
+    stops = rng.integers(0, reel_len, size=(spins, num_reels))
+    spin_mult = np.zeros(spins, dtype=np.int64)
+    line_hits, line_triples = [], []
+    two_match = 0
+    triple_dist = np.zeros(n_sym, dtype=np.int64)
+    for offsets in tables["offsets"]:
+        syms = [reels[r][(stops[:, r] + offsets[r]) % reel_len] for r in range(num_reels)]
+        code = syms[0].astype(np.int64)
+        for s in syms[1:]:
+            code = code * n_sym + s
+        mult = mult_lut[code]
+        kind = kind_lut[code]
+        spin_mult += mult
+        line_hits.append(int(np.count_nonzero(mult)))
+        triples = kind == 2
+        line_triples.append(int(np.count_nonzero(triples)))
+        two_match += int(np.count_nonzero(kind == 1))
+        triple_dist += np.bincount(syms[0][triples], minlength=n_sym)
+    return {
+        "spins": spins,
+        "total_mult": int(spin_mult.sum()),
+        "hits": int(np.count_nonzero(spin_mult)),
+        "two_match": two_match,
+        "line_hits": line_hits,
+        "line_triples": line_triples,
+        "triple_dist": triple_dist.tolist(),
+    }
+
+
+# ---------- Blackjack ----------
+
+# Player actions in the strategy tables
+BJ_STAND, BJ_HIT, BJ_DOUBLE_HIT, BJ_DOUBLE_STAND = 0, 1, 2, 3
+# Card values as drawn from the shoe (ace = 11, tens/faces = 10)
+BJ_RANK_VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10, 11]
+
+
+def _bj_index(soft: int, total: int, up: int) -> int:
+    return (soft * 32 + total) * 12 + up
+
+
+def _bj_table(decide) -> list[int]:
+    """Flatten decide(soft, total, dealer_up) -> action into a list lookup."""
+    table = [BJ_STAND] * (2 * 32 * 12)
+    for soft in (0, 1):
+        for total in range(4, 22):
+            for up in range(2, 12):
+                table[_bj_index(soft, total, up)] = decide(soft, total, up)
+    return table
+
+
+def _basic(soft: int, total: int, up: int) -> int:
+    # Multi-deck, dealer stands on all 17s, double on any first two cards, no splits
+    if soft:
+        if total >= 19:
+            return BJ_STAND
+        if total == 18:
+            if 3 <= up <= 6:
+                return BJ_DOUBLE_STAND
+            return BJ_STAND if up in (2, 7, 8) else BJ_HIT
+        if total == 17:
+            return BJ_DOUBLE_HIT if 3 <= up <= 6 else BJ_HIT
+        if total in (15, 16):
+            return BJ_DOUBLE_HIT if 4 <= up <= 6 else BJ_HIT
+        if total in (13, 14):
+            return BJ_DOUBLE_HIT if 5 <= up <= 6 else BJ_HIT
+        return BJ_HIT
+    if total >= 17:
+        return BJ_STAND
+    if total >= 13:
+        return BJ_STAND if up <= 6 else BJ_HIT
+    if total == 12:
+        return BJ_STAND if 4 <= up <= 6 else BJ_HIT
+    if total == 11:
+        return BJ_DOUBLE_HIT if up <= 10 else BJ_HIT
+    if total == 10:
+        return BJ_DOUBLE_HIT if up <= 9 else BJ_HIT
+    if total == 9:
+        return BJ_DOUBLE_HIT if 3 <= up <= 6 else BJ_HIT
+    return BJ_HIT
+
+
+BJ_STRATEGIES = {
+    "basic": _bj_table(_basic),
+    # Play like the dealer: hit below 17, never double
+    "mimic": _bj_table(lambda soft, total, up: BJ_HIT if total < 17 else BJ_STAND),
+    # Never take a card that could bust: hit hard 11 or less, soft hands below 18
+    "never_bust": _bj_table(lambda soft, total, up: BJ_HIT if total <= 11 or (soft and total < 18) else BJ_STAND),
+}
+
+
+def simulate_blackjack_chunk(rules: dict, strategy: str, hands: int, seed) -> dict:
+    """Play `hands` hands of blackjack under `rules` with one strategy table.
+
+    The shoe is a flat list of card values reshuffled (with NumPy) whenever
+    it runs out, mirroring the live deck. Net results are tallied in half
+    wager units so a 3:2 blackjack stays an integer.
+    """
+    rng = np.random.default_rng(seed)
+    table = BJ_STRATEGIES[strategy]
+    stand_on = int(rules["dealer_stand"])
+    bj_net2 = int(round(rules["blackjack_return"] * 2)) - 2
+    base = np.array(BJ_RANK_VALUES * int(rules["shoe_copies"]), dtype=np.int8)
+    shoe = rng.permutation(base).tolist()
+    shoe_len = len(shoe)
+    pos = 0
+
+    net_sum = net_sq = 0
+    naturals = dealer_naturals = wins = pushes = losses = busts = 0
+    doubles = double_net = double_sq = 0
+    for _ in range(hands):
+        if pos + 52 > shoe_len:
+            # More than any single hand can use; reshuffling early keeps the inner loop branch-free
+            shoe = rng.permutation(base).tolist()
+            pos = 0
+        p1, d1, p2, d2 = shoe[pos], shoe[pos + 1], shoe[pos + 2], shoe[pos + 3]
+        pos += 4
+        p_total = p1 + p2
+        p_aces = (p1 == 11) + (p2 == 11)
+        if p_total > 21:
+            p_total -= 10
+            p_aces -= 1
+        d_total = d1 + d2
+        d_aces = (d1 == 11) + (d2 == 11)
+        if d_total > 21:
+            d_total -= 10
+            d_aces -= 1
+        p_natural = p_total == 21
+        d_natural = d_total == 21
+
+        if p_natural or d_natural:
+            naturals += p_natural
+            dealer_naturals += d_natural
+            if p_natural and d_natural:
+                net2 = 0
+            elif p_natural:
+                net2 = bj_net2
+            else:
+                net2 = -2
+        else:
+            stake = 2
+            first = True
+            while True:
+                action = table[((p_aces > 0) * 32 + p_total) * 12 + d1]
+                if action == BJ_DOUBLE_HIT or action == BJ_DOUBLE_STAND:
+                    if first:
+                        stake = 4
+                        action = BJ_HIT
+                    else:
+                        action = BJ_HIT if action == BJ_DOUBLE_HIT else BJ_STAND
+                if action == BJ_STAND:
+                    break
+                c = shoe[pos]
+                pos += 1
+                p_total += c
+                if c == 11:
+                    p_aces += 1
+                if p_total > 21 and p_aces:
+                    p_total -= 10
+                    p_aces -= 1
+                if p_total > 21 or stake == 4:
+                    break
+                first = False
+
+            if p_total > 21:
+                busts += 1
+                net2 = -stake
+            else:
+                while d_total < stand_on:
+                    c = shoe[pos]
+                    pos += 1
+                    d_total += c
+                    if c == 11:
+                        d_aces += 1
+                    if d_total > 21 and d_aces:
+                        d_total -= 10
+                        d_aces -= 1
+                if d_total > 21 or p_total > d_total:
+                    net2 = stake
+                elif p_total == d_total:
+                    net2 = 0
+                else:
+                    net2 = -stake
+            if stake == 4:
+                doubles += 1
+                double_net += net2
+                double_sq += net2 * net2
+
+        net_sum += net2
+        net_sq += net2 * net2
+        if net2 > 0:
+            wins += 1
+        elif net2 == 0:
+            pushes += 1
+        else:
+            losses += 1
+
+    return {
+        "hands": hands,
+        "net2": net_sum,
+        "net2_sq": net_sq,
+        "naturals": naturals,
+        "dealer_naturals": dealer_naturals,
+        "wins": wins,
+        "pushes": pushes,
+        "losses": losses,
+        "busts": busts,
+        "doubles": doubles,
+        "double_net2": double_net,
+        "double_net2_sq": double_sq,
+    }
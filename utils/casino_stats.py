@@ -0,0 +1,201 @@
+import asyncio
+import calendar
+import json
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+CASINO_STATS_FILE = "casinostats.json"
+# Older per-game files; imported once if the shared file doesn't exist yet
+LEGACY_FILES = {"slots": "slotstats.json", "blackjack": "blackjackstats.json"}
+# Name of the per-user "rounds played" counter for each game
+ROUND_KEYS = {"slots": "spins", "blackjack": "hands"}
+
+SESSION_TIMEOUT = 30 * 60   # inactivity (seconds) that starts a new session baseline
+FLUSH_INTERVAL = 60         # seconds between batched writes
+DAILY_RETENTION = 400       # days of per-guild rollups kept
+DAY = 86400
+
+
+def day_number(ts: Optional[int] = None) -> int:
+    """UTC day index (epoch seconds // 86400)."""
+    return int(time.time() if ts is None else ts) // DAY
+
+
+def day_label(day: int) -> str:
+    return time.strftime("%Y-%m-%d", time.gmtime(day * DAY))
+
+
+def _iso_to_epoch(value) -> Optional[int]:
+    if isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return calendar.timegm(datetime.fromisoformat(value).timetuple())
+    except Exception:
+        return None
+
+
+#  casinostats.json structure:
+#  {
+#    "users": { game: { guild_id: { user_id: {
+#        <round key>: int, "bet_total": int, "win_total": int, "net": int,
+#        ...game specific counters...,
+#        "last_play": epoch int, "session_baseline": {...} | None } } } },
+#    "daily": { guild_id: { day: { game: {"rounds": int, "wagered": int, "paid": int} } } }
+#  }
+class CasinoStats:
+    """In-memory casino counters shared by the slots and blackjack cogs.
+
+    Recording a round only touches a few dict entries; the file is rewritten
+    at most once per FLUSH_INTERVAL (and on cog unload). Every guild also
+    gets one rollup bucket per UTC day, so range queries read at most one
+    entry per day instead of scanning individual rounds.
+    """
+
+    def __init__(self, path: str = CASINO_STATS_FILE):
+        self.path = path
+        self.data = self._load()
+        self.users = self.data.setdefault("users", {})
+        self.daily = self.data.setdefault("daily", {})
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    # ---- recording ----
+    def get_user(self, game: str, guild_id, user_id) -> Optional[dict]:
+        return self.users.get(game, {}).get(str(guild_id), {}).get(str(user_id))
+
+    def record(self, game: str, guild_id, user_id, wager: int, payout: int, defaults: dict, now: Optional[int] = None) -> dict:
+        """Count one round and return the user's entry for game-specific updates.
+
+        `defaults` seeds a new user entry (game specific counters). Session
+        baselines roll over after SESSION_TIMEOUT of inactivity.
+        """
+        now = int(time.time()) if now is None else int(now)
+        gid = str(guild_id)
+        round_key = ROUND_KEYS[game]
+        u = self.users.setdefault(game, {}).setdefault(gid, {}).get(str(user_id))
+        if u is None:
+            u = dict(defaults)
+            for key in (round_key, "bet_total", "win_total", "net"):
+                u.setdefault(key, 0)
+            u.setdefault("last_play", None)
+            u.setdefault("session_baseline", None)
+            self.users[game][gid][str(user_id)] = u
+        last = u.get("last_play")
+        if u.get("session_baseline") is None or (last is not None and now - last > SESSION_TIMEOUT):
+            self.reset_session(game, u)
+
+        u[round_key] += 1
+        u["bet_total"] += wager
+        u["win_total"] += payout
+        u["net"] += payout - wager
+        u["last_play"] = now
+
+        bucket = self.daily.setdefault(gid, {}).setdefault(str(day_number(now)), {}).setdefault(game, {"rounds": 0, "wagered": 0, "paid": 0})
+        bucket["rounds"] += 1
+        bucket["wagered"] += wager
+        bucket["paid"] += payout
+        self.mark_dirty()
+        return u
+
+    def reset_session(self, game: str, u: dict):
+        round_key = ROUND_KEYS[game]
+        u["session_baseline"] = {key: u.get(key, 0) for key in (round_key, "bet_total", "win_total", "net")}
+
+    def mark_dirty(self):
+        self._dirty = True
+        self._ensure_flusher()
+
+    # ---- queries ----
+    def daily_range(self, guild_id, start_day: int, end_day: int) -> list[tuple[int, dict]]:
+        """[(day, {game: rollup})] for days in [start_day, end_day] that had play."""
+        days = self.daily.get(str(guild_id), {})
+        out = []
+        for day in range(start_day, end_day + 1):
+            entry = days.get(str(day))
+            if entry:
+                out.append((day, entry))
+        return out
+
+    def range_totals(self, guild_id, start_day: int, end_day: int) -> dict[str, dict]:
+        """Per-game sums (rounds, wagered, paid, rtp) over a day range."""
+        totals: dict[str, dict] = {}
+        for _, entry in self.daily_range(guild_id, start_day, end_day):
+            for game, bucket in entry.items():
+                t = totals.setdefault(game, {"rounds": 0, "wagered": 0, "paid": 0})
+                t["rounds"] += bucket["rounds"]
+                t["wagered"] += bucket["wagered"]
+                t["paid"] += bucket["paid"]
+        for t in totals.values():
+            t["rtp"] = (t["paid"] / t["wagered"] * 100) if t["wagered"] else 0.0
+        return totals
+
+    # ---- persistence ----
+    def flush(self, force: bool = False):
+        if not (self._dirty or force):
+            return
+        self._prune()
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=4)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except Exception as e:
+            print(f"[CASINO] Failed to save {self.path}: {e}")
+
+    def _prune(self):
+        cutoff = day_number() - DAILY_RETENTION
+        for days in self.daily.values():
+            for day in [d for d in days if int(d) < cutoff]:
+                del days[day]
+
+    def _ensure_flusher(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._flusher())
+
+    async def _flusher(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[CASINO] Flush failed: {e}")
+
+    def _load(self) -> dict:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    return data
+            except Exception:
+                pass
+            return {}
+        return self._import_legacy()
+
+    def _import_legacy(self) -> dict:
+        """Carry per-user totals over from the old per-game files (ISO -> epoch)."""
+        users = {}
+        for game, path in LEGACY_FILES.items():
+            if not os.path.exists(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    guilds = json.load(f).get("guilds", {})
+            except Exception:
+                continue
+            for gid, members in guilds.items():
+                for uid, u in members.items():
+                    u["last_play"] = _iso_to_epoch(u.get("last_play")) if u.get("last_play") else None
+                    users.setdefault(game, {}).setdefault(gid, {})[uid] = u
+        return {"users": users, "daily": {}}
+
+
+casino_stats = CasinoStats()
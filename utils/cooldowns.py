@@ -0,0 +1,272 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Optional
+
+import discord
+
+COOLDOWNS_FILE = "cooldowns.json"
+# Only cooldowns at least this long (seconds) survive restarts; shorter ones
+# (slots, blackjack, /play) are cheap to lose and never touch the disk.
+PERSIST_THRESHOLD = 300
+# Background cadence for TTL eviction (seconds); long cooldowns themselves are
+# written as soon as they start, since a restart must not forget them.
+FLUSH_INTERVAL = 30
+
+SLIDING = "sliding"
+TOKEN = "token"
+
+
+def _now_ms() -> int:
+    return time.monotonic_ns() // 1_000_000
+
+
+class Bucket:
+    """A named limit: `limit` uses per `window` seconds.
+
+    sliding: at most `limit` triggers inside any trailing window (limit=1 is a
+             plain cooldown).
+    token:   token bucket holding `limit` tokens, refilled evenly over the
+             window. Stored as a single integer "theoretical arrival time".
+    """
+
+    __slots__ = ("name", "window_ms", "mode", "limit", "persist", "overrides", "entries")
+
+    def __init__(self, name: str, window: float, mode: str = SLIDING, limit: int = 1, persist: Optional[bool] = None):
+        if mode not in (SLIDING, TOKEN):
+            raise ValueError(f"Unknown cooldown mode: {mode}")
+        self.name = name
+        self.window_ms = int(window * 1000)
+        self.mode = mode
+        self.limit = max(1, int(limit))
+        # None = decide per entry from its effective window
+        self.persist = persist
+        self.overrides: dict[str, int] = {}  # guild_id -> window_ms
+        # (guild_id, key) -> deque[int] (sliding) or int TAT (token)
+        self.entries: dict[tuple[str, str], object] = {}
+
+    def window_for(self, guild_id: str) -> int:
+        return self.overrides.get(guild_id, self.window_ms)
+
+    def should_persist(self, guild_id: str) -> bool:
+        if self.persist is not None:
+            return self.persist
+        return self.window_for(guild_id) >= PERSIST_THRESHOLD * 1000
+
+    # ---- core math (all integer milliseconds) ----
+    def retry_after_ms(self, k: tuple[str, str], now: int) -> int:
+        window = self.window_for(k[0])
+        entry = self.entries.get(k)
+        if entry is None:
+            return 0
+        if self.mode == SLIDING:
+            while entry and entry[0] + window <= now:
+                entry.popleft()
+            if len(entry) < self.limit:
+                return 0
+            return entry[0] + window - now
+        interval = window // self.limit
+        return max(0, max(entry, now) + interval - window - now)
+
+    def trigger(self, k: tuple[str, str], now: int):
+        if self.mode == SLIDING:
+            entry = self.entries.get(k)
+            if entry is None:
+                entry = self.entries[k] = deque(maxlen=self.limit)
+            entry.append(now)
+        else:
+            interval = self.window_for(k[0]) // self.limit
+            self.entries[k] = max(self.entries.get(k, now), now) + interval
+
+    def is_stale(self, k: tuple[str, str], now: int) -> bool:
+        entry = self.entries[k]
+        if self.mode == SLIDING:
+            return not entry or entry[-1] + self.window_for(k[0]) <= now
+        return entry <= now
+
+
+class CooldownEngine:
+    """Process-wide cooldown/rate-limit registry shared by all cogs.
+
+    Times are monotonic integer milliseconds; wall-clock time is only used
+    when long cooldowns are written to / read from disk.
+    """
+
+    def __init__(self, path: str = COOLDOWNS_FILE):
+        self.path = path
+        self.buckets: dict[str, Bucket] = {}
+        self._pending = self._load()  # persisted entries awaiting bucket registration
+        self._dirty = False
+        self._task: Optional[asyncio.Task] = None
+
+    # ---- registration / configuration ----
+    def register(self, name: str, window: float, *, mode: str = SLIDING, limit: int = 1, persist: Optional[bool] = None) -> Bucket:
+        """Create (or return the existing) bucket `name`."""
+        bucket = self.buckets.get(name)
+        if bucket is not None:
+            return bucket
+        bucket = self.buckets[name] = Bucket(name, window, mode=mode, limit=limit, persist=persist)
+        self._restore(bucket)
+        return bucket
+
+    def set_window(self, name: str, guild_id, seconds: float):
+        """Override the window for one guild (e.g. from an admin command)."""
+        bucket = self.buckets[name]
+        bucket.overrides[str(guild_id)] = int(seconds * 1000)
+
+    def get_window(self, name: str, guild_id=None) -> float:
+        return self.buckets[name].window_for(str(guild_id or "")) / 1000
+
+    # ---- checks ----
+    def remaining(self, name: str, key, guild_id=None) -> float:
+        """Seconds until `key` may use bucket `name` again (0 if ready)."""
+        bucket = self.buckets[name]
+        return bucket.retry_after_ms((str(guild_id or ""), str(key)), _now_ms()) / 1000
+
+    def trigger(self, name: str, key, guild_id=None):
+        """Record a use (call after the guarded action actually happened)."""
+        bucket = self.buckets[name]
+        k = (str(guild_id or ""), str(key))
+        bucket.trigger(k, _now_ms())
+        if bucket.should_persist(k[0]):
+            self._dirty = True
+            self.flush()
+        self._ensure_flusher()
+
+    def trigger_at(self, name: str, key, guild_id, when: float):
+        """Record a past use at wall-clock `when` (epoch seconds), e.g. from a legacy store."""
+        bucket = self.buckets[name]
+        k = (str(guild_id or ""), str(key))
+        now = _now_ms()
+        bucket.trigger(k, now - int((time.time() - when) * 1000))
+        if bucket.is_stale(k, now):
+            del bucket.entries[k]
+            return
+        if bucket.should_persist(k[0]):
+            self._dirty = True
+            self.flush()
+        self._ensure_flusher()
+
+    def hit(self, name: str, key, guild_id=None) -> float:
+        """Check and consume in one step. Returns 0 if allowed, else seconds to wait."""
+        rem = self.remaining(name, key, guild_id)
+        if rem > 0:
+            return rem
+        self.trigger(name, key, guild_id)
+        return 0.0
+
+    def reset(self, name: str, key, guild_id=None):
+        bucket = self.buckets[name]
+        k = (str(guild_id or ""), str(key))
+        if bucket.entries.pop(k, None) is not None and bucket.should_persist(k[0]):
+            self._dirty = True
+
+    # ---- maintenance ----
+    def sweep(self) -> int:
+        """Evict entries whose window has fully elapsed (TTL). Returns evicted count."""
+        now = _now_ms()
+        evicted = 0
+        for bucket in self.buckets.values():
+            for k in [k for k in bucket.entries if bucket.is_stale(k, now)]:
+                del bucket.entries[k]
+                evicted += 1
+                if bucket.should_persist(k[0]):
+                    self._dirty = True
+        return evicted
+
+    def flush(self, force: bool = False):
+        """Write long cooldowns to disk if anything changed since the last flush."""
+        if not (self._dirty or force):
+            return
+        now_mono = _now_ms()
+        now_wall = int(time.time() * 1000)
+        data = {}
+        for bucket in self.buckets.values():
+            out = {}
+            for (gid, key), entry in bucket.entries.items():
+                if not bucket.should_persist(gid):
+                    continue
+                if bucket.mode == SLIDING:
+                    out[f"{gid}:{key}"] = [now_wall + (t - now_mono) for t in entry]
+                else:
+                    out[f"{gid}:{key}"] = now_wall + (entry - now_mono)
+            if out:
+                data[bucket.name] = out
+        # Keep entries for buckets whose cog hasn't registered yet
+        for name, raw in self._pending.items():
+            data.setdefault(name, raw)
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+            self._dirty = False
+        except Exception as e:
+            print(f"[COOLDOWNS] Failed to save {self.path}: {e}")
+
+    def _ensure_flusher(self):
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._flusher())
+
+    async def _flusher(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                self.sweep()
+                self.flush()
+            except Exception as e:
+                print(f"[COOLDOWNS] Maintenance failed: {e}")
+
+    # ---- persistence helpers ----
+    def _load(self) -> dict:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return data if isinstance(data, dict) else {}
+            except Exception:
+                return {}
+        return {}
+
+    def _restore(self, bucket: Bucket):
+        raw = self._pending.pop(bucket.name, None)
+        if not raw:
+            return
+        now_mono = _now_ms()
+        now_wall = int(time.time() * 1000)
+        for composite, value in raw.items():
+            gid, _, key = composite.partition(":")
+            k = (gid, key)
+            try:
+                if bucket.mode == SLIDING and isinstance(value, list):
+                    entry = deque((now_mono + (int(t) - now_wall) for t in value), maxlen=bucket.limit)
+                    bucket.entries[k] = entry
+                elif bucket.mode == TOKEN and isinstance(value, (int, float)):
+                    bucket.entries[k] = now_mono + (int(value) - now_wall)
+                else:
+                    continue
+                if bucket.is_stale(k, now_mono):
+                    del bucket.entries[k]
+            except Exception:
+                continue
+
+
+cooldowns = CooldownEngine()
+
+
+async def send_cooldown_message(interaction: discord.Interaction, retry_after: float):
+    embed = discord.Embed(
+        title="⏳ Slow down",
+        description=f"Please wait {math.ceil(retry_after)}s before using this command again.",
+        color=discord.Color.orange()
+    )
+    if interaction.response.is_done():
+        await interaction.followup.send(embed=embed, ephemeral=True)
+    else:
+        await interaction.response.send_message(embed=embed, ephemeral=True)
@@ -1,9 +1,15 @@
 import json
 import os
+import time
 from datetime import datetime, timedelta
 
 ECON_FILE = "economy.json"
 
+# Economy health rollups: one sample per scope every ROLLUP_INTERVAL seconds,
+# keeping at most SERIES_MAX samples (two weeks of hourly points).
+ROLLUP_INTERVAL = 3600
+SERIES_MAX = 24 * 14
+
 def load_json(file):
     if os.path.exists(file):
         with open(file, "r", encoding="utf-8") as f:
@@ -24,6 +30,79 @@ economy.setdefault("global", {})
 economy.setdefault("guilds", {})
 
 
+# ---------- Running aggregates ----------
+#  _stats structure (scope is a guild id, or "global" for legacy balances):
+#  {
+#    scope: {
+#       "supply": int,               # sum of all balances plus coins held in escrow
+#       "holders": int,              # users with a positive balance
+#       "minted": { source: int },   # coins created, by source (daily, work, ...)
+#       "burned": { source: int },   # coins removed, by source
+#       "series": [[epoch, supply, holders, minted_total, burned_total], ...]
+#    }
+#  }
+_stats = economy.setdefault("_stats", {})
+
+
+def _scope(guild_id) -> str:
+    return str(guild_id) if guild_id else "global"
+
+
+def _scope_stats(guild_id) -> dict:
+    s = _stats.setdefault(_scope(guild_id), {})
+    s.setdefault("supply", 0)
+    s.setdefault("holders", 0)
+    s.setdefault("minted", {})
+    s.setdefault("burned", {})
+    s.setdefault("series", [])
+    return s
+
+
+def _rebuild_supply():
+    """Recompute supply/holders from balances once at startup.
+
+    Minted/burned counters and the series are persisted as-is; only the
+    snapshot values are re-derived so hand-edited files can't drift.
+    """
+    scopes = {"global": economy.get("global", {})}
+    scopes.update(economy.get("guilds", {}))
+    for scope, users in scopes.items():
+        s = _scope_stats(None if scope == "global" else scope)
+        balances = [int(d.get("balance", 0)) for d in users.values()]
+        s["supply"] = sum(balances)
+        s["holders"] = sum(1 for b in balances if b > 0)
+    # Escrowed coins still exist; they are only parked until their event settles
+    for entry in economy.get("_escrow", {}).values():
+        _scope_stats(entry.get("guild_id"))["supply"] += sum(int(a) for a in entry.get("holds", {}).values())
+
+
+def _record_change(guild_id, old: int, new: int, source: str):
+    """O(1) update of the scope aggregates for a single balance change."""
+    delta = int(new) - int(old)
+    if delta == 0:
+        return
+    s = _scope_stats(guild_id)
+    s["supply"] += delta
+    if old <= 0 < new:
+        s["holders"] += 1
+    elif new <= 0 < old:
+        s["holders"] -= 1
+    bucket = s["minted"] if delta > 0 else s["burned"]
+    bucket[source] = bucket.get(source, 0) + abs(delta)
+
+
+def _record_escrow_move(guild_id, old: int, new: int):
+    """A balance change into or out of escrow: supply, minted and burned stay put."""
+    s = _scope_stats(guild_id)
+    if old <= 0 < new:
+        s["holders"] += 1
+    elif new <= 0 < old:
+        s["holders"] -= 1
+
+
+_rebuild_supply()
+
+
 def get_balance(user_id: str, guild_id: str = None) -> int:
     """Return the balance for the user.
 
@@ -34,29 +113,37 @@ def get_balance(user_id: str, guild_id: str = None) -> int:
     return int(economy.get("global", {}).get(str(user_id), {}).get("balance", 0))
 
 
-def set_balance(user_id: str, amount: int, guild_id: str = None):
+def set_balance(user_id: str, amount: int, guild_id: str = None, source: str = "admin"):
+    old = get_balance(user_id, guild_id=guild_id)
     if guild_id:
         economy.setdefault("guilds", {}).setdefault(str(guild_id), {})[str(user_id)] = {"balance": int(amount)}
     else:
         economy.setdefault("global", {})[str(user_id)] = {"balance": int(amount)}
+    _record_change(guild_id, old, int(amount), source)
     save_json(ECON_FILE, economy)
 
 
-def add_currency(user_id: str, amount: int, guild_id: str = None):
+def add_currency(user_id: str, amount: int, guild_id: str = None, source: str = "other"):
+    """Credit (or debit, for negative amounts) a balance.
+
+    `source` labels the flow for the economy stats, e.g. "daily", "work",
+    "levelup", "passive", "slots".
+    """
     if guild_id:
         g = economy.setdefault("guilds", {}).setdefault(str(guild_id), {})
-        g[str(user_id)] = {"balance": int(g.get(str(user_id), {}).get("balance", 0)) + int(amount)}
     else:
         g = economy.setdefault("global", {})
-        g[str(user_id)] = {"balance": int(g.get(str(user_id), {}).get("balance", 0)) + int(amount)}
+    old = int(g.get(str(user_id), {}).get("balance", 0))
+    g[str(user_id)] = {"balance": old + int(amount)}
+    _record_change(guild_id, old, old + int(amount), source)
     save_json(ECON_FILE, economy)
 
 
-def remove_currency(user_id: str, amount: int, guild_id: str = None) -> bool:
+def remove_currency(user_id: str, amount: int, guild_id: str = None, source: str = "other") -> bool:
     bal = get_balance(user_id, guild_id=guild_id)
     if bal < amount:
         return False
-    set_balance(user_id, bal - amount, guild_id=guild_id)
+    set_balance(user_id, bal - amount, guild_id=guild_id, source=source)
     return True
 
 
@@ -182,6 +269,7 @@ def delete_balance(user_id: str, guild_id: str | None = None):
     up any guild-scoped daily tracking for the user. Otherwise delete from global.
     """
     uid = str(user_id)
+    _record_change(guild_id, get_balance(uid, guild_id=guild_id), 0, "cleanup")
     if guild_id:
         gid = str(guild_id)
         # Remove balance from guild scope
@@ -218,8 +306,146 @@ def reset_guild_balances(guild_id: str):
     """
     gid = str(guild_id)
     try:
+        # Everything that was in circulation is burned by the reset
+        s = _scope_stats(gid)
+        if s["supply"]:
+            s["burned"]["reset"] = s["burned"].get("reset", 0) + s["supply"]
+        s["supply"] = 0
+        s["holders"] = 0
         # Remove all balances for this guild
         economy.get("guilds", {}).pop(gid, None)
     except Exception:
         pass
     save_json(ECON_FILE, economy)
+
+
+def get_economy_stats(guild_id: str = None) -> dict:
+    """Return a copy of the running aggregates for a guild (or global scope)."""
+    s = _scope_stats(guild_id)
+    return {
+        "supply": s["supply"],
+        "holders": s["holders"],
+        "minted": dict(s["minted"]),
+        "burned": dict(s["burned"]),
+        "series": [list(p) for p in s["series"]],
+    }
+
+
+def rollup_economy_stats(now: int | None = None) -> int:
+    """Append a time-series sample for every scope that is due one.
+
+    Samples are [epoch, supply, holders, minted_total, burned_total]; the
+    series is trimmed to SERIES_MAX entries. Returns the number of scopes
+    sampled (and persists the economy file if any were).
+    """
+    now = int(now if now is not None else time.time())
+    sampled = 0
+    for scope in list(_stats.keys()):
+        s = _scope_stats(None if scope == "global" else scope)
+        series = s["series"]
+        if series and now - int(series[-1][0]) < ROLLUP_INTERVAL:
+            continue
+        series.append([
+            now,
+            s["supply"],
+            s["holders"],
+            sum(s["minted"].values()),
+            sum(s["burned"].values()),
+        ])
+        if len(series) > SERIES_MAX:
+            del series[:len(series) - SERIES_MAX]
+        sampled += 1
+    if sampled:
+        save_json(ECON_FILE, economy)
+    return sampled
+
+
+# ---------- Escrow ----------
+#  Coins held on behalf of users until an event settles (e.g. lottery buy-ins).
+#  _escrow structure:
+#  {
+#    escrow_id: { "guild_id": str | None, "holds": { user_id: int } }
+#  }
+#  Holds are written in batches: escrow_hold only marks the file dirty and
+#  flush_economy() (called on an interval by the owning cog) persists it.
+#  The balance debit and the hold live in the same file, so a crash between
+#  flushes loses both together and never strands coins.
+_escrow = economy.setdefault("_escrow", {})
+_dirty = False
+
+
+def flush_economy(force: bool = False) -> bool:
+    """Persist batched changes. Returns True if the file was written."""
+    global _dirty
+    if not (_dirty or force):
+        return False
+    save_json(ECON_FILE, economy)
+    _dirty = False
+    return True
+
+
+def escrow_hold(escrow_id: str, user_id: str, amount: int, guild_id: str = None) -> bool:
+    """Move `amount` from the user's balance into escrow (batched, no immediate save)."""
+    global _dirty
+    uid = str(user_id)
+    bal = get_balance(uid, guild_id=guild_id)
+    if amount <= 0 or bal < amount:
+        return False
+    if guild_id:
+        g = economy.setdefault("guilds", {}).setdefault(str(guild_id), {})
+    else:
+        g = economy.setdefault("global", {})
+    g[uid] = {"balance": bal - int(amount)}
+    _record_escrow_move(guild_id, bal, bal - int(amount))
+    entry = _escrow.setdefault(escrow_id, {"guild_id": str(guild_id) if guild_id else None, "holds": {}})
+    entry["holds"][uid] = entry["holds"].get(uid, 0) + int(amount)
+    _dirty = True
+    return True
+
+
+def escrow_holds(escrow_id: str) -> dict:
+    """Return a copy of user_id -> held amount for an escrow (empty if unknown)."""
+    return dict(_escrow.get(escrow_id, {}).get("holds", {}))
+
+
+def escrow_total(escrow_id: str) -> int:
+    return sum(_escrow.get(escrow_id, {}).get("holds", {}).values())
+
+
+def _credit_from_escrow(guild_id, user_id: str, amount: int):
+    if guild_id:
+        g = economy.setdefault("guilds", {}).setdefault(guild_id, {})
+    else:
+        g = economy.setdefault("global", {})
+    old = int(g.get(user_id, {}).get("balance", 0))
+    g[user_id] = {"balance": old + int(amount)}
+    _record_escrow_move(guild_id, old, old + int(amount))
+
+
+def escrow_release(escrow_id: str, to_user: str) -> int:
+    """Pay the whole escrow to one user and close it. Returns the amount paid."""
+    global _dirty
+    entry = _escrow.pop(escrow_id, None)
+    if not entry:
+        return 0
+    total = sum(entry["holds"].values())
+    if total:
+        _credit_from_escrow(entry["guild_id"], str(to_user), total)
+    _dirty = True
+    flush_economy()
+    return total
+
+
+def escrow_refund(escrow_id: str) -> int:
+    """Return every hold to its owner and close the escrow. Returns the amount refunded."""
+    global _dirty
+    entry = _escrow.pop(escrow_id, None)
+    if not entry:
+        return 0
+    total = 0
+    for uid, amount in entry["holds"].items():
+        _credit_from_escrow(entry["guild_id"], uid, amount)
+        total += int(amount)
+    _dirty = True
+    flush_economy()
+    return total
@@ -0,0 +1,31 @@
+"""Extraction worker for the process backend of utils.extractor_pool.
+
+Reads one JSON request per stdin line ({"id", "opts", "target", "overrides"})
+and writes one JSON reply per stdout line ({"id", "ok", "result" | "error"}).
+"""
+import json
+import sys
+
+from utils.extractor_pool import WarmExtractors, slim_info
+
+
+def main():
+    out = sys.stdout
+    # Anything yt_dlp prints must not end up in the reply stream
+    sys.stdout = sys.stderr
+    extractors = WarmExtractors()
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        try:
+            info = extractors.extract(request["opts"], request["target"], request.get("overrides"))
+            reply = {"id": request["id"], "ok": True, "result": slim_info(info)}
+        except Exception as e:
+            reply = {"id": request["id"], "ok": False, "error": str(e) or type(e).__name__}
+        out.write(json.dumps(reply, default=str) + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
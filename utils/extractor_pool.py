@@ -0,0 +1,390 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+import yt_dlp
+
+# yt_dlp extractions running at once, across every guild
+MAX_CONCURRENT = 4
+# Recent jobs kept for the latency figures
+LATENCY_SAMPLES = 500
+# "thread" (default) or "process": isolated worker processes with hard timeouts
+BACKEND_ENV = "MUSIC_EXTRACTOR_BACKEND"
+# Wall-clock limit per job in the process backend; the worker is killed past it
+EXTRACT_TIMEOUT = 60
+# Largest reply line accepted from a worker process
+MAX_REPLY_BYTES = 32 * 1024 * 1024
+# Info-dict keys the bot never reads; dropped before a reply crosses the pipe
+HEAVY_KEYS = ("formats", "thumbnails", "automatic_captions", "subtitles", "heatmap")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class ExtractionError(Exception):
+    """An extraction failed inside a worker process (message is yt_dlp's)."""
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+def _cookie_signature(path: Optional[str]) -> Optional[float]:
+    """mtime of the cookie file, so instances are rebuilt after a refresh."""
+    try:
+        return os.path.getmtime(path) if path else None
+    except OSError:
+        return None
+
+
+def _percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def slim_info(info: Any) -> Any:
+    """JSON-safe copy of an info dict without the bulky keys (entries included)."""
+    info = yt_dlp.YoutubeDL.sanitize_info(info)
+    if isinstance(info, dict):
+        for key in HEAVY_KEYS:
+            info.pop(key, None)
+        for entry in info.get("entries") or []:
+            if isinstance(entry, dict):
+                for key in HEAVY_KEYS:
+                    entry.pop(key, None)
+    return info
+
+
+class WarmExtractors:
+    """One YoutubeDL per option profile, rebuilt when its cookie file changes.
+
+    Not thread-safe: every worker thread or process owns its own.
+    """
+
+    def __init__(self):
+        self.instances: dict[tuple, tuple[Optional[float], yt_dlp.YoutubeDL]] = {}
+        self.builds = 0
+
+    def get(self, opts: dict) -> yt_dlp.YoutubeDL:
+        key = tuple(sorted(opts.items()))
+        sig = _cookie_signature(opts.get("cookiefile"))
+        entry = self.instances.get(key)
+        if entry is None or entry[0] != sig:
+            # The stale instance is dropped, not close()d: closing writes its
+            # old cookie jar back over the refreshed file.
+            entry = self.instances[key] = (sig, yt_dlp.YoutubeDL(dict(opts)))
+            self.builds += 1
+        return entry[1]
+
+    def extract(self, opts: dict, target: str, overrides: Optional[dict] = None):
+        ydl = self.get(opts)
+        if not overrides:
+            return ydl.extract_info(target, download=False)
+        saved = {k: ydl.params.get(k) for k in overrides}
+        ydl.params.update(overrides)
+        try:
+            return ydl.extract_info(target, download=False)
+        finally:
+            ydl.params.update(saved)
+
+
+class ThreadBackend:
+    """Extractions on dedicated threads. A hung call can't be stopped, only waited out."""
+
+    name = "thread"
+    cancellable = False
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._extractors: list[WarmExtractors] = []
+
+    def _extract(self, opts: dict, target: str, overrides: Optional[dict]):
+        extractors = getattr(self._local, "extractors", None)
+        if extractors is None:
+            extractors = self._local.extractors = WarmExtractors()
+            self._extractors.append(extractors)
+        return extractors.extract(opts, target, overrides)
+
+    async def run(self, opts: dict, target: str, overrides: Optional[dict]):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="yt-extract")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._extract, opts, target, overrides)
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {"builds": sum(e.builds for e in self._extractors)}
+
+
+class ProcessBackend:
+    """Extractions in worker processes (`python -m utils.extract_worker`).
+
+    Each worker takes one line-delimited JSON request at a time. A job that
+    overruns `timeout`, or whose caller is cancelled, kills its worker, and
+    a replacement is started right away, so a stuck site or JS challenge
+    costs one process instead of a thread that never comes back. At most
+    `workers` processes exist (or are starting) at once; a job that finds
+    them all busy waits for one to free up.
+    """
+
+    name = "process"
+    cancellable = True
+
+    def __init__(self, workers: int, timeout: float = EXTRACT_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self._idle: list[asyncio.subprocess.Process] = []
+        self._procs: set[asyncio.subprocess.Process] = set()
+        self._starting = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._tasks: set[asyncio.Future] = set()  # reaps and replacements still running
+        self._seq = 0
+        self.spawned = 0
+        self.killed = 0
+        self.timeouts = 0
+
+    def _background(self, coro):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _has_room(self) -> bool:
+        return len(self._procs) + self._starting < self.workers
+
+    def _wake(self):
+        """Let one waiting job retry _acquire (a worker went idle or a slot opened)."""
+        while self._waiters:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                fut.set_result(None)
+                return
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
+        self._starting += 1
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "utils.extract_worker",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                cwd=ROOT_DIR,
+                limit=MAX_REPLY_BYTES,
+            )
+        except BaseException:
+            self._wake()
+            raise
+        finally:
+            self._starting -= 1
+        self._procs.add(proc)
+        self.spawned += 1
+        return proc
+
+    def _release(self, proc: asyncio.subprocess.Process):
+        self._idle.append(proc)
+        self._wake()
+
+    async def _replace(self):
+        if not self._has_room():
+            return
+        try:
+            self._release(await self._spawn())
+        except Exception as e:
+            print(f"[EXTRACTOR] Could not start a replacement worker: {e}")
+
+    def _kill(self, proc: asyncio.subprocess.Process, respawn: bool = True):
+        self._procs.discard(proc)
+        if proc.returncode is None:
+            proc.kill()
+            self.killed += 1
+        self._background(proc.wait())
+        if respawn:
+            self._background(self._replace())
+        else:
+            self._wake()
+
+    async def _acquire(self) -> asyncio.subprocess.Process:
+        while True:
+            while self._idle:
+                proc = self._idle.pop()
+                if proc.returncode is None:
+                    return proc
+                self._procs.discard(proc)
+            if self._has_room():
+                return await self._spawn()
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.append(fut)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    self._wake()  # pass the wake-up on to the next job
+                raise
+
+    async def run(self, opts: dict, target: str, overrides: Optional[dict]):
+        proc = await self._acquire()
+        self._seq += 1
+        request = {"id": self._seq, "opts": opts, "target": target, "overrides": overrides}
+        try:
+            proc.stdin.write((json.dumps(request) + "\n").encode("utf-8"))
+            await proc.stdin.drain()
+            raw = await asyncio.wait_for(proc.stdout.readline(), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self._kill(proc)
+            raise ExtractionTimeout(f"Extraction timed out after {self.timeout:.0f}s") from None
+        except BaseException:
+            # Cancelled mid-job or the pipe broke: the worker's state is unknown
+            self._kill(proc)
+            raise
+        try:
+            reply = json.loads(raw) if raw else None
+        except ValueError:
+            reply = None
+        if not isinstance(reply, dict) or reply.get("id") != request["id"]:
+            self._kill(proc)
+            raise ExtractionError("Extractor worker exited or sent a malformed reply")
+        self._release(proc)
+        if reply.get("ok"):
+            return reply.get("result")
+        raise ExtractionError(reply.get("error") or "Extraction failed")
+
+    async def close(self):
+        while self._waiters:
+            self._waiters.popleft().cancel()
+        for proc in list(self._procs):
+            self._kill(proc, respawn=False)
+        self._idle.clear()
+
+    def stats(self) -> dict:
+        return {
+            "workers": len(self._procs),
+            "spawned": self.spawned,
+            "killed": self.killed,
+            "timeouts": self.timeouts,
+        }
+
+
+class ExtractorPool:
+    """Fair, bounded scheduling of yt_dlp extractions onto a backend.
+
+    Workers keep a warm YoutubeDL per option profile, so extractor state,
+    player JS and the loaded cookie jar carry over between calls. At most
+    `max_concurrent` jobs run at once. Waiting jobs are queued per guild
+    and taken round-robin, so a guild paging in a long playlist never keeps
+    another guild waiting for more than one free slot.
+    """
+
+    def __init__(self, max_concurrent: int = MAX_CONCURRENT, backend: str = "thread"):
+        self.max_concurrent = max_concurrent
+        if backend == "process":
+            self.backend = ProcessBackend(max_concurrent)
+        else:
+            self.backend = ThreadBackend(max_concurrent)
+        # guild -> waiting jobs; dict order is the round-robin order
+        self._queues: OrderedDict[str, deque] = OrderedDict()
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.peak_queued = 0
+        self._waits: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._runs: deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    async def extract(self, guild_id, opts: dict, target: str, overrides: Optional[dict] = None) -> Any:
+        """`YoutubeDL(opts).extract_info(target, download=False)` on the pool.
+
+        `opts` selects the warm instance, so keep it to a few distinct
+        profiles; per-call options that yt_dlp reads at extraction time
+        (e.g. `playlist_items`) go in `overrides` instead. Cancelling a
+        queued job drops it; a running one is killed on the process
+        backend and finishes in the background on the thread backend.
+        """
+        fut = asyncio.get_running_loop().create_future()
+        key = str(guild_id) if guild_id else "global"
+        q = self._queues.get(key)
+        if q is None:
+            q = self._queues[key] = deque()
+        q.append((fut, opts, target, overrides, time.monotonic()))
+        self.peak_queued = max(self.peak_queued, self.queued)
+        self._dispatch()
+        return await fut
+
+    def _dispatch(self):
+        while self.active < self.max_concurrent and self._queues:
+            key, q = next(iter(self._queues.items()))
+            fut, opts, target, overrides, queued_at = q.popleft()
+            if q:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if fut.done():
+                continue
+            self.active += 1
+            self._waits.append(time.monotonic() - queued_at)
+            job = asyncio.ensure_future(self._timed(opts, target, overrides))
+            job.add_done_callback(lambda j, fut=fut: self._finished(fut, j))
+            if self.backend.cancellable:
+                fut.add_done_callback(lambda f, job=job: job.cancel() if f.cancelled() else None)
+
+    async def _timed(self, opts: dict, target: str, overrides: Optional[dict]):
+        started = time.monotonic()
+        try:
+            return await self.backend.run(opts, target, overrides)
+        finally:
+            self._runs.append(time.monotonic() - started)
+
+    def _finished(self, fut: asyncio.Future, job: asyncio.Future):
+        self.active -= 1
+        if job.cancelled():
+            fut.cancel()
+        elif job.exception() is not None:
+            self.failed += 1
+            if not fut.done():
+                fut.set_exception(job.exception())
+        else:
+            self.completed += 1
+            if not fut.done():
+                fut.set_result(job.result())
+        self._dispatch()
+
+    async def close(self):
+        for q in self._queues.values():
+            for job in q:
+                job[0].cancel()
+        self._queues.clear()
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        waits, runs = list(self._waits), list(self._runs)
+        return {
+            "backend": self.backend.name,
+            "active": self.active,
+            "limit": self.max_concurrent,
+            "queued": self.queued,
+            "guilds_waiting": len(self._queues),
+            "peak_queued": self.peak_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+            "wait_p95": _percentile(waits, 0.95),
+            "run_avg": sum(runs) / len(runs) if runs else 0.0,
+            "run_p95": _percentile(runs, 0.95),
+            **self.backend.stats(),
+        }
+
+
+extractor_pool = ExtractorPool(backend=os.getenv(BACKEND_ENV, "thread").strip().lower())
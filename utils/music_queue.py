@@ -0,0 +1,287 @@
+import json
+import os
+import random
+from collections import deque
+from typing import Iterator, Optional
+
+QUEUE_LOG_DIR = "queue_logs"
+# Rewrite a guild's log as one snapshot once it holds this many ops...
+COMPACT_OPS = 500
+# ...and the ops outnumber the queued songs by this factor
+COMPACT_RATIO = 2
+# Song keys that only make sense for this process (stream URLs expire)
+TRANSIENT_KEYS = ("stream_url", "stream_key")
+
+
+def _persistable(song: dict) -> dict:
+    return {k: v for k, v in song.items() if k not in TRANSIENT_KEYS}
+
+
+class SongQueue:
+    """One guild's play queue: a deque of cells plus a queue-id index.
+
+    Every song gets a `qid`. Removing or moving a song blanks its cell
+    instead of searching the deque, so both are O(1); blank cells are
+    skipped on the way out and squeezed out once they pile up. Each change
+    is appended to the guild's log as one JSON line, so enqueueing a page
+    of a playlist is one small write instead of a rewrite of every queue.
+
+    The log also tracks the playing track (`current`), its last known
+    position and the channels it played in, so a restart can resume it.
+    """
+
+    def __init__(self, guild_id: str, log_dir: str = QUEUE_LOG_DIR):
+        self.guild_id = str(guild_id)
+        self.path = os.path.join(log_dir, f"{self.guild_id}.jsonl")
+        self._cells: deque[list] = deque()   # [song] or [None] once removed/moved
+        self._index: dict[int, list] = {}    # qid -> live cell
+        self._next_id = 1
+        self._log_ops = 0
+        self.current: Optional[dict] = None
+        self.offset = 0.0                    # seconds into `current`
+        self.voice_channel_id: Optional[int] = None
+        self.text_channel_id: Optional[int] = None
+
+    @classmethod
+    def load(cls, guild_id: str, log_dir: str = QUEUE_LOG_DIR) -> "SongQueue":
+        """Rebuild a queue by replaying its log (a torn last line is ignored)."""
+        q = cls(guild_id, log_dir)
+        try:
+            with open(q.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except ValueError:
+                        continue
+                    q._apply(op)
+                    q._log_ops += 1
+        except FileNotFoundError:
+            pass
+        return q
+
+    # ---- reading ----
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __bool__(self) -> bool:
+        return bool(self._index)
+
+    def __iter__(self) -> Iterator[dict]:
+        return (cell[0] for cell in self._cells if cell[0] is not None)
+
+    def __contains__(self, qid: int) -> bool:
+        return qid in self._index
+
+    def peek(self) -> Optional[dict]:
+        """The song that plays next, without removing it."""
+        while self._cells and self._cells[0][0] is None:
+            self._cells.popleft()
+        return self._cells[0][0] if self._cells else None
+
+    def snapshot(self) -> list[dict]:
+        return list(self)
+
+    # ---- changes ----
+    def append(self, song: dict):
+        self.extend([song])
+
+    def extend(self, songs: list[dict]):
+        if songs:
+            self._commit({"op": "add", "songs": list(songs)})
+
+    def appendleft(self, song: dict):
+        self._commit({"op": "add", "songs": [song], "front": True})
+
+    def popleft(self) -> Optional[dict]:
+        song = self.peek()
+        if song is not None:
+            self._commit({"op": "remove", "id": song["qid"]})
+        return song
+
+    def remove(self, qid: int) -> Optional[dict]:
+        cell = self._index.get(qid)
+        if cell is None:
+            return None
+        song = cell[0]
+        self._commit({"op": "remove", "id": qid})
+        return song
+
+    def move_to_front(self, qid: int) -> bool:
+        if qid not in self._index:
+            return False
+        self._commit({"op": "front", "id": qid})
+        return True
+
+    def shuffle(self, rng: random.Random = random):
+        ids = list(self._index)
+        rng.shuffle(ids)
+        self._commit({"op": "order", "ids": ids})
+
+    def clear(self):
+        """Empty the queue and forget the current track."""
+        self._commit({"op": "clear"})
+
+    # ---- playback position ----
+    def set_current(self, song: dict, voice_channel_id: Optional[int] = None, text_channel_id: Optional[int] = None, offset: float = 0.0):
+        self._commit({
+            "op": "now",
+            "song": song,
+            "stream_url": song.get("stream_url"),
+            "offset": offset,
+            "voice": voice_channel_id,
+            "text": text_channel_id,
+        })
+
+    def checkpoint(self, offset: float):
+        if self.current is not None:
+            self._commit({"op": "pos", "offset": round(offset, 1)})
+
+    def clear_current(self):
+        if self.current is not None:
+            self._commit({"op": "done"})
+
+    # ---- state ----
+    def _add(self, song: dict, front: bool = False):
+        song.setdefault("qid", self._next_id)
+        self._next_id = max(self._next_id, song["qid"]) + 1
+        cell = [song]
+        self._index[song["qid"]] = cell
+        if front:
+            self._cells.appendleft(cell)
+        else:
+            self._cells.append(cell)
+
+    def _apply(self, op: dict):
+        kind = op.get("op")
+        if kind == "add":
+            songs = op.get("songs") or []
+            front = op.get("front", False)
+            for song in (reversed(songs) if front else songs):
+                self._add(song, front)
+        elif kind == "remove":
+            cell = self._index.pop(op.get("id"), None)
+            if cell is not None:
+                cell[0] = None
+                self._squeeze()
+        elif kind == "front":
+            cell = self._index.pop(op.get("id"), None)
+            if cell is not None:
+                song, cell[0] = cell[0], None
+                self._add(song, front=True)
+                self._squeeze()
+        elif kind == "order":
+            ids = [i for i in op.get("ids", []) if i in self._index]
+            listed = set(ids)
+            rest = [cell[0]["qid"] for cell in self._cells if cell[0] is not None and cell[0]["qid"] not in listed]
+            self._cells = deque(self._index[i] for i in ids + rest)
+        elif kind == "clear":
+            self._cells.clear()
+            self._index.clear()
+            self.current = None
+            self.offset = 0.0
+        elif kind == "now":
+            self.current = op["song"]
+            if op.get("stream_url") and not self.current.get("stream_url"):
+                self.current["stream_url"] = op["stream_url"]
+            self.offset = float(op.get("offset") or 0)
+            self.voice_channel_id = op.get("voice") or self.voice_channel_id
+            self.text_channel_id = op.get("text") or self.text_channel_id
+        elif kind == "pos":
+            self.offset = float(op.get("offset") or 0)
+        elif kind == "done":
+            self.current = None
+            self.offset = 0.0
+        elif kind == "snapshot":
+            self._apply({"op": "clear"})
+            self._apply({"op": "add", "songs": op.get("songs") or []})
+            self._next_id = max(self._next_id, op.get("next_id") or 1)
+            self.voice_channel_id = op.get("voice")
+            self.text_channel_id = op.get("text")
+            if op.get("current"):
+                self._apply({"op": "now", "song": op["current"], "stream_url": op.get("stream_url"), "offset": op.get("offset")})
+
+    def _squeeze(self):
+        """Drop blank cells once they outnumber live ones."""
+        if len(self._cells) > 64 and len(self._cells) > 2 * len(self._index):
+            self._cells = deque(cell for cell in self._cells if cell[0] is not None)
+
+    # ---- persistence ----
+    def _commit(self, op: dict):
+        self._apply(op)
+        if not self._index and self.current is None:
+            # Nothing left to restore: drop the log instead of growing it
+            self._log_ops = 0
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            return
+        if self._log_ops >= COMPACT_OPS and self._log_ops > COMPACT_RATIO * len(self._index):
+            self.compact()
+            return
+        if "songs" in op:
+            op = {**op, "songs": [_persistable(s) for s in op["songs"]]}
+        elif "song" in op:
+            op = {**op, "song": _persistable(op["song"])}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(op) + "\n")
+        self._log_ops += 1
+
+    def compact(self):
+        """Replace the log with a single snapshot of the current state."""
+        snapshot = {
+            "op": "snapshot",
+            "songs": [_persistable(s) for s in self],
+            "next_id": self._next_id,
+            "voice": self.voice_channel_id,
+            "text": self.text_channel_id,
+        }
+        if self.current is not None:
+            snapshot.update(current=_persistable(self.current), stream_url=self.current.get("stream_url"), offset=self.offset)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps(snapshot) + "\n")
+        os.replace(tmp, self.path)
+        self._log_ops = 1
+
+
+class QueueStore:
+    """Every guild's SongQueue, created on first use."""
+
+    def __init__(self, log_dir: str = QUEUE_LOG_DIR):
+        self.log_dir = log_dir
+        self.queues: dict[str, SongQueue] = {}
+
+    def __getitem__(self, guild_id) -> SongQueue:
+        gid = str(guild_id)
+        q = self.queues.get(gid)
+        if q is None:
+            q = self.queues[gid] = SongQueue(gid, self.log_dir)
+        return q
+
+    def get(self, guild_id) -> Optional[SongQueue]:
+        return self.queues.get(str(guild_id))
+
+    def load_all(self) -> list[SongQueue]:
+        """Replay every guild's log; returns the queues with something to resume."""
+        restored = []
+        if not os.path.isdir(self.log_dir):
+            return restored
+        for name in os.listdir(self.log_dir):
+            path = os.path.join(self.log_dir, name)
+            if name.endswith(".tmp"):
+                os.remove(path)  # a compaction that never finished; the log itself is intact
+            elif name.endswith(".jsonl"):
+                q = SongQueue.load(name[:-len(".jsonl")], self.log_dir)
+                if q or q.current is not None:
+                    self.queues[q.guild_id] = q
+                    restored.append(q)
+                    q.compact()
+                else:
+                    os.remove(path)
+        return restored
+
+
+queue_store = QueueStore()
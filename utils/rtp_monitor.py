@@ -0,0 +1,137 @@
+import asyncio
+import math
+import time
+from typing import Awaitable, Callable, Optional
+
+# Alert when the observed mean return is this many standard errors above theory
+Z_THRESHOLD = 4.0
+# Rounds needed before the normal approximation is trusted
+MIN_ROUNDS = 200
+# Window (in rounds) of the exponential moving RTP
+EMA_ROUNDS = 500
+# At most one alert per guild and game in this many seconds
+ALERT_COOLDOWN = 6 * 3600
+
+
+class RTPStream:
+    """Streaming payout statistics for one guild and game.
+
+    `mean`/`m2` follow Welford's update over per-round return ratios
+    (payout / wager), so the variance never needs a second pass.
+    """
+
+    __slots__ = ("n", "mean", "m2", "ema", "expected_sum", "wagered", "paid", "last_alert")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ema: Optional[float] = None
+        self.expected_sum = 0.0
+        self.wagered = 0
+        self.paid = 0
+        self.last_alert = float("-inf")
+
+    def update(self, ratio: float, expected: float, wager: int, payout: int, alpha: float):
+        self.n += 1
+        delta = ratio - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (ratio - self.mean)
+        self.ema = ratio if self.ema is None else self.ema + alpha * (ratio - self.ema)
+        self.expected_sum += expected
+        self.wagered += wager
+        self.paid += payout
+
+    @property
+    def expected(self) -> float:
+        return self.expected_sum / self.n if self.n else 0.0
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def z_score(self) -> float:
+        if self.n < 2 or self.m2 <= 0:
+            return 0.0
+        return (self.mean - self.expected) / math.sqrt(self.variance / self.n)
+
+
+class RTPMonitor:
+    """O(1)-per-round RTP drift detection shared by the casino cogs.
+
+    State is in memory only; after a restart the streams simply start over.
+    `alert_handler` (set by the cog that owns the alert channel config) is
+    scheduled on the event loop whenever a stream crosses Z_THRESHOLD.
+    """
+
+    def __init__(self, z_threshold: float = Z_THRESHOLD, min_rounds: int = MIN_ROUNDS, ema_rounds: int = EMA_ROUNDS):
+        self.z_threshold = z_threshold
+        self.min_rounds = min_rounds
+        self.alpha = 2 / (ema_rounds + 1)
+        self.overrides: dict[str, float] = {}  # guild_id -> z threshold
+        self.streams: dict[tuple[str, str], RTPStream] = {}
+        self.alert_handler: Optional[Callable[[dict], Awaitable[None]]] = None
+
+    def set_threshold(self, guild_id, z: Optional[float]):
+        if z is None:
+            self.overrides.pop(str(guild_id), None)
+        else:
+            self.overrides[str(guild_id)] = float(z)
+
+    def threshold_for(self, guild_id) -> float:
+        return self.overrides.get(str(guild_id), self.z_threshold)
+
+    def observe(self, guild_id, game: str, wager: int, payout: int, expected_rtp: float, now: Optional[float] = None) -> Optional[dict]:
+        """Record one round. `expected_rtp` is the theoretical return ratio (e.g. 0.967).
+
+        Returns the alert dict when this round triggers one.
+        """
+        if wager <= 0 or not guild_id:
+            return None
+        key = (str(guild_id), game)
+        stream = self.streams.get(key)
+        if stream is None:
+            stream = self.streams[key] = RTPStream()
+        stream.update(payout / wager, expected_rtp, wager, payout, self.alpha)
+        if stream.n < self.min_rounds:
+            return None
+        z = stream.z_score()
+        now = time.time() if now is None else now
+        if z < self.overrides.get(key[0], self.z_threshold) or now - stream.last_alert < ALERT_COOLDOWN:
+            return None
+        stream.last_alert = now
+        alert = {"guild_id": key[0], "game": game, "z": z, **self._describe(stream)}
+        if self.alert_handler is not None:
+            try:
+                asyncio.get_running_loop().create_task(self.alert_handler(alert))
+            except RuntimeError:
+                pass
+        return alert
+
+    def snapshot(self, guild_id) -> dict[str, dict]:
+        """Current figures for every game tracked in a guild."""
+        gid = str(guild_id)
+        return {
+            game: {"z": stream.z_score(), **self._describe(stream)}
+            for (g, game), stream in self.streams.items() if g == gid
+        }
+
+    def reset(self, guild_id, game: Optional[str] = None):
+        gid = str(guild_id)
+        for key in [k for k in self.streams if k[0] == gid and (game is None or k[1] == game)]:
+            del self.streams[key]
+
+    @staticmethod
+    def _describe(stream: RTPStream) -> dict:
+        return {
+            "rounds": stream.n,
+            "rtp": stream.mean * 100,
+            "ema": (stream.ema or 0.0) * 100,
+            "expected": stream.expected * 100,
+            "stddev": math.sqrt(stream.variance),
+            "wagered": stream.wagered,
+            "paid": stream.paid,
+        }
+
+
+rtp_monitor = RTPMonitor()
@@ -0,0 +1,129 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+# Entries are treated as expired this long before the URL's own expiry
+EXPIRY_MARGIN = 120
+# Lifetime assumed for stream URLs that don't carry an expire= parameter
+DEFAULT_TTL = 30 * 60
+MAX_ENTRIES = 2000
+
+
+def parse_expiry(stream_url: str, now: Optional[float] = None) -> float:
+    """Absolute expiry (epoch seconds) of a resolved stream URL.
+
+    googlevideo URLs carry `expire=<epoch>` in the query string (older ones
+    use a `/expire/<epoch>/` path segment); anything else gets DEFAULT_TTL.
+    """
+    now = time.time() if now is None else now
+    try:
+        p = urlparse(stream_url)
+        value = parse_qs(p.query).get("expire", [None])[0]
+        if value is None and "/expire/" in p.path:
+            value = p.path.split("/expire/", 1)[1].split("/", 1)[0]
+        if value is not None:
+            return float(value)
+    except Exception:
+        pass
+    return now + DEFAULT_TTL
+
+
+def cache_key(target: str, format_pref: Optional[str] = None) -> tuple[str, str, str]:
+    """(extractor, video id, format preference) for a resolve target.
+
+    YouTube links in any form (watch, youtu.be, shorts) collapse to the
+    video id so the same track requested differently shares one entry.
+    """
+    fmt = format_pref or "default"
+    try:
+        p = urlparse(target)
+        host = p.netloc.lower()
+        if "youtu.be" in host:
+            vid = p.path.strip("/").split("/")[0]
+            if vid:
+                return ("youtube", vid, fmt)
+        if "youtube" in host:
+            vid = parse_qs(p.query).get("v", [None])[0]
+            if not vid and p.path.startswith("/shorts/"):
+                vid = p.path.split("/")[2]
+            if vid:
+                return ("youtube", vid, fmt)
+        if host:
+            return (host.removeprefix("www.").removeprefix("m."), p.path.rstrip("/") or target, fmt)
+    except Exception:
+        pass
+    return ("generic", target, fmt)
+
+
+class StreamCache:
+    """Resolved stream URLs shared by every guild, evicted shortly before they expire.
+
+    `get` takes the time the caller needs the URL to stay valid for (e.g. the
+    track's duration, since ffmpeg reconnects reuse the same URL) so a URL
+    that would die mid-song is treated as a miss.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple, tuple[str, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, key: tuple, needed_for: float = 0, now: Optional[float] = None) -> Optional[str]:
+        now = time.time() if now is None else now
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        url, expires_at = entry
+        if expires_at - EXPIRY_MARGIN <= now:
+            del self.entries[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+        if expires_at - EXPIRY_MARGIN <= now + needed_for:
+            # Still valid, but not for long enough; keep it for shorter tracks
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return url
+
+    def put(self, key: tuple, stream_url: str, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        expires_at = parse_expiry(stream_url, now)
+        if expires_at - EXPIRY_MARGIN <= now:
+            return
+        self.entries[key] = (stream_url, expires_at)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.sweep(now)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, key: tuple):
+        self.entries.pop(key, None)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop every entry inside its expiry margin. Returns the count removed."""
+        now = time.time() if now is None else now
+        stale = [k for k, (_, exp) in self.entries.items() if exp - EXPIRY_MARGIN <= now]
+        for k in stale:
+            del self.entries[k]
+        self.expired += len(stale)
+        return len(stale)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": (self.hits / lookups * 100) if lookups else 0.0,
+        }
+
+
+stream_cache = StreamCache()
@@ -0,0 +1,167 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+TRACK_CACHE_FILE = "track_cache.db"
+MEMORY_ENTRIES = 1000          # hot entries kept in the in-memory LRU
+VIDEO_TTL = 7 * 86400          # refresh titles/thumbnails/durations weekly
+SEARCH_TTL = 3 * 86400         # search results drift faster than metadata
+# Quota units a hit avoids (search.list = 100, videos.list = 1)
+SEARCH_COST = 100
+VIDEO_COST = 1
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search term."""
+    return " ".join((query or "").lower().split())
+
+
+class TrackCache:
+    """Track metadata keyed by video id, plus search term -> video id.
+
+    An in-memory LRU sits in front of a small SQLite file, so repeat lookups
+    cost a dict hit and survive restarts. Rows older than their TTL count
+    as misses and get overwritten by the fresh lookup.
+    """
+
+    def __init__(self, path: str = TRACK_CACHE_FILE, memory_entries: int = MEMORY_ENTRIES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self._videos: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._searches: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS videos (id TEXT PRIMARY KEY, title TEXT, duration INTEGER, "
+            "thumbnail TEXT, webpage_url TEXT, fetched_at REAL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS searches (query TEXT PRIMARY KEY, video_id TEXT, fetched_at REAL)")
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+        self.quota_saved = 0
+        self.extractions_saved = 0
+
+    # ---- LRU helpers ----
+    def _remember(self, lru: OrderedDict, key: str, value):
+        lru[key] = value
+        lru.move_to_end(key)
+        while len(lru) > self.memory_entries:
+            lru.popitem(last=False)
+
+    def _load_video(self, video_id: str) -> Optional[tuple[dict, float]]:
+        entry = self._videos.get(video_id)
+        if entry is not None:
+            self._videos.move_to_end(video_id)
+            return entry
+        with self._lock:
+            row = self._db.execute(
+                "SELECT title, duration, thumbnail, webpage_url, fetched_at FROM videos WHERE id = ?", (video_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        meta = {"id": video_id, "title": row[0], "duration": row[1] or 0, "thumbnail": row[2] or "", "webpage_url": row[3]}
+        entry = (meta, row[4])
+        self._remember(self._videos, video_id, entry)
+        return entry
+
+    # ---- lookups ----
+    def get_video(self, video_id: str, source: str = "api", now: Optional[float] = None) -> Optional[dict]:
+        """Cached metadata for a video id, or None if missing/stale.
+
+        `source` says what a miss would have cost ("api" or "ytdlp") so the
+        savings counters stay honest.
+        """
+        now = time.time() if now is None else now
+        entry = self._load_video(video_id)
+        if entry is None or now - entry[1] > VIDEO_TTL:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if source == "ytdlp":
+            self.extractions_saved += 1
+        else:
+            self.quota_saved += VIDEO_COST
+        return dict(entry[0])
+
+    def get_search(self, query: str, now: Optional[float] = None) -> Optional[dict]:
+        """Metadata for the video a search term resolved to last time, or None."""
+        now = time.time() if now is None else now
+        key = normalize_query(query)
+        entry = self._searches.get(key)
+        if entry is None:
+            with self._lock:
+                row = self._db.execute("SELECT video_id, fetched_at FROM searches WHERE query = ?", (key,)).fetchone()
+            if row is not None:
+                entry = (row[0], row[1])
+                self._remember(self._searches, key, entry)
+        else:
+            self._searches.move_to_end(key)
+        if entry is None or now - entry[1] > SEARCH_TTL:
+            self.misses += 1
+            return None
+        video = self._load_video(entry[0])
+        if video is None or now - video[1] > VIDEO_TTL:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.quota_saved += SEARCH_COST + VIDEO_COST
+        return dict(video[0])
+
+    # ---- updates ----
+    def put_video(self, meta: dict, now: Optional[float] = None):
+        """Store {'id', 'title', 'duration', 'thumbnail', 'webpage_url'}."""
+        now = time.time() if now is None else now
+        vid = meta.get("id")
+        if not vid:
+            return
+        clean = {
+            "id": vid,
+            "title": meta.get("title") or "Unknown",
+            "duration": int(meta.get("duration") or 0),
+            "thumbnail": meta.get("thumbnail") or "",
+            "webpage_url": meta.get("webpage_url") or f"https://www.youtube.com/watch?v={vid}",
+        }
+        self._remember(self._videos, vid, (clean, now))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?)",
+                (vid, clean["title"], clean["duration"], clean["thumbnail"], clean["webpage_url"], now),
+            )
+            self._db.commit()
+
+    def put_search(self, query: str, video_id: str, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        key = normalize_query(query)
+        if not key or not video_id:
+            return
+        self._remember(self._searches, key, (video_id, now))
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO searches VALUES (?, ?, ?)", (key, video_id, now))
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            videos = self._db.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+            searches = self._db.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "videos": videos,
+            "searches": searches,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups * 100) if lookups else 0.0,
+            "quota_saved": self.quota_saved,
+            "extractions_saved": self.extractions_saved,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+track_cache = TrackCache()
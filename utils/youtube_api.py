@@ -1,8 +1,18 @@
+import asyncio
 import os
-import requests
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+import aiohttp
 
 YT_API_KEY = os.getenv('YOUTUBE_API_KEY')
+API_BASE = 'https://www.googleapis.com/youtube/v3'
+
+REQUEST_TIMEOUT = 10      # seconds, whole request
+MAX_CONNECTIONS = 8       # pooled connections to googleapis.com
+MAX_IDS_PER_CALL = 50     # videos.list accepts up to 50 comma-separated ids
+BATCH_WINDOW = 0.05       # seconds to collect concurrent video lookups into one call
+# Quota cost per endpoint (units per call)
+QUOTA_COST = {'search': 100, 'videos': 1, 'playlistItems': 1}
 
 
 def _ensure_key():
@@ -10,44 +20,170 @@ def _ensure_key():
         raise EnvironmentError('YOUTUBE_API_KEY not set in environment')
 
 
-def yt_api_search(query: str, max_results: int = 1) -> Dict[str, Any]:
-    _ensure_key()
-    url = 'https://www.googleapis.com/youtube/v3/search'
-    params = {
-        'part': 'snippet',
-        'q': query,
-        'type': 'video',
-        'maxResults': max_results,
-        'key': YT_API_KEY
-    }
-    r = requests.get(url, params=params, timeout=10)
-    r.raise_for_status()
-    return r.json()
-
-
-def yt_api_videos(video_id: str) -> Dict[str, Any]:
-    _ensure_key()
-    url = 'https://www.googleapis.com/youtube/v3/videos'
-    params = {
-        'id': video_id,
-        'part': 'snippet,contentDetails',
-        'key': YT_API_KEY
-    }
-    r = requests.get(url, params=params, timeout=10)
-    r.raise_for_status()
-    return r.json()
-
-
-def yt_api_playlist_items(playlist_id: str, max_results: int = 50) -> Dict[str, Any]:
+class YouTubeAPI:
+    """Non-blocking YouTube Data API client over one pooled aiohttp session.
+
+    - Identical concurrent requests share a single HTTP call (single-flight).
+    - Video lookups made within BATCH_WINDOW of each other are coalesced
+      into one videos.list call of up to 50 ids.
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self._lookups: Dict[str, asyncio.Future] = {}  # video id -> unresolved lookup (queued or in flight)
+        self._pending: Dict[str, asyncio.Future] = {}  # subset not yet sent
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()  # strong refs to running requests/batches until they finish
+        self.requests = 0
+        self.quota_used = 0
+        self.deduped = 0
+        self.batched_ids = 0
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT),
+                connector=aiohttp.TCPConnector(limit=MAX_CONNECTIONS, ttl_dns_cache=300),
+            )
+        return self._session
+
+    async def close(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for fut in self._pending.values():
+            if not fut.done():
+                fut.cancel()
+        self._pending.clear()
+        self._lookups.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    # ---- raw requests ----
+    async def _request(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        session = await self._get_session()
+        self.requests += 1
+        self.quota_used += QUOTA_COST.get(endpoint, 1)
+        async with session.get(f'{API_BASE}/{endpoint}', params={**params, 'key': YT_API_KEY}) as r:
+            r.raise_for_status()
+            return await r.json()
+
+    async def _get(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET with single-flight de-duplication of identical in-flight requests."""
+        _ensure_key()
+        key = (endpoint, tuple(sorted((k, str(v)) for k, v in params.items())))
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._spawn(self._request(endpoint, params))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t: self._inflight.pop(key, None))
+        else:
+            self.deduped += 1
+        # shield: one caller being cancelled must not cancel the shared request
+        return await asyncio.shield(task)
+
+    # ---- endpoints ----
+    async def search(self, query: str, max_results: int = 1) -> Dict[str, Any]:
+        return await self._get('search', {
+            'part': 'snippet',
+            'q': query,
+            'type': 'video',
+            'maxResults': max_results,
+        })
+
+    async def video(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """One videos.list item (snippet + contentDetails), or None if not found.
+
+        Concurrent calls are batched; asking for an id that is already
+        queued or in flight joins that lookup.
+        """
+        _ensure_key()
+        fut = self._lookups.get(video_id)
+        if fut is not None:
+            self.deduped += 1
+            return await asyncio.shield(fut)
+        loop = asyncio.get_running_loop()
+        fut = self._lookups[video_id] = self._pending[video_id] = loop.create_future()
+        fut.add_done_callback(lambda _f: self._lookups.pop(video_id, None))
+        if len(self._pending) >= MAX_IDS_PER_CALL:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(BATCH_WINDOW, self._flush)
+        return await asyncio.shield(fut)
+
+    async def videos(self, video_ids: List[str]) -> Dict[str, Any]:
+        """videos.list for any number of ids, in request order (missing ids are omitted)."""
+        items = await asyncio.gather(*(self.video(v) for v in video_ids))
+        return {'items': [it for it in items if it]}
+
+    async def playlist_items(self, playlist_id: str, max_results: int = 50, page_token: Optional[str] = None) -> Dict[str, Any]:
+        """One page (up to 50 items) of a playlist; pass `nextPageToken` back for the next."""
+        params = {
+            'part': 'snippet,contentDetails',
+            'playlistId': playlist_id,
+            'maxResults': max_results,
+        }
+        if page_token:
+            params['pageToken'] = page_token
+        return await self._get('playlistItems', params)
+
+    # ---- batching ----
+    def _flush(self):
+        self._flush_handle = None
+        while self._pending:
+            ids = list(self._pending)[:MAX_IDS_PER_CALL]
+            batch = {vid: self._pending.pop(vid) for vid in ids}
+            self.batched_ids += len(batch)
+            self._spawn(self._fetch_batch(batch))
+
+    async def _fetch_batch(self, batch: Dict[str, asyncio.Future]):
+        try:
+            res = await self._get('videos', {'id': ','.join(batch), 'part': 'snippet,contentDetails'})
+            found = {it.get('id'): it for it in res.get('items', [])}
+            for vid, fut in batch.items():
+                if not fut.done():
+                    fut.set_result(found.get(vid))
+        except Exception as e:
+            for fut in batch.values():
+                if not fut.done():
+                    fut.set_exception(e)
+        finally:
+            # Only reached with undone futures if this task itself was cancelled
+            for fut in batch.values():
+                if not fut.done():
+                    fut.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'requests': self.requests,
+            'quota_used': self.quota_used,
+            'deduped': self.deduped,
+            'batched_ids': self.batched_ids,
+        }
+
+
+youtube_api = YouTubeAPI()
+
+
+async def yt_api_search(query: str, max_results: int = 1) -> Dict[str, Any]:
+    return await youtube_api.search(query, max_results)
+
+
+async def yt_api_videos(video_id: str) -> Dict[str, Any]:
+    item = await youtube_api.video(video_id)
+    return {'items': [item] if item else []}
+
+
+async def yt_api_playlist_items(playlist_id: str, max_results: int = 50, page_token: Optional[str] = None) -> Dict[str, Any]:
     """Fetch up to max_results items from a playlist (pageSize up to 50)."""
-    _ensure_key()
-    url = 'https://www.googleapis.com/youtube/v3/playlistItems'
-    params = {
-        'part': 'snippet,contentDetails',
-        'playlistId': playlist_id,
-        'maxResults': max_results,
-        'key': YT_API_KEY
-    }
-    r = requests.get(url, params=params, timeout=10)
-    r.raise_for_status()
-    return r.json()
+    return await youtube_api.playlist_items(playlist_id, max_results, page_token)